@@ -1,4 +1,6 @@
+import httpx
 from logging_config import get_logger
+from telegram.request import HTTPXRequest
 from telegram.ext import (
     Application,
     MessageHandler,
@@ -11,15 +13,34 @@ from api.telegram.handlers.message_handlers import message_handlers
 from api.telegram.handlers.audio_handlers import audio_handlers
 from api.telegram.handlers.onboarding_handlers import onboarding_conv_handler
 from config import config
+from core.message_processor import BATCH_CALLBACK_PATTERN
+from integrations.cache.telegram_persistence import telegram_persistence
 
 logger = get_logger(__name__)
 
-application = (
+application_builder = (
     Application.builder()
     .token(config.TELEGRAM_BOT_TOKEN)
     .updater(None) 
-    .build()
+    # Keep-alive pool for the Bot API, shared by all the outbound requests
+    .request(
+        HTTPXRequest(
+            connection_pool_size=config.OUTBOUND_POOL_SIZE,
+            read_timeout=config.OUTBOUND_TIMEOUT_SECS,
+            httpx_kwargs={
+                "limits": httpx.Limits(
+                    max_connections=config.OUTBOUND_POOL_SIZE,
+                    max_keepalive_connections=config.OUTBOUND_POOL_SIZE,
+                    keepalive_expiry=config.OUTBOUND_KEEPALIVE_SECS,
+                )
+            },
+        )
+    )
 )
+if config.TELEGRAM_REDIS_PERSISTENCE:
+    # Conversation states, user_data and chat_data are shared between workers through Redis
+    application_builder = application_builder.persistence(telegram_persistence)
+application = application_builder.build()
 
 def register_handlers(application):
     """
@@ -40,6 +61,7 @@ def register_handlers(application):
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handlers.handle_text_message))
     application.add_handler(CallbackQueryHandler(message_handlers.confirm_save, pattern="^confirm#"))
     application.add_handler(CallbackQueryHandler(message_handlers.cancel_save, pattern="^cancel#"))
+    application.add_handler(CallbackQueryHandler(message_handlers.resolve_batch, pattern=BATCH_CALLBACK_PATTERN))
     logger.info("Added text message handlers and confirmation and cancelation handlers.")
     
     # 4. For voice messages
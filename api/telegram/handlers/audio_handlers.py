@@ -1,6 +1,5 @@
 # In your main bot file (e.g., api/bot.py)
 import logging
-import os
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -13,8 +12,10 @@ from core.feature_flag import (
     is_feature_enabled,
 )
 from core.message_processor import MessageProcessor
+from core.utils.deadline import Deadline
 from integrations.platforms.telegram_adapter import TelegramAdapter
-from core.messages import MSG_VOICE_NO_TEXT, MSG_VOICE_PROCESSING_ERROR
+from core.audio_preprocessor import AudioTooLongError
+from core.messages import MSG_VOICE_NO_TEXT, MSG_VOICE_PROCESSING_ERROR, MSG_VOICE_TOO_LONG
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,7 @@ class AudioHandlers:
             update (Update): The Telegram update object containing the voice message
             context (ContextTypes.DEFAULT_TYPE): The context object for the conversation
         """
+        deadline = Deadline.current()
         user = context.user_data.get('current_user')
         telegram_adapter = TelegramAdapter(update, user)
 
@@ -54,29 +56,25 @@ class AudioHandlers:
         logger.info(f"Voice message received from user {user_id} with file ID: {file_id}")
 
         try:
-            # Get the File object from Telegram
-            file = await context.bot.get_file(file_id)
-            filename = f"voice_{user_id}.ogg"
-
-            # Download directly to local disk (avoiding requests and URL)
-            await file.download_to_drive(custom_path=filename)
-
-            # Process audio
-            transcription_result = await self.audio_processor.process_audio(telegram_adapter, filename)
+            # Process audio (downloaded into memory by the adapter)
+            transcription_result = await self.audio_processor.process_audio(telegram_adapter, deadline)
             logger.info(transcription_result)
             
             message = telegram_adapter.map_to_message(message_text=transcription_result)
 
             if transcription_result:
-                await self.message_processor.process_and_respond(user_message=message, platform=telegram_adapter)
+                await self.message_processor.process_and_respond(
+                    user_message=message, platform=telegram_adapter, deadline=deadline
+                )
             else:
                 await telegram_adapter.reply_text(MSG_VOICE_NO_TEXT)
 
+        except AudioTooLongError as e:
+            logger.info(f"Voice message from user {user_id} rejected: {e}")
+            await telegram_adapter.reply_text(MSG_VOICE_TOO_LONG.format(max_duration=e.max_duration_secs))
         except Exception as e:
             logger.error(f"Error handling voice message: {e}")
             await telegram_adapter.reply_text(MSG_VOICE_PROCESSING_ERROR)
-        finally:
-            os.remove(filename)
 
 # Create a singleton instance
 audio_handlers = AudioHandlers()
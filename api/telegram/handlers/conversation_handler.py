@@ -0,0 +1,84 @@
+from telegram import Update
+from telegram.ext import ConversationHandler
+
+from integrations.cache.telegram_persistence import RedisPersistence
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class RedisConversationHandler(ConversationHandler):
+    """
+    ConversationHandler that reads the conversation state from Redis on every update.
+
+    PTB keeps the conversation states in process memory and only loads them from the
+    persistence at startup. When several workers serve the bot, another worker may have
+    moved the conversation forward, so the state for the update's key is synced from
+    the persistence before the handler decides which state the conversation is in.
+    Writes go through the regular persistence flow (Application.update_persistence).
+    """
+
+    def __init__(self, *args, persistence: RedisPersistence, **kwargs):
+        """
+        Args:
+            persistence (RedisPersistence): The persistence the application uses.
+            *args, **kwargs: Regular ConversationHandler arguments. `name` is required.
+        """
+        super().__init__(*args, persistent=True, **kwargs)
+        self._redis_persistence = persistence
+
+    def has_active_conversation(self, update: Update) -> bool:
+        """
+        Returns whether the update belongs to a conversation in progress, in any worker.
+
+        Args:
+            update (Update): The incoming update.
+        """
+        try:
+            key = self._get_key(update)
+            return self._redis_persistence.load_conversation_state(self.name, key) is not None
+        except RuntimeError:
+            return False
+        except Exception as e:
+            logger.error(f"Error loading conversation state for {self.name}: {e}")
+            return False
+
+    def check_update(self, update: object):
+        if isinstance(update, Update):
+            self._sync_state(update)
+        return super().check_update(update)
+
+    def _sync_state(self, update: Update) -> None:
+        try:
+            key = self._get_key(update)
+        except RuntimeError:
+            # The update can't belong to a conversation, super().check_update will discard it
+            return
+
+        try:
+            state = self._redis_persistence.load_conversation_state(self.name, key)
+        except Exception as e:
+            logger.error(f"Error loading conversation state for {self.name}:{key}: {e}")
+            return
+
+        # Changes here come from the persistence, so they must not be tracked as new writes
+        if state is None:
+            self._conversations.data.pop(key, None)
+        else:
+            self._conversations.update_no_track({key: state})
+
+
+def has_active_conversation(handler: ConversationHandler, update: Update) -> bool:
+    """
+    Returns whether the update belongs to a conversation of the handler in progress.
+
+    Args:
+        handler (ConversationHandler): The conversation handler, backed by Redis or not.
+        update (Update): The incoming update.
+    """
+    if isinstance(handler, RedisConversationHandler):
+        return handler.has_active_conversation(update)
+    try:
+        return handler._get_key(update) in handler._conversations
+    except RuntimeError:
+        return False
@@ -1,9 +1,12 @@
+import asyncio
+
 from logging_config import get_logger
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
 from api.telegram.middlewere.require_onboarding import require_onboarding
 from core.message_processor import MessageProcessor
+from core.utils.deadline import Deadline
 from integrations.platforms.telegram_adapter import TelegramAdapter
 
 logger = get_logger(__name__)
@@ -29,13 +32,16 @@ class MessageHandlers:
         Handles incoming messages from Telegram users, processes them using the LLMProcessor,
         and sends a separate response back to the user for each processed result.
         """
+        deadline = Deadline.current()
         user = context.user_data.get('current_user')
         telegram_adapter = TelegramAdapter(update, user)
         user_message = telegram_adapter.map_to_message()
 
         logger.info(f"Received message from user {user_message.user_id}: {user_message}")
 
-        return await self.message_processor.process_and_respond(user_message, platform=telegram_adapter)
+        return await self.message_processor.process_and_respond(
+            user_message, platform=telegram_adapter, deadline=deadline
+        )
 
     @require_onboarding
     async def confirm_save(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -49,6 +55,7 @@ class MessageHandlers:
         Returns:
             int: ConversationHandler.END to end the conversation
         """
+        deadline = Deadline.current()
         user = context.user_data.get('current_user')
         telegram_adapter = TelegramAdapter(update, user)
         query = telegram_adapter.get_callback_query()
@@ -69,13 +76,16 @@ class MessageHandlers:
             "user_id": user.id
         })
 
-        response = self.message_processor.save_and_respond(
+        # Storage writes are blocking, keep them off the event loop
+        response = await asyncio.to_thread(
+            self.message_processor.save_and_respond,
             user_id=user.id,
             message_id=callback_id,
-            platform=telegram_adapter
+            platform=telegram_adapter,
+            deadline=deadline
         )
 
-        await query.edit_message_text(text=response, parse_mode='HTML')
+        await telegram_adapter.edit_callback_message(response)
         return ConversationHandler.END
 
     @require_onboarding
@@ -116,7 +126,50 @@ class MessageHandlers:
             platform=telegram_adapter
         )
 
-        await query.edit_message_text(text=response, parse_mode='HTML')
+        await telegram_adapter.edit_callback_message(response)
+        return ConversationHandler.END
+
+    @require_onboarding
+    async def resolve_batch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """
+        Callback query handler for the buttons of a batch confirmation message
+        (confirm/cancel all the movements or a single one).
+
+        Args:
+            update (Update): The Telegram update object containing the callback query
+            context (ContextTypes.DEFAULT_TYPE): The context object for the conversation
+
+        Returns:
+            int: ConversationHandler.END to end the conversation
+        """
+        deadline = Deadline.current()
+        user = context.user_data.get('current_user')
+        telegram_adapter = TelegramAdapter(update, user)
+        query = telegram_adapter.get_callback_query()
+        user_id = telegram_adapter.get_user().id
+
+        await query.answer()
+
+        logger.info("Processing batch callback", extra={
+            "user_id": user_id,
+            "callback_data": query.data,
+            "message_id": query.message.message_id
+        })
+
+        batch_id, confirm, index = self.message_processor.parse_batch_callback(query.data)
+
+        # Storage writes are blocking, keep them off the event loop
+        response, buttons = await asyncio.to_thread(
+            self.message_processor.resolve_batch_and_respond,
+            user_id=user_id,
+            batch_id=batch_id,
+            platform=telegram_adapter,
+            confirm=confirm,
+            index=index,
+            deadline=deadline
+        )
+
+        await telegram_adapter.edit_callback_message(response, buttons)
         return ConversationHandler.END
 
 # Create a singleton instance
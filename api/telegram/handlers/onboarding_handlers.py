@@ -10,7 +10,10 @@ from telegram.ext import (
     filters,
 )
 
+from api.telegram.handlers.conversation_handler import RedisConversationHandler
 from api.telegram.middlewere.requiere_user import require_user
+from config import config
+from integrations.cache.telegram_persistence import telegram_persistence
 from integrations.platforms.telegram_adapter import TelegramAdapter
 from core.onboarding_manager import OnboardingManager
 
@@ -221,7 +224,7 @@ webapp_handler = WebappHandler()
 general_handler = GeneralHandler()
 
 # --- Conversation Handler Definition ---
-onboarding_conv_handler = ConversationHandler(
+onboarding_conv_handler_kwargs = dict(
     entry_points=[
         MessageHandler(filters.TEXT & filters.Regex(COMMAND_PATTERNS['START']), start_handler.handle_start),
         MessageHandler(filters.TEXT & filters.Regex(COMMAND_PATTERNS['START_WITH_LINK']), start_handler.handle_deeplink_start),
@@ -255,4 +258,14 @@ onboarding_conv_handler = ConversationHandler(
         CommandHandler('cancel', general_handler.handle_cancel),
         MessageHandler(filters.ALL, general_handler.handle_fallback)
     ]
-)
\ No newline at end of file
+)
+
+if config.TELEGRAM_REDIS_PERSISTENCE:
+    # Conversation state lives in Redis so any worker can continue the conversation
+    onboarding_conv_handler = RedisConversationHandler(
+        name="onboarding",
+        persistence=telegram_persistence,
+        **onboarding_conv_handler_kwargs,
+    )
+else:
+    onboarding_conv_handler = ConversationHandler(**onboarding_conv_handler_kwargs)
\ No newline at end of file
@@ -1,8 +1,8 @@
 import logging
-import os
 from typing import Optional
 
 from pywa_async import WhatsApp, types
+from core.audio_preprocessor import AudioTooLongError
 from core.audio_processor import AudioProcessor
 from core.message_processor import MessageProcessor
 from core.feature_flag import (
@@ -12,6 +12,7 @@ from core.feature_flag import (
 )
 from integrations.platforms.whatsapp_adapter import WhatsAppV2Adapter
 from core.user_data_manager import UserDataManager
+from core.utils.deadline import Deadline
 from api.whatsapp.messages import messages
 from config import config
 
@@ -35,17 +36,18 @@ class WhatsAppV2AudioHandler:
         self.message_processor = MessageProcessor()
         self.user_manager = UserDataManager()
 
-    async def handle_audio_message(self, message: types.Message) -> None:
+    async def handle_audio_message(self, message: types.Message, deadline: Optional[Deadline] = None) -> None:
         """
         Handles incoming voice messages and calls the audio processor.
         
         Args:
             message: The WhatsApp message object containing the voice message
+            deadline: The time budget of the message, started when its webhook was received
         """
+        deadline = deadline or Deadline.for_message()
         platform = None
         platform_user_id = None
         message_id = None
-        path = None
         
         try:
             # Initialize platform adapter without user
@@ -84,30 +86,24 @@ class WhatsAppV2AudioHandler:
                 await platform.reply_text(messages.MSG_UNEXPECTED_ERROR)
                 return
 
-            # Download audio file
-            path = await audio.download()
-
-            # Process audio
-            transcription_result = await self.audio_processor.process_audio(platform, path)
+            # Process audio (downloaded into memory by the adapter)
+            transcription_result = await self.audio_processor.process_audio(platform, deadline)
             logger.info(f"Audio transcription result: {transcription_result}")
             
             if transcription_result:
                 user_message = platform.map_to_message(message_text=transcription_result)
                 await self.message_processor.process_and_respond(
                     user_message=user_message,
-                    platform=platform
+                    platform=platform,
+                    deadline=deadline
                 )
             else:
                 await platform.reply_text(messages.MSG_VOICE_NO_TEXT)
 
+        except AudioTooLongError as e:
+            logger.info(f"Voice message rejected. User: {platform_user_id}, Message ID: {message_id}: {e}")
+            await platform.reply_text(messages.MSG_VOICE_TOO_LONG.format(max_duration=e.max_duration_secs))
         except Exception as e:
             logger.error(f"Error handling voice message. User: {platform_user_id}, Message ID: {message_id}, Error: {str(e)}")
             if platform:
                 await platform.reply_text(messages.MSG_VOICE_PROCESSING_ERROR)
-        finally:
-            # Clean up the audio file if it exists
-            if path and os.path.exists(path):
-                try:
-                    os.remove(path)
-                except Exception as e:
-                    logger.error(f"Error removing temporary audio file {path}: {str(e)}")
@@ -1,15 +1,22 @@
+import asyncio
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 from pywa_async import WhatsApp, types
 from core.message_processor import MessageProcessor
 from core.user_data_manager import UserDataManager
+from core.utils.deadline import Deadline
 from integrations.platforms.whatsapp_adapter import WhatsAppV2Adapter
 from api.whatsapp.messages import messages
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Buttons of the batch confirmation message. The original message keeps its buttons,
+# WhatsApp messages can't be edited, so the updated list is sent back with the buttons
+# of the items still pending.
+BATCH_CALLBACK_TYPES = ("confirmall", "cancelall", "confirmitem", "cancelitem")
+
 class WhatsAppV2CallbackHandler:
     """
     Handler for WhatsApp button callbacks using PyWa library.
@@ -47,11 +54,19 @@ class WhatsAppV2CallbackHandler:
             logger.error(f"Error extracting message ID from button: {str(e)}")
             return None
 
-    async def handle_callback(self, callback: types.CallbackButton) -> None:
+    async def handle_callback(
+        self, callback: Union[types.CallbackButton, types.CallbackSelection], deadline: Optional[Deadline] = None
+    ) -> None:
         """
-        Handle button callbacks from WhatsApp.
+        Handle button callbacks from WhatsApp, and the rows selected in list messages
+        (sent instead of buttons when there are more than 3).
+
+        Args:
+            callback: The button callback or list selection
+            deadline: The time budget of the callback, started when its webhook was received
         """
         platform = None
+        deadline = deadline or Deadline.for_message()
         try:
             # Extraer el tipo de callback y el ID del mensaje
             callback_type, message_id = callback.data.split('#')
@@ -59,11 +74,29 @@ class WhatsAppV2CallbackHandler:
             platform= WhatsAppV2Adapter(self.wa, callback, user)
         
 
-            if callback_type == "confirm":
-                response = self.message_processor.save_and_respond(
+            if callback_type in BATCH_CALLBACK_TYPES:
+                batch_id, confirm, index = self.message_processor.parse_batch_callback(callback.data)
+                # Storage writes are blocking, keep them off the event loop
+                response, buttons = await asyncio.to_thread(
+                    self.message_processor.resolve_batch_and_respond,
+                    user_id=user.id,
+                    batch_id=batch_id,
+                    platform=platform,
+                    confirm=confirm,
+                    index=index,
+                    deadline=deadline
+                )
+                if buttons:
+                    await platform.reply_with_buttons(text=response, buttons=buttons)
+                    return
+            elif callback_type == "confirm":
+                # Storage writes are blocking, keep them off the event loop
+                response = await asyncio.to_thread(
+                    self.message_processor.save_and_respond,
                     user_id=user.id,
                     message_id=message_id,
-                    platform=platform
+                    platform=platform,
+                    deadline=deadline
                 )
             elif callback_type == "cancel":
                 response = self.message_processor.cancel_and_respond(
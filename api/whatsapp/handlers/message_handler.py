@@ -5,6 +5,7 @@ import re
 from pywa_async import WhatsApp, types
 from core.message_processor import MessageProcessor
 from core.user_data_manager import UserDataManager
+from core.utils.deadline import Deadline
 from integrations.platforms.whatsapp_adapter import WhatsAppV2Adapter
 from config import config
 from api.whatsapp.messages import messages
@@ -120,13 +121,15 @@ class WhatsAppV2MessageHandler:
             logger.error(f"Error handling linking code. User: {whatsapp_user_id}, Code: {linking_code}, Error: {str(e)}")
             await platform.reply_text(messages.MSG_UNEXPECTED_ERROR)
 
-    async def handle_message(self, message: types.Message) -> None:
+    async def handle_message(self, message: types.Message, deadline: Optional[Deadline] = None) -> None:
         """
         Main entry point for handling WhatsApp messages.
         
         Args:
             message: The WhatsApp message object from PyWa
+            deadline: The time budget of the message, started when its webhook was received
         """
+        deadline = deadline or Deadline.for_message()
         platform = None
         platform_user_id = None
         message_id = None
@@ -173,7 +176,8 @@ class WhatsAppV2MessageHandler:
             user_message = platform.map_to_message()
             await self.message_processor.process_and_respond(
                 user_message=user_message,
-                platform=platform
+                platform=platform,
+                deadline=deadline
             )
 
         except Exception as e:
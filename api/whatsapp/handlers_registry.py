@@ -1,13 +1,24 @@
+import dataclasses
+import json
 import logging
-import asyncio
+from functools import partial
+from typing import List, Optional
 
 from pywa_async import WhatsApp, types, filters
 from api.whatsapp.handlers.message_handler import WhatsAppV2MessageHandler
 from api.whatsapp.handlers.callback_handler import WhatsAppV2CallbackHandler
 from api.whatsapp.handlers.audio_hanlder import WhatsAppV2AudioHandler
+from core.message_coalescer import message_coalescer
+from core.messages import OVERLOADED_MESSAGE
+from core.models.common.source import Source
+from core.scheduler import Priority, scheduler
+from core.utils.deadline import Deadline
+from integrations.platforms.whatsapp_adapter import WhatsAppV2Adapter
 
 logger = logging.getLogger(__name__)
 
+WHATSAPP_UPDATE_JOB = "whatsapp_update"
+
 class WhatsAppV2Handlers:
     """
     Main handler for WhatsApp v2 that acts as a middleware to distribute messages to specific handlers.
@@ -26,23 +37,95 @@ class WhatsAppV2Handlers:
         self.callback_handler = WhatsAppV2CallbackHandler(wa)
         self.audio_handler = WhatsAppV2AudioHandler(wa)
 
+    def _resume_payload(self, update, text: Optional[str] = None) -> dict:
+        """
+        Builds the data needed to replay an update if it is interrupted by a shutdown.
+
+        Args:
+            update: The pywa update (message or callback)
+            text: The text to replay instead of the one received, for merged messages
+        """
+        raw = update.raw.raw.decode("utf-8")
+        if text is not None:
+            data = json.loads(raw)
+            data["entry"][0]["changes"][0]["value"]["messages"][0]["text"]["body"] = text
+            raw = json.dumps(data)
+        return {"raw": raw}
+
+    def _reply_overloaded(self, msg: types.Message):
+        """
+        Returns the reply sent when a message is shed because the pipeline backlog is full.
+
+        Args:
+            msg: The pywa message that was not processed
+        """
+        return lambda: WhatsAppV2Adapter(self.wa, msg).reply_text(OVERLOADED_MESSAGE)
+
+    def _serial_key(self, msg: types.Message) -> str:
+        """
+        Returns the key that orders the messages of a user (see PriorityScheduler).
+        Button callbacks and list selections are submitted without it, so a tap never
+        waits for the next message of the user to be processed.
+
+        Args:
+            msg: The pywa message
+        """
+        return msg.from_user.wa_id
+
+    def _merge_messages(self, messages: List[types.Message]) -> types.Message:
+        """
+        Returns the first message with the text of all of them, one per line (see MessageCoalescer).
+
+        Args:
+            messages: The pywa text messages of a user, in arrival order
+        """
+        return dataclasses.replace(messages[0], text="\n".join(message.text for message in messages))
+
+    def _submit_text(self, msg: types.Message, priority: Priority, deadline: Deadline) -> None:
+        """
+        Schedules the processing of a text message in its lane.
+
+        Args:
+            msg: The pywa message, merged if several were coalesced
+            priority: The lane of the message
+            deadline: The time budget, started when the (first) message was received
+        """
+        scheduler.submit(self.message_handler.handle_message(msg, deadline), priority, name=f"whatsapp-text-{msg.id}",
+                         kind=WHATSAPP_UPDATE_JOB, payload=self._resume_payload(msg, text=msg.text),
+                         on_rejected=self._reply_overloaded(msg), serial_key=self._serial_key(msg))
+
     def register_handlers(self) -> None:
         """
         Register all the handlers with the WhatsApp client.
         This method sets up all the necessary event handlers.
         """
+        # Each update's deadline starts here, when the webhook is received, so the time
+        # it waits in the scheduler counts against its budget
+
         # Register message handler for text messages
         @self.wa.on_message(filters=filters.text)
         async def on_message(client: WhatsApp, msg: types.Message):
             logger.info(f"[WhatsApp][Text] Received message from webhook | Message ID: {msg.id}")
-            asyncio.create_task(self.message_handler.handle_message(msg))
+            # Linking messages are onboarding steps and don't go through the LLM
+            if self.message_handler._is_linking_message(msg.text or ""):
+                self._submit_text(msg, Priority.FAST, Deadline.for_message())
+            else:
+                # Typed LLM messages wait here for the next ones of the user, without holding a slot
+                message_coalescer.add(
+                    (Source.WHATSAPP, self._serial_key(msg)), msg, self._merge_messages,
+                    partial(self._submit_text, priority=Priority.SLOW, deadline=Deadline.for_message()),
+                )
             logger.info(f"[WhatsApp][Text] Message processing task created | Message ID: {msg.id}")
 
         # Register audio handler
         @self.wa.on_message(filters=filters.audio)
         async def on_audio(client: WhatsApp, msg: types.Message):
             logger.info(f"[WhatsApp][Audio] Received audio message from webhook | Message ID: {msg.id}")
-            asyncio.create_task(self.audio_handler.handle_audio_message(msg))
+            # Held text messages of the user go first
+            message_coalescer.flush((Source.WHATSAPP, self._serial_key(msg)))
+            scheduler.submit(self.audio_handler.handle_audio_message(msg, Deadline.for_message()), Priority.SLOW, name=f"whatsapp-audio-{msg.id}",
+                             kind=WHATSAPP_UPDATE_JOB, payload=self._resume_payload(msg),
+                             on_rejected=self._reply_overloaded(msg), serial_key=self._serial_key(msg))
             logger.info(f"[WhatsApp][Audio] Audio message processing task created | Message ID: {msg.id}")
             
 
@@ -50,14 +133,27 @@ class WhatsAppV2Handlers:
         @self.wa.on_message(filters=filters.voice)
         async def on_voice(client: WhatsApp, msg: types.Message):
             logger.info(f"[WhatsApp][Voice] Received voice message from webhook | Message ID: {msg.id}")
-            asyncio.create_task(self.audio_handler.handle_audio_message(msg))
+            # Held text messages of the user go first
+            message_coalescer.flush((Source.WHATSAPP, self._serial_key(msg)))
+            scheduler.submit(self.audio_handler.handle_audio_message(msg, Deadline.for_message()), Priority.SLOW, name=f"whatsapp-voice-{msg.id}",
+                             kind=WHATSAPP_UPDATE_JOB, payload=self._resume_payload(msg),
+                             on_rejected=self._reply_overloaded(msg), serial_key=self._serial_key(msg))
             logger.info(f"[WhatsApp][Voice] Voice message processing task created | Message ID: {msg.id}")
 
         # Register callback handler
         @self.wa.on_callback_button()
         async def on_callback(client: WhatsApp, callback: types.CallbackButton):
             logger.info(f"[WhatsApp][Callback] Received callback event | Callback ID: {callback.id}")
-            asyncio.create_task(self.callback_handler.handle_callback(callback))
+            scheduler.submit(self.callback_handler.handle_callback(callback, Deadline.for_message()), Priority.FAST, name=f"whatsapp-callback-{callback.id}",
+                             kind=WHATSAPP_UPDATE_JOB, payload=self._resume_payload(callback))
             logger.info(f"[WhatsApp][Callback] Callback processing task created | Callback ID: {callback.id}")
 
+        # Register list selection handler (batch buttons sent as a list message)
+        @self.wa.on_callback_selection()
+        async def on_selection(client: WhatsApp, selection: types.CallbackSelection):
+            logger.info(f"[WhatsApp][Selection] Received selection event | Selection ID: {selection.id}")
+            scheduler.submit(self.callback_handler.handle_callback(selection, Deadline.for_message()), Priority.FAST, name=f"whatsapp-selection-{selection.id}",
+                             kind=WHATSAPP_UPDATE_JOB, payload=self._resume_payload(selection))
+            logger.info(f"[WhatsApp][Selection] Selection processing task created | Selection ID: {selection.id}")
+
         logger.info("WhatsApp v2 handlers registered successfully")
@@ -42,4 +42,5 @@ MSG_UNEXPECTED_ERROR = (
 
 # Voice Processing Messages
 MSG_VOICE_NO_TEXT = "❌ *No pude entender el mensaje de voz*\n\nPor favor, intentá enviar el mensaje nuevamente o escribí el texto directamente 📝"
-MSG_VOICE_PROCESSING_ERROR = "❌ *Hubo un error al procesar el mensaje de voz*\n\nPor favor, intentá nuevamente en unos minutos 🎙️"
\ No newline at end of file
+MSG_VOICE_PROCESSING_ERROR = "❌ *Hubo un error al procesar el mensaje de voz*\n\nPor favor, intentá nuevamente en unos minutos 🎙️"
+MSG_VOICE_TOO_LONG = "⏱️ *El mensaje de voz es demasiado largo*\n\nPor favor, enviá audios de hasta {max_duration} segundos 🎙️"
\ No newline at end of file
@@ -3,17 +3,36 @@ import asyncio
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
+from http import HTTPStatus
 from pathlib import Path
 
 import uvicorn
 from asgiref.wsgi import WsgiToAsgi
 from flask import Flask
-
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from config import config
+from core.llm_processor.single_flight import llm_single_flight
+from core.llm_processor.speculation import speculation_policy
+from core.message_coalescer import message_coalescer
+from core.prompt_registry import prompt_registry
+from core.services.llm_response_cache_service import llm_response_cache_service
+from core.services.transcription_cache_service import transcription_cache_service
+from core.task_supervisor import task_supervisor
+from core.utils.metrics import metrics
+from integrations.platforms.outbound_dispatcher import outbound_dispatcher
+from integrations.providers.llm_akash import akash_rate_limiter
+from integrations.transcriptor.client import transcription_client
+import telegram_bot
+import whatsapp_bot
 from telegram_bot import app as telegram_app
-from telegram_bot import application as telegram_application
-from telegram_bot import initialize_telegram
+from telegram_bot import initialize_telegram, shutdown_telegram
 from whatsapp_bot import app as whatsapp_app
-from whatsapp_bot import initialize_whatsapp
+from whatsapp_bot import initialize_whatsapp, shutdown_whatsapp
 
 
 # Configure logging
@@ -119,43 +138,173 @@ app.register_blueprint(telegram_app, url_prefix="/telegram")
 app.register_blueprint(whatsapp_app, url_prefix="/whatsapp")
 
 
+HOME_MESSAGE = "Quipu Multi-Service Financial Bot is running!"
+
+
+def get_health_status() -> dict:
+    return {"status": "healthy", "services": ["telegram", "whatsapp"]}
+
+
+def get_metrics() -> dict:
+    return {
+        **metrics.snapshot(),
+        "tasks": task_supervisor.stats(),
+        "transcription_cache": transcription_cache_service.stats(),
+        "llm_response_cache": llm_response_cache_service.stats(),
+        "llm_speculation": speculation_policy.stats(),
+        "llm_single_flight": llm_single_flight.stats(),
+        "llm_akash_rate_limits": akash_rate_limiter.stats(),
+        "prompt_variants": prompt_registry.active(),
+        "message_coalescer": message_coalescer.stats(),
+        "outbound": outbound_dispatcher.stats(),
+    }
+
+
 @app.route("/")
 def home():
     logger.info("Home endpoint accessed")
-    return "Quipu Multi-Service Financial Bot is running!"
+    return HOME_MESSAGE
 
 
 @app.route("/healthcheck")
 def healthcheck():
     logger.info("Health check endpoint accessed")
-    return {"status": "healthy", "services": ["telegram", "whatsapp"]}
+    return get_health_status()
 
 
-async def initialize_services(debug: bool = False):
-    """Initialize both services"""
+@app.route("/metrics")
+def metrics_endpoint():
+    return get_metrics()
+
+
+async def initialize_services(debug: bool = False, server=app):
+    """
+    Initialize both services
+
+    Args:
+        debug (bool): Run in debug mode.
+        server: The root app (Flask or Starlette) where pywa registers the WhatsApp webhook.
+    """
     try:
         logger.info("Initializing services...")
         await asyncio.gather(
             initialize_telegram(debug=debug),
-            initialize_whatsapp(debug=debug, flask_app=app),
+            initialize_whatsapp(debug=debug, server=server),
+            transcription_client.start(),
         )
         logger.info("Services initialized successfully")
+        await task_supervisor.resume_pending_jobs()
     except Exception as e:
         logger.error(f"Error initializing services: {e}")
         raise
 
 
 async def shutdown_services():
-    """Shutdown both services"""
+    """Shutdown both services, draining in-progress jobs first"""
     try:
         logger.info("Shutting down services...")
-        await telegram_application.stop()
-        # Add WhatsApp shutdown if needed
+        # Held messages are submitted, so they are processed or persisted by the drain
+        message_coalescer.flush_all()
+        await task_supervisor.drain(timeout=config.SHUTDOWN_DRAIN_TIMEOUT_SECS)
+        await shutdown_telegram()
+        await shutdown_whatsapp()
+        await transcription_client.close()
         logger.info("Services shut down successfully")
     except Exception as e:
         logger.error(f"Error shutting down services: {e}")
 
 
+class ServicesLifespan:
+    """
+    ASGI wrapper that initializes and shuts down the services through the lifespan protocol.
+    Used in multi-worker mode, where each worker process runs its own services.
+    """
+
+    def __init__(self, asgi_app):
+        self.asgi_app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            await self.asgi_app(scope, receive, send)
+            return
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await initialize_services(config.DEBUG)
+                    await send({"type": "lifespan.startup.complete"})
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+            elif message["type"] == "lifespan.shutdown":
+                await shutdown_services()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+# Entry point for multi-worker mode: uvicorn imports it in every worker process
+asgi_app = ServicesLifespan(WsgiToAsgi(app))
+
+
+def create_starlette_app() -> Starlette:
+    """
+    Creates the native ASGI app (SERVER_MODE=asgi).
+
+    Exposes the same routes as the Flask app without the WsgiToAsgi thread hop.
+    pywa registers the WhatsApp webhook routes on it during startup.
+    """
+
+    async def starlette_home(request: Request) -> Response:
+        return PlainTextResponse(HOME_MESSAGE)
+
+    async def starlette_healthcheck(request: Request) -> Response:
+        return JSONResponse(get_health_status())
+
+    async def starlette_metrics(request: Request) -> Response:
+        return JSONResponse(get_metrics())
+
+    async def starlette_telegram_webhook(request: Request) -> Response:
+        try:
+            data = await request.json()
+        except ValueError:
+            return Response(status_code=HTTPStatus.BAD_REQUEST)
+        return Response(status_code=await telegram_bot.enqueue_update(data))
+
+    async def starlette_telegram_healthcheck(request: Request) -> Response:
+        return JSONResponse(telegram_bot.get_health_status())
+
+    async def starlette_telegram_version(request: Request) -> Response:
+        return JSONResponse({"version": telegram_bot.get_version()})
+
+    async def starlette_whatsapp_home(request: Request) -> Response:
+        return PlainTextResponse("WhatsApp Bot is running!")
+
+    async def starlette_whatsapp_healthcheck(request: Request) -> Response:
+        return JSONResponse(whatsapp_bot.get_health_status())
+
+    @asynccontextmanager
+    async def lifespan(server: Starlette):
+        await initialize_services(config.DEBUG, server=server)
+        yield
+        await shutdown_services()
+
+    # Flat routes: a Mount on /whatsapp would shadow the webhook route pywa adds later
+    return Starlette(
+        routes=[
+            Route("/", starlette_home),
+            Route("/healthcheck", starlette_healthcheck),
+            Route("/metrics", starlette_metrics),
+            Route("/telegram/webhook", starlette_telegram_webhook, methods=["POST"]),
+            Route("/telegram/healthcheck", starlette_telegram_healthcheck),
+            Route("/telegram/version", starlette_telegram_version),
+            Route("/whatsapp/", starlette_whatsapp_home),
+            Route("/whatsapp/healthcheck", starlette_whatsapp_healthcheck),
+        ],
+        lifespan=lifespan,
+    )
+
+
 def main_cli():
     """CLI entry point with argument parsing"""
     parser = argparse.ArgumentParser(description="Quipu Multi-Service Financial Bot")
@@ -169,9 +318,49 @@ def main_cli():
         "--host", default="0.0.0.0", help="Host to bind to (default: 0.0.0.0)"
     )
     parser.add_argument("--debug", action="store_true", help="Run in debug mode")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.WORKERS,
+        help="Number of worker processes (default: 1). More than one requires TELEGRAM_REDIS_PERSISTENCE=true",
+    )
+    parser.add_argument(
+        "--server",
+        choices=["flask", "asgi"],
+        default=config.SERVER_MODE,
+        help="flask: Flask wrapped with WsgiToAsgi, asgi: native Starlette app (default: flask)",
+    )
 
     args = parser.parse_args()
 
+    if args.workers > 1:
+        if not config.TELEGRAM_REDIS_PERSISTENCE:
+            parser.error("--workers > 1 requires TELEGRAM_REDIS_PERSISTENCE=true")
+        # Each worker initializes and shuts down its own services through the ASGI lifespan
+        logger.info(f"Starting {args.server} server on {args.host}:{args.port} with {args.workers} workers")
+        uvicorn.run(
+            "app:create_starlette_app" if args.server == "asgi" else "app:asgi_app",
+            factory=args.server == "asgi",
+            port=args.port,
+            host=args.host,
+            workers=args.workers,
+            lifespan="on",
+            log_level="debug" if args.debug else "info",
+        )
+        return
+
+    if args.server == "asgi":
+        # Services are initialized and shut down by the app lifespan
+        logger.info(f"Starting asgi server on {args.host}:{args.port}")
+        uvicorn.run(
+            create_starlette_app(),
+            port=args.port,
+            host=args.host,
+            lifespan="on",
+            log_level="debug" if args.debug else "info",
+        )
+        return
+
     async def run_server():
         try:
             # Initialize services
@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -13,15 +13,98 @@ class Config:
     OPENAI_CHAT_COMPLETIONS_MODEL = os.getenv(
         "OPENAI_CHAT_COMPLETIONS_MODEL", "gpt-4.1-nano"
     )
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", 20))  # Timeout in seconds of the fallback LLM
     LLM_AKASH_RETRIES: int = os.getenv("LLM_AKASH_RETRIES", 0)
     AKASH_API_BASE_URL: str = os.getenv("AKASH_API_BASE_URL")
     AKASH_API_KEY: List[str] = (
         os.getenv("AKASH_API_KEY").split(",") if os.getenv("AKASH_API_KEY") else []
     )
+    # Quotas of each Akash key, in the order of AKASH_API_KEY (a single value applies to every key).
+    # 0 means unlimited. Shared by all the workers through Redis.
+    LLM_AKASH_REQUESTS_PER_MIN: List[int] = [
+        int(value) for value in (os.getenv("LLM_AKASH_REQUESTS_PER_MIN") or "0").split(",")
+    ]
+    LLM_AKASH_TOKENS_PER_MIN: List[int] = [
+        int(value) for value in (os.getenv("LLM_AKASH_TOKENS_PER_MIN") or "0").split(",")
+    ]
+    # Longest a request waits for a key with capacity before falling back to OpenAI
+    LLM_AKASH_MAX_QUEUE_SECS: float = float(os.getenv("LLM_AKASH_MAX_QUEUE_SECS", 2))
+    # Threads running the blocking LLM calls (and their wait for key quota), apart from the default executor
+    LLM_THREAD_POOL_SIZE: int = int(os.getenv("LLM_THREAD_POOL_SIZE", 16))
     LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME", "DeepSeek-R1-Distill-Qwen-32B")
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.2"))
     LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 10))  # Timeout in seconds
     LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 1))
+    # Per stage model settings, default to the global LLM settings.
+    # Costs are USD per million tokens, only used to report the cost per stage.
+    # Action detection
+    LLM_CLASSIFICATION_MODEL: str = os.getenv("LLM_CLASSIFICATION_MODEL") or LLM_MODEL_NAME
+    LLM_CLASSIFICATION_TEMPERATURE: float = float(os.getenv("LLM_CLASSIFICATION_TEMPERATURE") or LLM_TEMPERATURE)
+    LLM_CLASSIFICATION_TIMEOUT: float = float(os.getenv("LLM_CLASSIFICATION_TIMEOUT") or LLM_TIMEOUT)
+    LLM_CLASSIFICATION_MAX_TOKENS: Optional[int] = (
+        int(os.getenv("LLM_CLASSIFICATION_MAX_TOKENS")) if os.getenv("LLM_CLASSIFICATION_MAX_TOKENS") else None
+    )
+    LLM_CLASSIFICATION_INPUT_COST_PER_1M: float = float(os.getenv("LLM_CLASSIFICATION_INPUT_COST_PER_1M") or 0)
+    LLM_CLASSIFICATION_OUTPUT_COST_PER_1M: float = float(os.getenv("LLM_CLASSIFICATION_OUTPUT_COST_PER_1M") or 0)
+    # Transaction extraction
+    LLM_EXTRACTION_MODEL: str = os.getenv("LLM_EXTRACTION_MODEL") or LLM_MODEL_NAME
+    LLM_EXTRACTION_TEMPERATURE: float = float(os.getenv("LLM_EXTRACTION_TEMPERATURE") or LLM_TEMPERATURE)
+    LLM_EXTRACTION_TIMEOUT: float = float(os.getenv("LLM_EXTRACTION_TIMEOUT") or LLM_TIMEOUT)
+    LLM_EXTRACTION_MAX_TOKENS: Optional[int] = (
+        int(os.getenv("LLM_EXTRACTION_MAX_TOKENS")) if os.getenv("LLM_EXTRACTION_MAX_TOKENS") else None
+    )
+    LLM_EXTRACTION_INPUT_COST_PER_1M: float = float(os.getenv("LLM_EXTRACTION_INPUT_COST_PER_1M") or 0)
+    LLM_EXTRACTION_OUTPUT_COST_PER_1M: float = float(os.getenv("LLM_EXTRACTION_OUTPUT_COST_PER_1M") or 0)
+    # Answers to questions and social messages
+    LLM_CONVERSATION_MODEL: str = os.getenv("LLM_CONVERSATION_MODEL") or LLM_MODEL_NAME
+    LLM_CONVERSATION_TEMPERATURE: float = float(os.getenv("LLM_CONVERSATION_TEMPERATURE") or LLM_TEMPERATURE)
+    LLM_CONVERSATION_TIMEOUT: float = float(os.getenv("LLM_CONVERSATION_TIMEOUT") or LLM_TIMEOUT)
+    LLM_CONVERSATION_MAX_TOKENS: Optional[int] = (
+        int(os.getenv("LLM_CONVERSATION_MAX_TOKENS")) if os.getenv("LLM_CONVERSATION_MAX_TOKENS") else None
+    )
+    LLM_CONVERSATION_INPUT_COST_PER_1M: float = float(os.getenv("LLM_CONVERSATION_INPUT_COST_PER_1M") or 0)
+    LLM_CONVERSATION_OUTPUT_COST_PER_1M: float = float(os.getenv("LLM_CONVERSATION_OUTPUT_COST_PER_1M") or 0)
+    # Send answers to questions and social messages while they are generated
+    LLM_STREAMING_RESPONSES: bool = (
+        os.getenv("LLM_STREAMING_RESPONSES", "true").lower() == "true"
+    )
+    # Cache of LLM results for repeated messages (actions and plain answers, never transactions)
+    LLM_CACHE_ENABLED: bool = (
+        os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    )
+    LLM_CACHE_TTL_SECS: int = int(os.getenv("LLM_CACHE_TTL_SECS", 24 * 60 * 60))
+    LLM_CACHE_LOCAL_SIZE: int = int(os.getenv("LLM_CACHE_LOCAL_SIZE", 512))
+    LLM_CACHE_MAX_CONTENT_CHARS: int = int(os.getenv("LLM_CACHE_MAX_CONTENT_CHARS", 200))
+    # Run the transaction extraction concurrently with the action detection (opt-in),
+    # only while the share of transactions among recent messages is above the threshold
+    LLM_SPECULATIVE_EXTRACTION: bool = (
+        os.getenv("LLM_SPECULATIVE_EXTRACTION", "false").lower() == "true"
+    )
+    LLM_SPECULATION_MIN_TRANSACTION_RATIO: float = float(os.getenv("LLM_SPECULATION_MIN_TRANSACTION_RATIO", 0.6))
+    LLM_SPECULATION_WINDOW: int = int(os.getenv("LLM_SPECULATION_WINDOW", 200))
+    # Identical messages of a user processed at the same time share one LLM pipeline run,
+    # across workers through a Redis lock. Results are kept for the redelivered duplicates.
+    LLM_SINGLE_FLIGHT_ENABLED: bool = (
+        os.getenv("LLM_SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    )
+    LLM_SINGLE_FLIGHT_LOCK_SECS: int = int(os.getenv("LLM_SINGLE_FLIGHT_LOCK_SECS", 60))
+    LLM_SINGLE_FLIGHT_RESULT_SECS: int = int(os.getenv("LLM_SINGLE_FLIGHT_RESULT_SECS", 15))
+    # Prompt variant served per prompt name (see core/prompt_registry.py), e.g. "transaction=compact".
+    # Prompts not listed use the "full" variant
+    LLM_PROMPT_VARIANTS: Dict[str, str] = {
+        name.strip(): variant.strip()
+        for name, variant in (
+            item.split("=", 1) for item in (os.getenv("LLM_PROMPT_VARIANTS") or "").split(",") if "=" in item
+        )
+    }
+    # Fields of extracted transactions that can't be repaired locally (amount, category)
+    # are extracted again with a targeted LLM call
+    LLM_VALIDATOR_LLM_REPAIR: bool = (
+        os.getenv("LLM_VALIDATOR_LLM_REPAIR", "true").lower() == "true"
+    )
+    # Time budget of a user message from its arrival to the reply, shared by the
+    # transcription, the LLM calls (retries and fallback included) and the storage writes
+    MESSAGE_DEADLINE_SECS: float = float(os.getenv("MESSAGE_DEADLINE_SECS", 60))
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN")
     GOOGLE_CREDENTIALS: str = os.getenv("GOOGLE_CREDENTIALS")
     GOOGLE_SHEET_TEMPLATE_URL: str = os.getenv("GOOGLE_SHEET_TEMPLATE_URL")
@@ -40,6 +123,10 @@ class Config:
     REDIS_DB: int = int(os.getenv("REDIS_DB", 0))
     REDIS_SSL: bool = os.getenv("REDIS_SSL", "false").lower() == "true"
     REDIS_USERNAME: str = os.getenv("REDIS_USERNAME")
+    # Store Telegram conversation state in Redis. Required to run several workers.
+    TELEGRAM_REDIS_PERSISTENCE: bool = (
+        os.getenv("TELEGRAM_REDIS_PERSISTENCE", "false").lower() == "true"
+    )
     FF_TRANSFER: bool = os.getenv("FF_TRANSFER", "true").lower() == "true"
     FF_EXCHANGE: bool = os.getenv("FF_EXCHANGE", "true").lower() == "true"
     FF_TRANSACTION: bool = os.getenv("FF_TRANSACTION", "true").lower() == "true"
@@ -47,10 +134,68 @@ class Config:
     WEBAPP_BASE_URL: str = os.getenv("WEBAPP_BASE_URL")
     MAX_DURATION_AUDIO_IN_SECS: int = int(os.getenv("MAX_DURATION_AUDIO_IN_SECS", 60))
 
+    # Transcription service HTTP client settings
+    TRANSCRIPTION_POOL_SIZE: int = int(os.getenv("TRANSCRIPTION_POOL_SIZE", 10))
+    TRANSCRIPTION_KEEPALIVE_SECS: float = float(os.getenv("TRANSCRIPTION_KEEPALIVE_SECS", 60))
+    TRANSCRIPTION_CONNECT_TIMEOUT_SECS: float = float(os.getenv("TRANSCRIPTION_CONNECT_TIMEOUT_SECS", 5))
+    TRANSCRIPTION_TIMEOUT_SECS: float = float(os.getenv("TRANSCRIPTION_TIMEOUT_SECS", 120))
+    TRANSCRIPTION_MAX_RETRIES: int = int(os.getenv("TRANSCRIPTION_MAX_RETRIES", 2))
+
+    # Audio pre-processing before transcription (requires ffmpeg, skipped if it is not installed)
+    AUDIO_PREPROCESSING_ENABLED: bool = (
+        os.getenv("AUDIO_PREPROCESSING_ENABLED", "true").lower() == "true"
+    )
+    FFMPEG_PATH: str = os.getenv("FFMPEG_PATH", "ffmpeg")
+    AUDIO_SILENCE_THRESHOLD_DB: int = int(os.getenv("AUDIO_SILENCE_THRESHOLD_DB", -45))
+    AUDIO_TARGET_BITRATE: str = os.getenv("AUDIO_TARGET_BITRATE", "16k")
+    # Split long voice notes at pauses and transcribe the segments in parallel (requires ffmpeg)
+    TRANSCRIPTION_CHUNKING_ENABLED: bool = (
+        os.getenv("TRANSCRIPTION_CHUNKING_ENABLED", "false").lower() == "true"
+    )
+    TRANSCRIPTION_CHUNK_TARGET_SECS: float = float(os.getenv("TRANSCRIPTION_CHUNK_TARGET_SECS", 15))
+    TRANSCRIPTION_CHUNK_MIN_AUDIO_SECS: float = float(os.getenv("TRANSCRIPTION_CHUNK_MIN_AUDIO_SECS", 25))
+    TRANSCRIPTION_CHUNK_CONCURRENCY: int = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", 3))
+    # Transcription cache (Redis, with an in-process fallback)
+    TRANSCRIPTION_CACHE_TTL_SECS: int = int(os.getenv("TRANSCRIPTION_CACHE_TTL_SECS", 7 * 24 * 60 * 60))
+    TRANSCRIPTION_CACHE_LOCAL_SIZE: int = int(os.getenv("TRANSCRIPTION_CACHE_LOCAL_SIZE", 256))
+
+    # Admission control settings
+    ADMISSION_MAX_CONCURRENT: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", 8))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", 32))
+    ADMISSION_MAX_PER_USER: int = int(os.getenv("ADMISSION_MAX_PER_USER", 2))
+    ADMISSION_OVERLOAD_POLICY: str = os.getenv("ADMISSION_OVERLOAD_POLICY", "reject").lower()
+    ADMISSION_MAX_WAIT_SECS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECS", 30))
+
+    # Update scheduler settings (priority lanes)
+    SCHEDULER_MAX_CONCURRENT: int = int(os.getenv("SCHEDULER_MAX_CONCURRENT", 16))
+    SCHEDULER_FAST_LANE_RESERVED: int = int(os.getenv("SCHEDULER_FAST_LANE_RESERVED", 4))
+    # Keep it below the service stop timeout (TimeoutStopSec=30 in quipu.service)
+    SHUTDOWN_DRAIN_TIMEOUT_SECS: float = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT_SECS", 20))
+    # Outbound platform requests (rate limits in requests per second)
+    OUTBOUND_TELEGRAM_GLOBAL_RATE: float = float(os.getenv("OUTBOUND_TELEGRAM_GLOBAL_RATE", 30))
+    OUTBOUND_TELEGRAM_RECIPIENT_RATE: float = float(os.getenv("OUTBOUND_TELEGRAM_RECIPIENT_RATE", 1))
+    OUTBOUND_WHATSAPP_GLOBAL_RATE: float = float(os.getenv("OUTBOUND_WHATSAPP_GLOBAL_RATE", 80))
+    OUTBOUND_WHATSAPP_RECIPIENT_RATE: float = float(os.getenv("OUTBOUND_WHATSAPP_RECIPIENT_RATE", 1))
+    OUTBOUND_RECIPIENT_BURST: float = float(os.getenv("OUTBOUND_RECIPIENT_BURST", 3))
+    OUTBOUND_MAX_RETRIES: int = int(os.getenv("OUTBOUND_MAX_RETRIES", 3))
+    OUTBOUND_POOL_SIZE: int = int(os.getenv("OUTBOUND_POOL_SIZE", 32))
+    OUTBOUND_KEEPALIVE_SECS: float = float(os.getenv("OUTBOUND_KEEPALIVE_SECS", 60))
+    OUTBOUND_TIMEOUT_SECS: float = float(os.getenv("OUTBOUND_TIMEOUT_SECS", 10))
+    # Status reactions are only sent if the message takes longer than this
+    REACTION_COALESCE_SECS: float = float(os.getenv("REACTION_COALESCE_SECS", 0.3))
+    # Typed messages of a user arriving within the window are merged into one LLM request.
+    # Every new message restarts the window, up to the max wait since the first one.
+    # Opt-in (0 disables it): every typed message is delayed by the window before it is scheduled.
+    MESSAGE_COALESCE_WINDOW_SECS: float = float(os.getenv("MESSAGE_COALESCE_WINDOW_SECS", 0))
+    MESSAGE_COALESCE_MAX_WAIT_SECS: float = float(os.getenv("MESSAGE_COALESCE_MAX_WAIT_SECS", 5))
+
     # Flask settings
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8080))
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+    WORKERS = int(os.getenv("WORKERS", 1))
+    # "flask": Flask app wrapped with WsgiToAsgi. "asgi": native Starlette app
+    SERVER_MODE: str = os.getenv("SERVER_MODE", "flask").lower()
 
     # WhatsApp settings
     WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID")
@@ -112,6 +257,12 @@ class Config:
             float(self.LLM_TEMPERATURE)
         except ValueError:
             raise ValueError("LLM_TEMPERATURE must be a valid float in the .env file.")
+        if self.ADMISSION_OVERLOAD_POLICY not in ("reject", "delay"):
+            raise ValueError(
+                "ADMISSION_OVERLOAD_POLICY must be one of 'reject' or 'delay' in the .env file."
+            )
+        if self.SERVER_MODE not in ("flask", "asgi"):
+            raise ValueError("SERVER_MODE must be one of 'flask' or 'asgi' in the .env file.")
 
 
 # Create and export a single instance of the settings
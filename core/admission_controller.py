@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Dict, Optional
+
+from config import config
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OverloadPolicy(str, Enum):
+    """Defines what happens to new work when the waiting queue is full."""
+
+    REJECT = "reject"
+    DELAY = "delay"
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is not admitted into the processing pipeline."""
+
+    def __init__(self, reason: str, key: Optional[str] = None):
+        super().__init__(f"Request rejected by admission control. Reason: {reason}, Key: {key}")
+        self.reason = reason
+        self.key = key
+
+
+class AdmissionController:
+    """
+    Bounds the amount of concurrent work in the message pipeline.
+
+    - A global limit of requests running at the same time (LLM-bound work).
+    - A bounded waiting queue for requests that arrive while every slot is busy.
+    - A per-key cap (usually the user ID) so one chatty user can't starve others.
+
+    When the queue is full the configured OverloadPolicy applies:
+        REJECT: the request is rejected immediately.
+        DELAY: the request keeps retrying to enter the queue until `max_wait_secs` elapses.
+
+    Queued requests wait at most `max_wait_secs` for a slot before being rejected.
+
+    The backlog (`enter_backlog`) bounds the work before a task is even spawned for it:
+    at most `max_concurrent + max_queue` LLM-bound tasks exist at a time, so under the
+    DELAY policy waiting tasks don't pile up in the supervisor.
+    Must be used from a single event loop (the server loop).
+    """
+
+    QUEUE_RETRY_INTERVAL_SECS = 0.25
+
+    def __init__(
+        self,
+        max_concurrent: int = config.ADMISSION_MAX_CONCURRENT,
+        max_queue: int = config.ADMISSION_MAX_QUEUE,
+        max_per_key: int = config.ADMISSION_MAX_PER_USER,
+        policy: Optional[OverloadPolicy] = None,
+        max_wait_secs: float = config.ADMISSION_MAX_WAIT_SECS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_key = max_per_key
+        self.policy = policy or OverloadPolicy(config.ADMISSION_OVERLOAD_POLICY)
+        self.max_wait_secs = max_wait_secs
+        self.max_backlog = max_concurrent + max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._queued = 0
+        self._backlog = 0
+        self._per_key: Dict[str, int] = defaultdict(int)
+        logger.info(
+            f"AdmissionController initialized. Max concurrent: {max_concurrent}, Max queue: {max_queue}, "
+            f"Max per user: {max_per_key}, Policy: {self.policy.value}, Max wait: {max_wait_secs}s"
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently running."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a free slot."""
+        return self._queued
+
+    @property
+    def backlog(self) -> int:
+        """Number of LLM-bound tasks spawned and not finished yet."""
+        return self._backlog
+
+    def enter_backlog(self) -> bool:
+        """
+        Reserves a place in the backlog before spawning an LLM-bound task.
+        Must be paired with `leave_backlog` once the task ends.
+
+        Returns:
+            bool: Whether the task can be spawned. False when the backlog is full.
+        """
+        if self._backlog >= self.max_backlog:
+            metrics.increment("admission.rejected")
+            metrics.increment("admission.rejected.backlog_full")
+            logger.warning(
+                f"Request rejected by admission control before spawning. Reason: backlog_full, "
+                f"Backlog: {self._backlog}, In flight: {self._in_flight}, Queued: {self._queued}"
+            )
+            return False
+        self._backlog += 1
+        self._publish_gauges()
+        return True
+
+    def leave_backlog(self) -> None:
+        """Releases the backlog place of a finished task."""
+        self._backlog -= 1
+        self._publish_gauges()
+
+    @asynccontextmanager
+    async def admit(self, key: str):
+        """
+        Async context manager that holds a processing slot while the block runs.
+
+        Args:
+            key (str): The key used for the per-key cap (usually the user ID).
+
+        Raises:
+            AdmissionRejectedError: If the request can't be admitted.
+        """
+        self._reserve_key(key)
+        try:
+            await self._acquire_slot(key)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+                self._semaphore.release()
+                self._publish_gauges()
+        finally:
+            self._release_key(key)
+
+    def _reserve_key(self, key: str) -> None:
+        if self._per_key[key] >= self.max_per_key:
+            self._reject("per_user_limit", key)
+        self._per_key[key] += 1
+
+    def _release_key(self, key: str) -> None:
+        self._per_key[key] -= 1
+        if self._per_key[key] <= 0:
+            del self._per_key[key]
+
+    async def _acquire_slot(self, key: str) -> None:
+        if not self._semaphore.locked() and self._queued == 0:
+            await self._semaphore.acquire()
+            self._on_admitted(wait_secs=0)
+            return
+
+        start = time.monotonic()
+        while self._queued >= self.max_queue:
+            if self.policy == OverloadPolicy.REJECT:
+                self._reject("queue_full", key)
+            remaining = self.max_wait_secs - (time.monotonic() - start)
+            if remaining <= 0:
+                self._reject("queue_full_timeout", key)
+            await asyncio.sleep(min(self.QUEUE_RETRY_INTERVAL_SECS, remaining))
+
+        remaining = max(self.max_wait_secs - (time.monotonic() - start), 0)
+        self._queued += 1
+        self._publish_gauges()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=remaining)
+        except asyncio.TimeoutError:
+            self._reject("wait_timeout", key)
+        finally:
+            self._queued -= 1
+            self._publish_gauges()
+
+        self._on_admitted(wait_secs=time.monotonic() - start)
+
+    def _on_admitted(self, wait_secs: float) -> None:
+        self._in_flight += 1
+        metrics.increment("admission.admitted")
+        metrics.observe("admission.wait_seconds", wait_secs)
+        self._publish_gauges()
+
+    def _reject(self, reason: str, key: str) -> None:
+        metrics.increment("admission.rejected")
+        metrics.increment(f"admission.rejected.{reason}")
+        logger.warning(
+            f"Request rejected by admission control. Reason: {reason}, Key: {key}, "
+            f"In flight: {self._in_flight}, Queued: {self._queued}"
+        )
+        raise AdmissionRejectedError(reason, key)
+
+    def _publish_gauges(self) -> None:
+        metrics.set_gauge("admission.in_flight", self._in_flight)
+        metrics.set_gauge("admission.queued", self._queued)
+        metrics.set_gauge("admission.backlog", self._backlog)
+        metrics.set_gauge("admission.saturation", self._in_flight / self.max_concurrent)
+
+
+# Create a global instance
+admission_controller = AdmissionController()
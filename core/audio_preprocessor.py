@@ -0,0 +1,275 @@
+import asyncio
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from config import config
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioPreprocessingError(Exception):
+    """Raised when ffmpeg fails to process an audio clip."""
+    pass
+
+
+class AudioTooLongError(Exception):
+    """Raised when a clip exceeds the maximum duration accepted by the transcription service."""
+
+    def __init__(self, duration_secs: float, max_duration_secs: float):
+        super().__init__(f"Audio duration {duration_secs:.1f}s exceeds the limit of {max_duration_secs}s")
+        self.duration_secs = duration_secs
+        self.max_duration_secs = max_duration_secs
+
+
+@dataclass
+class PreprocessedAudio:
+    """
+    Represents an audio clip ready to be uploaded to the transcription service.
+    """
+    data: bytes = field(metadata={"description": "The processed audio (Ogg Opus, 16 kHz mono)"})
+    duration_secs: Optional[float] = field(metadata={"description": "Duration after trimming silence, None if the audio was not pre-processed"})
+
+
+class AudioPreprocessor:
+    """
+    Shrinks voice notes before they are uploaded to the transcription service.
+
+    Runs a single ffmpeg pass in memory (stdin -> stdout) that trims leading and
+    trailing silence, downmixes to mono, resamples to 16 kHz (what Whisper uses)
+    and re-encodes to low bitrate Opus. Decoding stops right after the maximum
+    duration, so over-limit clips are rejected locally without uploading them.
+
+    ffmpeg is optional: when it is not installed `available` is False and the
+    audio is uploaded as received.
+    """
+    SAMPLE_RATE = 16000
+    # Pauses between words are quieter than speech but louder than the leading/trailing silence
+    PAUSE_THRESHOLD_OFFSET_DB = 10
+    MIN_PAUSE_SECS = 0.4
+
+    def __init__(
+        self,
+        ffmpeg_path: str = config.FFMPEG_PATH,
+        max_duration_secs: float = config.MAX_DURATION_AUDIO_IN_SECS,
+        silence_threshold_db: int = config.AUDIO_SILENCE_THRESHOLD_DB,
+        bitrate: str = config.AUDIO_TARGET_BITRATE,
+        timeout_secs: float = 30,
+    ):
+        self.ffmpeg_path = shutil.which(ffmpeg_path)
+        self.max_duration_secs = max_duration_secs
+        self.silence_threshold_db = silence_threshold_db
+        self.bitrate = bitrate
+        self.timeout_secs = timeout_secs
+        if not self.ffmpeg_path:
+            logger.warning(f"ffmpeg not found at '{ffmpeg_path}'. Audio pre-processing is disabled.")
+
+    @property
+    def available(self) -> bool:
+        """Whether ffmpeg is installed."""
+        return self.ffmpeg_path is not None
+
+    def _build_command(self) -> List[str]:
+        trim_start = f"silenceremove=start_periods=1:start_threshold={self.silence_threshold_db}dB"
+        # silenceremove only trims the start reliably, so the clip is reversed to trim the end
+        audio_filter = f"{trim_start},areverse,{trim_start},areverse"
+        return [
+            self.ffmpeg_path,
+            "-hide_banner", "-nostdin", "-loglevel", "error",
+            "-nostats", "-progress", "pipe:2",
+            "-i", "pipe:0",
+            "-vn", "-af", audio_filter,
+            "-ac", "1", "-ar", str(self.SAMPLE_RATE),
+            "-c:a", "libopus", "-b:a", self.bitrate, "-application", "voip",
+            # One extra second is enough to tell an over-limit clip apart
+            "-t", str(self.max_duration_secs + 1),
+            "-f", "ogg", "pipe:1",
+        ]
+
+    async def _run_ffmpeg(self, command: List[str], audio: bytes) -> Tuple[bytes, str]:
+        """
+        Runs ffmpeg feeding the audio through stdin.
+
+        Returns:
+            Tuple[bytes, str]: The stdout bytes and the stderr text.
+
+        Raises:
+            AudioPreprocessingError: If ffmpeg times out or exits with an error.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(audio), timeout=self.timeout_secs)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise AudioPreprocessingError(f"ffmpeg timed out after {self.timeout_secs}s")
+
+        stderr_text = stderr.decode("utf-8", errors="replace")
+        if process.returncode != 0:
+            errors = [line for line in stderr_text.splitlines() if "=" not in line]
+            raise AudioPreprocessingError(f"ffmpeg exited with code {process.returncode}: {' '.join(errors)[:500]}")
+        return stdout, stderr_text
+
+    @staticmethod
+    def _parse_duration(progress: str) -> float:
+        # -progress writes key=value lines, the last out_time_us is the output duration
+        out_time_us: Optional[int] = None
+        for line in progress.splitlines():
+            key, _, value = line.partition("=")
+            if key == "out_time_us" and value.strip().lstrip("-").isdigit():
+                out_time_us = int(value)
+        return max(out_time_us or 0, 0) / 1_000_000
+
+    async def preprocess(self, audio: bytes) -> PreprocessedAudio:
+        """
+        Trims silence and converts a clip to 16 kHz mono Opus.
+
+        Args:
+            audio (bytes): The audio as received from the platform.
+
+        Returns:
+            PreprocessedAudio: The processed audio and its duration.
+
+        Raises:
+            AudioTooLongError: If the clip is longer than max_duration_secs after trimming silence.
+            AudioPreprocessingError: If ffmpeg is not available or fails.
+        """
+        if not self.available:
+            raise AudioPreprocessingError("ffmpeg is not available")
+
+        started_at = time.monotonic()
+        stdout, stderr = await self._run_ffmpeg(self._build_command(), audio)
+
+        elapsed = time.monotonic() - started_at
+        duration_secs = self._parse_duration(stderr)
+        metrics.observe("audio.preprocess_seconds", elapsed)
+
+        if duration_secs > self.max_duration_secs:
+            metrics.increment("audio.rejected_too_long")
+            raise AudioTooLongError(duration_secs, self.max_duration_secs)
+
+        bytes_saved = len(audio) - len(stdout)
+        metrics.increment("audio.bytes_in", len(audio))
+        metrics.increment("audio.bytes_out", len(stdout))
+        metrics.increment("audio.bytes_saved", bytes_saved)
+        logger.info(
+            f"Audio pre-processed in {elapsed * 1000:.0f}ms: {len(audio)} -> {len(stdout)} bytes "
+            f"({bytes_saved} saved), {duration_secs:.1f}s of audio"
+        )
+        return PreprocessedAudio(data=stdout, duration_secs=duration_secs)
+
+    async def detect_silences(self, audio: bytes) -> List[Tuple[float, float]]:
+        """
+        Finds the pauses in a clip.
+
+        Args:
+            audio (bytes): The audio to analyze.
+
+        Returns:
+            List[Tuple[float, float]]: (start, end) in seconds of each silence.
+        """
+        if not self.available:
+            raise AudioPreprocessingError("ffmpeg is not available")
+
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner", "-nostdin", "-nostats",
+            "-i", "pipe:0",
+            "-af", f"silencedetect=noise={self.silence_threshold_db + self.PAUSE_THRESHOLD_OFFSET_DB}dB"
+                   f":d={self.MIN_PAUSE_SECS}",
+            "-f", "null", "-",
+        ]
+        _, stderr = await self._run_ffmpeg(command, audio)
+
+        silences = []
+        silence_start = None
+        for line in stderr.splitlines():
+            if "silence_start:" in line:
+                silence_start = float(line.split("silence_start:")[1].split()[0])
+            elif "silence_end:" in line and silence_start is not None:
+                silence_end = float(line.split("silence_end:")[1].split()[0])
+                silences.append((silence_start, silence_end))
+                silence_start = None
+        return silences
+
+    @staticmethod
+    def plan_cuts(duration_secs: float, silences: List[Tuple[float, float]], target_secs: float) -> List[float]:
+        """
+        Chooses where to split a clip so segments are close to target_secs long.
+
+        Cuts go in the middle of the pause closest to the target length. If there is no
+        pause within half a target of it, the clip is cut at the target length.
+
+        Args:
+            duration_secs (float): The clip duration.
+            silences (List[Tuple[float, float]]): The pauses found by detect_silences.
+            target_secs (float): The desired segment length.
+
+        Returns:
+            List[float]: The cut points in seconds, in order.
+        """
+        candidates = [(start + end) / 2 for start, end in silences]
+        cuts = []
+        segment_start = 0.0
+        while duration_secs - segment_start > target_secs * 1.5:
+            target = segment_start + target_secs
+            in_range = [c for c in candidates if abs(c - target) <= target_secs / 2]
+            cut = min(in_range, key=lambda c: abs(c - target)) if in_range else target
+            cuts.append(cut)
+            segment_start = cut
+        return cuts
+
+    async def extract_segment(self, audio: bytes, start_secs: float, end_secs: Optional[float]) -> bytes:
+        """
+        Copies a time range of an Ogg Opus clip without re-encoding it.
+
+        Args:
+            audio (bytes): The clip, as returned by preprocess.
+            start_secs (float): Segment start.
+            end_secs (Optional[float]): Segment end, None for the end of the clip.
+
+        Returns:
+            bytes: The segment as Ogg Opus.
+        """
+        command = [self.ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-ss", str(start_secs)]
+        if end_secs is not None:
+            command += ["-to", str(end_secs)]
+        command += ["-c:a", "copy", "-f", "ogg", "pipe:1"]
+        stdout, _ = await self._run_ffmpeg(command, audio)
+        return stdout
+
+    async def split_at_silences(self, audio: bytes, duration_secs: float, target_secs: float) -> List[bytes]:
+        """
+        Splits a pre-processed clip at pauses into segments of about target_secs.
+
+        Args:
+            audio (bytes): The clip, as returned by preprocess.
+            duration_secs (float): The clip duration.
+            target_secs (float): The desired segment length.
+
+        Returns:
+            List[bytes]: The segments in order. A single element if the clip is short.
+
+        Raises:
+            AudioPreprocessingError: If ffmpeg is not available or fails.
+        """
+        cuts = self.plan_cuts(duration_secs, await self.detect_silences(audio), target_secs)
+        if not cuts:
+            return [audio]
+
+        bounds = list(zip([0.0] + cuts, cuts + [None]))
+        segments = await asyncio.gather(*(self.extract_segment(audio, start, end) for start, end in bounds))
+        logger.info(f"Split {duration_secs:.1f}s of audio in {len(segments)} segments at {[round(c, 1) for c in cuts]}")
+        return list(segments)
+
+
+# Create a global instance
+audio_preprocessor = AudioPreprocessor()
@@ -1,45 +1,204 @@
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+from typing import List, Optional
 
+from config import config
+from core.audio_preprocessor import (
+    AudioPreprocessingError,
+    AudioPreprocessor,
+    AudioTooLongError,
+    PreprocessedAudio,
+    audio_preprocessor,
+)
 from core.interfaces.platform_adapter import PlatformAdapter
-from integrations.transcriptor.client import TranscriptionServiceClient, TranscriptionServiceError
+from core.reaction_dispatcher import reaction_dispatcher
+from core.services.transcription_cache_service import (
+    TranscriptionCacheService,
+    transcription_cache_service,
+)
+from core.utils.deadline import Deadline, DeadlineExceededError
+from core.utils.metrics import metrics
+from integrations.transcriptor.client import (
+    TranscriptionServiceClient,
+    TranscriptionServiceError,
+    transcription_client,
+)
 
 logger = logging.getLogger(__name__)
 
 class AudioProcessor:
     """
     A class to handle the processing of audio files, including transcription.
-    The TranscriptionServiceClient is initialized once when the AudioProcessor is created.
+    Uses the shared TranscriptionServiceClient unless a different base URL is given.
     """
-    def __init__(self, base_url: str = None):
-        self.transcription_client = TranscriptionServiceClient(base_url=base_url)
+    def __init__(
+        self,
+        base_url: str = None,
+        preprocessor: AudioPreprocessor = audio_preprocessor,
+        transcription_cache: TranscriptionCacheService = transcription_cache_service,
+    ):
+        self.transcription_client = (
+            TranscriptionServiceClient(base_url=base_url) if base_url else transcription_client
+        )
+        self.preprocessor = preprocessor
+        self.transcription_cache = transcription_cache
         logger.info("AudioProcessor initialized.")
 
-    async def process_audio(self, platform: PlatformAdapter, audio_file_path: str) -> Optional[str]:
+    async def process_audio(self, platform: PlatformAdapter, deadline: Optional[Deadline] = None) -> Optional[str]:
         """
-        Reads an audio file, calls the transcription service, and processes the result.
+        Downloads the voice message into memory, pre-processes it, calls the transcription service
+        and processes the result. Without pre-processing, the voice message is streamed from the
+        platform to the transcription service instead.
 
         Args:
-            audio_file_path: The path to the audio file to transcribe.
+            platform: The platform adapter of the update containing the voice message.
+            deadline: The time budget of the message, bounds the transcription requests.
+
+        Raises:
+            AudioTooLongError: If the voice message is longer than MAX_DURATION_AUDIO_IN_SECS.
         """
-        logger.info(f"Starting audio processing for file: {audio_file_path}")
+        message_id = platform.get_message_id()
+        logger.info(f"Starting audio processing for message: {message_id}")
+        reaction = reaction_dispatcher.react(platform, "🎧")
         try:
-            await platform.react_message("🎧")
-            
-            with open(audio_file_path, 'rb') as f:
-                audio_data = f.read()
 
-            transcription_result = await self.transcription_client.transcribe(audio_data)
-            return transcription_result.transcription
+            # A file id hit skips the download entirely
+            platform_name = platform.get_platform_name()
+            file_id = platform.get_voice_unique_id()
+            if file_id:
+                cached_transcription = self.transcription_cache.get_by_file_id(platform_name, file_id)
+                if cached_transcription is not None:
+                    self.transcription_cache.record_lookup("file")
+                    return cached_transcription
 
-        except FileNotFoundError:
-            logger.error(f"Audio file not found: {audio_file_path}")
-            return None
-        except TranscriptionServiceError as e:
+            if not self._preprocessing_enabled():
+                # Nothing needs the whole clip, stream it from the platform to the service
+                self.transcription_cache.record_lookup(None)
+                return await self._transcribe_stream(platform, file_id, deadline)
+
+            original_audio = await platform.download_voice_message()
+            if not original_audio:
+                logger.error(f"No voice message found in message: {message_id}")
+                return None
+
+            logger.info(f"Downloaded {len(original_audio)} bytes of audio for message: {message_id}")
+            cached_transcription = self.transcription_cache.get_by_content(original_audio)
+            if cached_transcription is not None:
+                self.transcription_cache.record_lookup("content")
+                # Store it under this file id too, so the next copy skips the download
+                self.transcription_cache.save_transcription(
+                    cached_transcription, platform=platform_name, file_id=file_id
+                )
+                return cached_transcription
+            self.transcription_cache.record_lookup(None)
+
+            audio = await self._preprocess(original_audio)
+            if not audio.data:
+                logger.info(f"Voice message {message_id} only contains silence")
+                return None
+
+            transcription = await self._transcribe(audio, deadline)
+            if transcription:
+                self.transcription_cache.save_transcription(
+                    transcription,
+                    audio=original_audio,
+                    platform=platform_name,
+                    file_id=file_id,
+                )
+            return transcription
+
+        except AudioTooLongError:
+            raise
+        except (TranscriptionServiceError, DeadlineExceededError) as e:
             logger.error(f"Error during transcription: {e}")
             return None
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
             return None
         finally:
-            await platform.delete_reaction()
+            reaction_dispatcher.clear(reaction)
+
+    def _preprocessing_enabled(self) -> bool:
+        return config.AUDIO_PREPROCESSING_ENABLED and self.preprocessor.available
+
+    async def _transcribe_stream(
+        self, platform: PlatformAdapter, file_id: Optional[str], deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
+        """
+        Uploads the voice message to the transcription service while it is downloaded,
+        hashing it on the way so the result can still be cached by content.
+        """
+        stream = platform.stream_voice_message()
+        if stream is None:
+            logger.error(f"No voice message found in message: {platform.get_message_id()}")
+            return None
+
+        content_hash = hashlib.sha256()
+
+        async def hashed_stream():
+            async for chunk in stream:
+                content_hash.update(chunk)
+                yield chunk
+
+        transcription = (await self.transcription_client.transcribe(hashed_stream(), deadline)).transcription
+        if transcription:
+            self.transcription_cache.save_transcription(
+                transcription,
+                platform=platform.get_platform_name(),
+                file_id=file_id,
+                content_hash=content_hash.hexdigest(),
+            )
+        return transcription
+
+    async def _preprocess(self, audio_data: bytes) -> PreprocessedAudio:
+        """
+        Trims silence and downsamples the audio when ffmpeg is available.
+        Falls back to the original audio if pre-processing fails.
+        """
+        if not self._preprocessing_enabled():
+            return PreprocessedAudio(data=audio_data, duration_secs=None)
+        try:
+            processed = await self.preprocessor.preprocess(audio_data)
+            # Nothing left after trimming silence
+            return processed if processed.duration_secs > 0 else PreprocessedAudio(data=b"", duration_secs=0)
+        except AudioPreprocessingError as e:
+            logger.warning(f"Audio pre-processing failed, uploading the original audio: {e}")
+            metrics.increment("audio.preprocess_failures")
+            return PreprocessedAudio(data=audio_data, duration_secs=None)
+
+    async def _transcribe(self, audio: PreprocessedAudio, deadline: Optional[Deadline] = None) -> str:
+        """
+        Transcribes the audio. Long clips are split at pauses and the segments are
+        transcribed concurrently when chunking is enabled.
+        """
+        segments = await self._split(audio)
+        if len(segments) == 1:
+            return (await self.transcription_client.transcribe(segments[0], deadline)).transcription
+
+        # Limits the requests per voice note, the client connection pool limits them globally
+        semaphore = asyncio.Semaphore(config.TRANSCRIPTION_CHUNK_CONCURRENCY)
+
+        async def transcribe_segment(segment: bytes) -> str:
+            async with semaphore:
+                return (await self.transcription_client.transcribe(segment, deadline)).transcription
+
+        metrics.increment("transcription.chunked_clips")
+        metrics.increment("transcription.chunks", len(segments))
+        transcriptions = await asyncio.gather(*(transcribe_segment(segment) for segment in segments))
+        return " ".join(text.strip() for text in transcriptions if text and text.strip())
+
+    async def _split(self, audio: PreprocessedAudio) -> List[bytes]:
+        if (
+            not config.TRANSCRIPTION_CHUNKING_ENABLED
+            or audio.duration_secs is None  # Not pre-processed, ffmpeg is missing or failed
+            or audio.duration_secs < config.TRANSCRIPTION_CHUNK_MIN_AUDIO_SECS
+        ):
+            return [audio.data]
+        try:
+            return await self.preprocessor.split_at_silences(
+                audio.data, audio.duration_secs, config.TRANSCRIPTION_CHUNK_TARGET_SECS
+            )
+        except AudioPreprocessingError as e:
+            logger.warning(f"Could not split the audio, transcribing it in a single request: {e}")
+            return [audio.data]
@@ -1,7 +1,11 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+
 from logging_config import get_logger
 
 from core.models.user import User
 from core.models.base_model import FinancialModel
+from core.utils.deadline import Deadline
 from integrations.spreadsheet.spreadsheet import SpreadsheetManager
 from integrations.supabase.supabase import SupabaseManager as SupaManager
 
@@ -23,7 +27,7 @@ class DataSaver:
         self.supabase_client = SupaManager()
         logger.info("DataSaver initialized.")
 
-    def save_content(self, data: FinancialModel, user: User) -> bool:
+    def save_content(self, data: FinancialModel, user: User, deadline: Optional[Deadline] = None) -> bool:
         """
         Saves the processed data to all configured storage methods for the user.
         Acts as a facade that coordinates saving to different storage systems based on user configuration.
@@ -31,6 +35,7 @@ class DataSaver:
         Args:
             data: The processed financial data object (must implement FinancialModel interface).
             user: The user who owns this data.
+            deadline: The time budget of the request. Writes are skipped once it's exhausted.
 
         Returns:
             True if saving to all configured storage methods was successful, False otherwise.
@@ -39,25 +44,74 @@ class DataSaver:
         
         # Save to spreadsheet if user has it configured
         if user.is_sheet_linked:
-            success_spreadsheet = self._save_to_spreadsheet(data, user)
+            success_spreadsheet = self._save_to_spreadsheet(data, user, deadline)
 
         # Save to database always just in case the user creates a new account later
-        success_database = self._save_to_database(data, user)
+        success_database = self._save_to_database(data, user, deadline)
 
         return success_spreadsheet and success_database
 
-    def _save_to_spreadsheet(self, data: FinancialModel, user: User) -> bool:
+    def save_contents(self, items: List[FinancialModel], user: User, deadline: Optional[Deadline] = None) -> bool:
+        """
+        Saves several financial data objects with one request per storage target:
+        one insert per database table and one append per worksheet.
+
+        Args:
+            items: The financial data objects (must implement FinancialModel interface).
+            user: The user who owns this data.
+            deadline: The time budget of the request. Writes are skipped once it's exhausted.
+
+        Returns:
+            True if saving to all configured storage methods was successful, False otherwise.
+        """
+        success = True
+
+        if user.is_sheet_linked:
+            rows_by_worksheet: Dict[str, List[list]] = defaultdict(list)
+            for data in items:
+                rows_by_worksheet[data.get_worksheet_name()].append(data.to_sheet_row())
+            for worksheet_name, rows in rows_by_worksheet.items():
+                try:
+                    if deadline:
+                        deadline.check("storage.spreadsheet")
+                    logger.info(f"Saving {len(rows)} rows to worksheet {worksheet_name} for user {user.id}")
+                    success = self.spreadsheet_client.insert_rows_by_id(
+                        user.google_sheet_id, worksheet_name, rows
+                    ) and success
+                except Exception as e:
+                    logger.error(f"Error saving rows to spreadsheet: {e}", exc_info=True)
+                    success = False
+
+        records_by_table: Dict[str, List[dict]] = defaultdict(list)
+        for data in items:
+            records_by_table[data.get_table_name()].append(data.to_storage_dict(user))
+        for table_name, records in records_by_table.items():
+            try:
+                if deadline:
+                    deadline.check("storage.database")
+                logger.info(f"Saving {len(records)} records to {table_name} for user {user.id}")
+                success = self.supabase_client.insert(table_name, records) and success
+            except Exception as e:
+                logger.error(f"Error saving records to database: {e}", exc_info=True)
+                success = False
+
+        return success
+
+    def _save_to_spreadsheet(self, data: FinancialModel, user: User, deadline: Optional[Deadline] = None) -> bool:
         """
         Saves the processed data to the Google Sheets spreadsheet.
 
         Args:
             data: The financial data object (must implement FinancialModel interface).
             user: The user who owns this data.
+            deadline: The time budget of the request, the write is skipped once it's exhausted.
 
         Returns:
             True if saved successfully, False otherwise.
         """
         try:
+            if deadline:
+                deadline.check("storage.spreadsheet")
             logger.info(f"Saving {data.__class__.__name__} to spreadsheet for user {user.id}")
             return self.spreadsheet_client.insert_row_by_id(
                 user.google_sheet_id,
@@ -68,18 +122,21 @@ class DataSaver:
             logger.error(f"Error saving {data.__class__.__name__} to spreadsheet: {e}", exc_info=True)
             return False
 
-    def _save_to_database(self, data: FinancialModel, user: User) -> bool:
+    def _save_to_database(self, data: FinancialModel, user: User, deadline: Optional[Deadline] = None) -> bool:
         """
         Saves the processed data to the Supabase database.
 
         Args:
             data: The financial data object (must implement FinancialModel interface).
             user: The user who owns this data.
+            deadline: The time budget of the request, the write is skipped once it's exhausted.
 
         Returns:
             True if saved successfully, False otherwise.
         """
         try:
+            if deadline:
+                deadline.check("storage.database")
             logger.info(f"Saving {data.__class__.__name__} to database for user {user.id}")
             table_name = data.get_table_name()
             return self.supabase_client.insert(table_name, data.to_storage_dict(user))
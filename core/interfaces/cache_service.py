@@ -39,6 +39,69 @@ class CacheService(ABC):
         """
         pass
 
+    @abstractmethod
+    def add(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        """
+        Stores a value only if the key doesn't exist yet, atomically. Used as a lock between workers.
+
+        Args:
+            key (str): The key to set.
+            value (Any): The value to store in the cache.
+            expiry (Optional[int]): Time-to-live in seconds for the element in the cache.
+                                    If None, the element does not expire.
+
+        Returns:
+            bool: True if the value was stored, False if the key exists or the operation failed.
+        """
+        pass
+
+    @abstractmethod
+    def increment(self, key: str, amount: int = 1, expiry: Optional[int] = None) -> Optional[int]:
+        """
+        Adds an amount to an integer counter atomically, creating it at 0 if missing.
+        Used for counters shared between workers.
+
+        Args:
+            key (str): The key of the counter.
+            amount (int): The amount to add, negative to subtract.
+            expiry (Optional[int]): Time-to-live in seconds for the counter.
+                                    If None, the counter does not expire.
+
+        Returns:
+            Optional[int]: The new value of the counter, None if the operation failed.
+        """
+        pass
+
+    @abstractmethod
+    def push(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        """
+        Appends a value to the end of a list atomically, creating the list if missing.
+        Used for queues shared between workers.
+
+        Args:
+            key (str): The key of the list.
+            value (Any): The value to append.
+            expiry (Optional[int]): Time-to-live in seconds for the list.
+                                    If None, the list does not expire.
+
+        Returns:
+            bool: True if the value was appended, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def pop(self, key: str) -> Optional[Any]:
+        """
+        Removes and returns the first value of a list atomically, so only one worker gets it.
+
+        Args:
+            key (str): The key of the list.
+
+        Returns:
+            Optional[Any]: The first value of the list, None if the list is empty or missing.
+        """
+        pass
+
     @abstractmethod
     def delete(self, key: str) -> bool:
         """
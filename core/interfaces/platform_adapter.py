@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from core.models.common.command_button import CommandButton
 from core.models.message import Message
@@ -10,6 +10,10 @@ class PlatformAdapter(ABC):
     Abstract base class for platform adapters.
     This class defines the interface that all platform adapters must implement.
     """
+    # Maximum number of buttons in a message (None for no limit)
+    MAX_REPLY_BUTTONS: Optional[int] = None
+    # Maximum length of the text of a message with buttons
+    MAX_BUTTONS_TEXT_LENGTH: int = 4096
 
     @abstractmethod
     def get_platform_name(self) -> str:
@@ -92,6 +96,38 @@ class PlatformAdapter(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_voice_unique_id(self) -> Optional[str]:
+        """
+        Returns an id that identifies the content of the voice message, stable across
+        forwards and resends, if the platform provides one.
+
+        Returns:
+            Optional[str]: The unique id of the voice message file, or None if not available.
+        """
+        pass
+
+    @abstractmethod
+    async def download_voice_message(self) -> Optional[bytes]:
+        """
+        Downloads the voice message of the update into memory.
+
+        Returns:
+            Optional[bytes]: The audio content, or None if the update has no voice message.
+        """
+        pass
+
+    @abstractmethod
+    def stream_voice_message(self) -> Optional[AsyncIterator[bytes]]:
+        """
+        Streams the voice message of the update in chunks, without holding the whole file in memory
+        when the platform supports it.
+
+        Returns:
+            Optional[AsyncIterator[bytes]]: The audio chunks, or None if the update has no voice message.
+        """
+        pass
+
     @abstractmethod
     def get_callback_query(self):
         """
@@ -113,6 +149,16 @@ class PlatformAdapter(ABC):
         """
         pass
 
+    @abstractmethod
+    async def reply_text_stream(self, chunks: AsyncIterator[str]):
+        """
+        Sends a text reply to the user while it is being generated.
+
+        Args:
+            chunks (AsyncIterator[str]): The pieces of the reply text, in order.
+        """
+        pass
+
     @abstractmethod
     async def reply_with_buttons(self, text: str, buttons: List[CommandButton], **kwargs):
         """
@@ -1,5 +1,9 @@
+from typing import Optional
+
 from core.models.common.action_type import Action
-from core.prompts import ACTION_PROMPT
+from core.models.common.llm_stage import LLMStage
+from core.prompt_registry import PromptName, prompt_registry
+from core.utils.deadline import Deadline
 from integrations.providers.llm_akash import RotatingLLMClientPool as LLMAgent
 from logging_config import get_logger
 from core.llm_processor.schemas import ActionDetectorException
@@ -10,19 +14,20 @@ class ActionDetector:
     Raises ActionDetectorException on error or unexpected response type.
     """
     def __init__(self):
-        self.llm_client = LLMAgent()
+        self.llm_client = LLMAgent(stage=LLMStage.CLASSIFICATION)
         self.logger = get_logger(__name__)
 
-    def detect_action(self, content: str) -> Action:
+    def detect_action(self, content: str, deadline: Optional[Deadline] = None) -> Action:
         """
-        Detects and returns the Action for the given message content.
+        Detects and returns the Action for the given message content, within the deadline if given.
         """
         try:
             self.logger.info(f"[ActionDetector] Detecting action for message: {content}")
             action = self.llm_client.generate_response(
-                system_template=ACTION_PROMPT,
+                system_template=prompt_registry.get(PromptName.ACTION).template,
                 human_template=content,
-                output=Action
+                output=Action,
+                deadline=deadline
             )
             return self._validate_action_result(action)
         except Exception as e:
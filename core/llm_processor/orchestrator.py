@@ -1,38 +1,174 @@
+import asyncio
+import time
+
 from core.llm_processor.action_detector import ActionDetector
 from core.llm_processor.prompt_builder import PromptBuilder
 from core.llm_processor.response_processor import ResponseProcessor
+from core.llm_processor.single_flight import llm_single_flight
+from core.llm_processor.speculation import speculation_policy
 from core.llm_processor.validator import LLMResponseValidator
-from typing import List
-from core.llm_processor.schemas import ProcessingResult, LLMProcessorException
+from typing import AsyncIterator, List, Optional
+from core.llm_processor.schemas import LLMModelRequest, ProcessingResult, LLMProcessorException
 from core.messages import ERROR_PROCESSING_MESSAGE
+from core.models.common.action_type import Action, ActionTypes
+from core.models.common.llm_stage import LLMStage
+from core.models.common.simple_message import SimpleStringResponse
+from core.prompt_registry import PromptName, prompt_registry
+from core.services.llm_response_cache_service import llm_response_cache_service
+from core.utils.async_utils import run_llm_call
+from core.utils.deadline import Deadline
+from config import config
 from logging_config import get_logger
 
 class LLMOrchestrator:
     """
     Orchestrates the LLM processing pipeline: detects action, builds prompt, processes response, and validates results.
     Exceptions from each module are propagated.
+
+    With speculative extraction enabled, the transaction extraction runs concurrently with
+    the action detection; its result is kept when the message is a transaction and discarded
+    otherwise (see SpeculationPolicy).
     """
     def __init__(self):
         self.action_detector = ActionDetector()
         self.prompt_builder = PromptBuilder()
         self.response_processor = ResponseProcessor()
         self.validator = LLMResponseValidator()
+        self.response_cache = llm_response_cache_service
+        self.speculation = speculation_policy
+        self.single_flight = llm_single_flight
         self.logger = get_logger(__name__)
         self.logger.info("LLMProcessorV2 initialized.")
 
-    async def process_content(self, content: str) -> List[ProcessingResult]:
+    async def process_content(
+        self, content: str, user_id: Optional[str] = None, deadline: Optional[Deadline] = None
+    ) -> List[ProcessingResult]:
         """
         Runs the full LLM processing pipeline for the given content.
+        Identical messages of the same user processed at the same time share a single run.
+        Every LLM call uses the remaining time of the deadline, if given, as its timeout.
         Returns a list with a ProcessingResult containing the error if an LLMProcessorException is raised.
         """
+        if user_id is None:
+            return await self._process_content(content, deadline)
+        return await self.single_flight.run(user_id, content, lambda: self._process_content(content, deadline))
+
+    async def _process_content(self, content: str, deadline: Optional[Deadline] = None) -> List[ProcessingResult]:
+        """
+        Runs the pipeline steps for the given content.
+        """
+        speculative = None
         try:
             self.logger.info(f"[LLMOrchestrator] Starting processing for content: {content}")
-            action = self.action_detector.detect_action(content)
+            action_prompt = prompt_registry.get(PromptName.ACTION).template
+            action = self.response_cache.get(content, action_prompt, Action, LLMStage.CLASSIFICATION)
+            if action is None:
+                speculative = self._start_speculative_extraction(content, deadline)
+                action = await self._detect_action(content, deadline)
+            if speculative:
+                task, speculative = speculative, None
+                results = await self._resolve_speculative_extraction(task, action)
+                if results is not None:
+                    results = await self.validator.validate(results, content, deadline)
+                    self.logger.info("[LLMOrchestrator] Speculative results validated successfully.")
+                    return results
             prompt = self.prompt_builder.build_prompt(content, action)
-            results = await self.response_processor.process_response(prompt)
-            self.validator.validate(results)
+            is_plain_answer = prompt.output_model is SimpleStringResponse
+            if is_plain_answer:
+                cached = self.response_cache.get(content, prompt.system_prompt, SimpleStringResponse, prompt.stage)
+                if cached:
+                    return [ProcessingResult(response_text=cached.response)]
+                if config.LLM_STREAMING_RESPONSES:
+                    # Plain answers (questions, social messages) are sent to the user while they are generated
+                    return [ProcessingResult(response_stream=self._stream_and_cache(content, prompt, deadline))]
+            results = await self.response_processor.process_response(prompt, deadline)
+            results = await self.validator.validate(results, content, deadline)
             self.logger.info(f"[LLMOrchestrator] Results validated successfully.")
+            # Transactions are never cached: their prompt embeds the current date
+            if is_plain_answer and len(results) == 1 and results[0].response_text:
+                self.response_cache.save(
+                    content, prompt.system_prompt, SimpleStringResponse(response=results[0].response_text), prompt.stage
+                )
             return results
         except LLMProcessorException as e:
             self.logger.error(f"[LLMOrchestrator] LLMProcessorException occurred: {e}. Returning error to user.")
-            return [ProcessingResult(error=ERROR_PROCESSING_MESSAGE)] 
\ No newline at end of file
+            return [ProcessingResult(error=ERROR_PROCESSING_MESSAGE)]
+        finally:
+            if speculative:
+                # The detection failed, the extraction result is never used
+                self._discard_speculative_extraction(speculative)
+
+    async def _detect_action(self, content: str, deadline: Optional[Deadline] = None) -> Action:
+        """
+        Detects the action of a message with the LLM and caches it for repeated messages.
+        """
+        # LLM calls are blocking, run them off the event loop so cheap updates aren't delayed
+        action = await run_llm_call(self.action_detector.detect_action, content, deadline)
+        action_prompt = prompt_registry.get(PromptName.ACTION).template
+        self.response_cache.save(content, action_prompt, action, LLMStage.CLASSIFICATION)
+        self.speculation.observe(action.action_type == ActionTypes.TRANSACTION)
+        return action
+
+    def _start_speculative_extraction(
+        self, content: str, deadline: Optional[Deadline] = None
+    ) -> Optional[asyncio.Task]:
+        """
+        Starts extracting the message as a transaction before its action is known,
+        when the speculation policy allows it.
+
+        Returns:
+            Optional[asyncio.Task]: The extraction task, resolving to the results and the times
+                                    the extraction started and finished. None if not speculating.
+        """
+        if not self.speculation.should_speculate():
+            return None
+        prompt = self.prompt_builder.build_prompt(
+            content, Action(action_type=ActionTypes.TRANSACTION, message=content)
+        )
+
+        async def extract():
+            started_at = time.monotonic()
+            results = await self.response_processor.process_response(prompt, deadline)
+            return results, started_at, time.monotonic()
+
+        return asyncio.create_task(extract(), name="speculative-extraction")
+
+    async def _resolve_speculative_extraction(
+        self, task: asyncio.Task, action: Action
+    ) -> Optional[List[ProcessingResult]]:
+        """
+        Returns the speculative extraction results if the message is a transaction,
+        otherwise discards the extraction and returns None.
+        """
+        if action.action_type != ActionTypes.TRANSACTION:
+            self._discard_speculative_extraction(task)
+            return None
+        detected_at = time.monotonic()
+        results, started_at, ready_at = await task
+        # The extraction ran in parallel with the detection for the shorter of both
+        self.speculation.record_saved(max(0.0, min(detected_at, ready_at) - started_at))
+        return results
+
+    def _discard_speculative_extraction(self, task: asyncio.Task) -> None:
+        """
+        Cancels a speculative extraction whose result won't be used.
+        The LLM call already running in its worker thread still completes, and is counted as wasted.
+        """
+        self.speculation.record_wasted()
+        task.cancel()
+        # Retrieve the outcome so a failed extraction isn't reported as never retrieved
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    async def _stream_and_cache(
+        self, content: str, prompt: LLMModelRequest, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streams the answer to the user and caches it once it is complete.
+        """
+        chunks = []
+        async for chunk in self.response_processor.stream_response_text(prompt, deadline):
+            chunks.append(chunk)
+            yield chunk
+        self.response_cache.save(
+            content, prompt.system_prompt, SimpleStringResponse(response="".join(chunks)), prompt.stage
+        )
@@ -1,14 +1,11 @@
-from core.prompts import (
-    TRANSACTION_PROMPT,
-    HUMAN_PROMPT,
-    SOCIAL_MESSAGE_RESPONSE_PROMPT,
-    QUESTION_RESPONSE_PROMPT,
-    UNKNOWN_MESSAGE_RESPONSE_PROMPT,
-)
+from core.prompts import HUMAN_PROMPT
+from core.prompt_registry import PromptName, prompt_registry
 from core.models.common.action_type import ActionTypes
 from core.models.common.financial_type import FinantialActions
+from core.models.common.llm_stage import LLMStage
 from core.models.common.simple_message import SimpleStringResponse
 from datetime import datetime
+from typing import Dict, Optional
 import pytz
 from core.llm_processor.schemas import PromptBuilderException, LLMModelRequest
 
@@ -16,7 +13,21 @@ class PromptBuilder:
     """
     Builds the appropriate prompt for the LLM based on the detected action type.
     Raises PromptBuilderException for unknown action types.
+    The system prompts are the active variants of the prompt registry, unless others are given.
     """
+    def __init__(self, variants: Optional[Dict[PromptName, str]] = None):
+        """
+        Args:
+            variants (Optional[Dict[PromptName, str]]): The prompt variants to use instead of the active ones.
+        """
+        self.variants = variants or {}
+
+    def _system_prompt(self, name: PromptName) -> str:
+        """
+        Returns the system prompt of the selected variant.
+        """
+        return prompt_registry.get(name, self.variants.get(name)).template
+
     def build_prompt(self, content: str, action) -> LLMModelRequest:
         """
         Returns a LLMModelRequest with the correct system and human prompt, and output model,
@@ -40,9 +51,10 @@ class PromptBuilder:
         current_datetime = datetime.now(pytz.timezone("America/Argentina/Buenos_Aires"))
         day_of_week = current_datetime.strftime("%A")
         return LLMModelRequest(
-            system_prompt=TRANSACTION_PROMPT,
+            system_prompt=self._system_prompt(PromptName.TRANSACTION),
             human_prompt=HUMAN_PROMPT.format(content=content, current_date=current_datetime, current_day_of_week=day_of_week),
-            output_model=FinantialActions
+            output_model=FinantialActions,
+            stage=LLMStage.EXTRACTION
         )
 
     def _build_question_request(self, content: str) -> LLMModelRequest:
@@ -50,9 +62,10 @@ class PromptBuilder:
         Builds a prompt for a question action.
         """
         return LLMModelRequest(
-            system_prompt=QUESTION_RESPONSE_PROMPT,
+            system_prompt=self._system_prompt(PromptName.QUESTION),
             human_prompt=content,
-            output_model=SimpleStringResponse
+            output_model=SimpleStringResponse,
+            stage=LLMStage.CONVERSATION
         )
 
     def _build_social_message_request(self, content: str) -> LLMModelRequest:
@@ -60,9 +73,10 @@ class PromptBuilder:
         Builds a prompt for a social message action.
         """
         return LLMModelRequest(
-            system_prompt=SOCIAL_MESSAGE_RESPONSE_PROMPT,
+            system_prompt=self._system_prompt(PromptName.SOCIAL_MESSAGE),
             human_prompt=content,
-            output_model=SimpleStringResponse
+            output_model=SimpleStringResponse,
+            stage=LLMStage.CONVERSATION
         )
 
     def _build_unknown_message_request(self, content: str) -> LLMModelRequest:
@@ -70,7 +84,8 @@ class PromptBuilder:
         Builds a prompt for an unknown message action.
         """
         return LLMModelRequest(
-            system_prompt=UNKNOWN_MESSAGE_RESPONSE_PROMPT,
+            system_prompt=self._system_prompt(PromptName.UNKNOWN_MESSAGE),
             human_prompt=content,
-            output_model=SimpleStringResponse
+            output_model=SimpleStringResponse,
+            stage=LLMStage.CONVERSATION
         ) 
\ No newline at end of file
@@ -1,9 +1,15 @@
+import time
+
 from core.llm_processor.schemas import ProcessingResult, LLMModelRequest, ResponseProcessorException
 from core.models.common.action_type import ActionTypes
 from integrations.providers.llm_akash import RotatingLLMClientPool as LLMAgent
-from typing import List, cast
+from typing import AsyncIterator, List, Optional, cast
 from core.models.common.financial_type import FinantialActions
+from core.models.common.llm_stage import LLMStage
 from core.models.common.simple_message import SimpleStringResponse
+from core.utils.async_utils import iterate_in_thread, llm_executor, run_llm_call
+from core.utils.deadline import Deadline
+from core.utils.metrics import metrics
 from logging_config import get_logger
 
 class ResponseProcessor:
@@ -11,20 +17,26 @@ class ResponseProcessor:
     Handles the processing of LLM responses and maps them to ProcessingResult objects.
     """
     def __init__(self):
-        self.llm_client = LLMAgent()
+        # One client pool per stage, each with its own model settings
+        self.llm_clients = {
+            stage: LLMAgent(stage=stage) for stage in (LLMStage.EXTRACTION, LLMStage.CONVERSATION)
+        }
         self.logger = get_logger(__name__)
 
-    async def process_response(self, prompt: LLMModelRequest) -> List[ProcessingResult]:
+    async def process_response(self, prompt: LLMModelRequest, deadline: Optional[Deadline] = None) -> List[ProcessingResult]:
         """
         Processes the LLM response and returns a list of ProcessingResult objects.
+        The LLM request is bounded by the deadline, if given.
         Raises ResponseProcessorException if the response type is not recognized or an error occurs.
         """
         try:
             self.logger.info(f"[ResponseProcessor] Processing response for prompt: {prompt.human_prompt}")
-            response = self.llm_client.generate_response(
+            response = await run_llm_call(
+                self.llm_clients[prompt.stage].generate_response,
                 system_template=prompt.system_prompt,
                 human_template=prompt.human_prompt,
-                output=prompt.output_model
+                output=prompt.output_model,
+                deadline=deadline
             )
             self.logger.info(f"[ResponseProcessor] LLM response received: {response}")
             if self._is_finantial_actions(response):
@@ -38,6 +50,42 @@ class ResponseProcessor:
         except Exception as e:
             raise ResponseProcessorException(f"[ResponseProcessor] Error processing response: {e}") from e
 
+    async def stream_response_text(self, prompt: LLMModelRequest, deadline: Optional[Deadline] = None) -> AsyncIterator[str]:
+        """
+        Streams the text of a SimpleStringResponse as it is generated.
+        Yields the new text since the previous chunk. Tracks the time to the first token.
+        Raises ResponseProcessorException if the stream fails before producing any text.
+        """
+        started_at = time.monotonic()
+        emitted = ""
+        try:
+            partials = iterate_in_thread(
+                lambda: self.llm_clients[prompt.stage].stream_response(
+                    system_template=prompt.system_prompt,
+                    human_template=prompt.human_prompt,
+                    output=prompt.output_model,
+                    deadline=deadline
+                ),
+                executor=llm_executor,
+            )
+            async for partial in partials:
+                text = partial.get("response") if isinstance(partial, dict) else getattr(partial, "response", None)
+                if not isinstance(text, str) or len(text) <= len(emitted) or not text.startswith(emitted):
+                    continue
+                if not emitted:
+                    metrics.observe("llm.time_to_first_token_seconds", time.monotonic() - started_at)
+                delta, emitted = text[len(emitted):], text
+                yield delta
+        except Exception as e:
+            if emitted:
+                raise
+            raise ResponseProcessorException(f"[ResponseProcessor] Error streaming response: {e}") from e
+
+        if not emitted:
+            raise ResponseProcessorException("[ResponseProcessor] The streamed response was empty")
+        metrics.observe("llm.stream_duration_seconds", time.monotonic() - started_at)
+        self.logger.info(f"[ResponseProcessor] Streamed response: {emitted}")
+
     def _is_finantial_actions(self, response) -> bool:
         """
         Checks if the response is a FinantialActions instance with actions.
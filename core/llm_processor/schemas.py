@@ -1,7 +1,8 @@
-from typing import Optional, Type, Union
-from pydantic import BaseModel
+from typing import AsyncIterator, Optional, Type, Union
+from pydantic import BaseModel, ConfigDict
 from core.models.common.action_type import Action
 from core.models.common.financial_type import FinantialActions
+from core.models.common.llm_stage import LLMStage
 from core.models.common.simple_message import SimpleStringResponse
 from core.models.financial.transaction import Transaction
 
@@ -9,10 +10,16 @@ class LLMModelRequest(BaseModel):
     system_prompt: str
     human_prompt: str
     output_model:  Type[Union[Action, FinantialActions, SimpleStringResponse]]
+    stage: LLMStage = LLMStage.CONVERSATION
 
 class ProcessingResult(BaseModel):
+    # The response stream is an async generator, checked with isinstance
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     data_object: Optional[Transaction] = None
     response_text: Optional[str] = None
+    # Response text deltas, when the response is streamed
+    response_stream: Optional[AsyncIterator[str]] = None
     error: Optional[str] = None
 
 # Custom exceptions for LLM Processor
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import os
+import pickle
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from config import config
+from core.interfaces.cache_service import CacheService
+from core.llm_processor.schemas import ProcessingResult
+from core.prompts import PROMPT_VERSION
+from core.services.llm_response_cache_service import LLMResponseCacheService
+from core.utils.metrics import metrics
+from integrations.cache.redis_client import cache_client
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMSingleFlight:
+    """
+    Deduplicates identical LLM pipeline runs in flight: the same user double-tapping
+    send, or a webhook redelivered while the first attempt is still running.
+
+    - Runs are keyed by the user, the normalized content and the prompt version.
+    - Within a process, concurrent identical calls await the future of the first one.
+    - Across workers, the first call takes a Redis lock (SET NX) and publishes its
+      results for `result_secs`; calls in other workers poll for them while the
+      lock is held, and run on their own if it's released without results.
+    - Streamed answers can't be shared: calls that find one run on their own (the
+      action detection is then served by the LLM response cache). Errors aren't
+      published to other workers either.
+
+    Must be used from a single event loop (the server loop).
+    """
+    CACHE_PREFIX = "llm_single_flight"
+    CACHE_VERSION = 1
+    POLL_INTERVAL_SECS = 0.1
+
+    def __init__(
+        self,
+        cache_service: CacheService = cache_client,
+        enabled: bool = config.LLM_SINGLE_FLIGHT_ENABLED,
+        lock_secs: int = config.LLM_SINGLE_FLIGHT_LOCK_SECS,
+        result_secs: int = config.LLM_SINGLE_FLIGHT_RESULT_SECS,
+    ) -> None:
+        """
+        Initializes the single-flight layer.
+
+        Args:
+            cache_service (CacheService): The cache service by default is the global instance of RedisCacheClient.
+            enabled (bool): Whether identical runs are deduplicated.
+            lock_secs (int): Expiry of the lock between workers, the longest a run is waited for.
+            result_secs (int): How long the results stay available to the other workers.
+        """
+        self.cache_service = cache_service
+        self.enabled = enabled
+        self.lock_secs = lock_secs
+        self.result_secs = result_secs
+        self.owner = f"{os.getpid()}"
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared_local = 0
+        self.shared_remote = 0
+
+    def _generate_key(self, user_id: str, content: str) -> str:
+        """
+        Generates the flight key of a user message.
+
+        Args:
+            user_id (str): The ID of the user.
+            content (str): The message content.
+
+        Returns:
+            str: The key, shared by identical messages of the user.
+        """
+        fingerprint = "\x1f".join([PROMPT_VERSION, str(user_id), LLMResponseCacheService.normalize(content)])
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        return f"{self.CACHE_PREFIX}:{digest}:v{self.CACHE_VERSION}"
+
+    async def run(
+        self,
+        user_id: str,
+        content: str,
+        process: Callable[[], Awaitable[List[ProcessingResult]]],
+    ) -> List[ProcessingResult]:
+        """
+        Runs the pipeline for a message, or shares the results of an identical run in flight.
+
+        Args:
+            user_id (str): The ID of the user.
+            content (str): The message content.
+            process (Callable): Runs the pipeline for the message.
+
+        Returns:
+            List[ProcessingResult]: The results of the pipeline.
+        """
+        if not self.enabled:
+            return await process()
+
+        key = self._generate_key(user_id, content)
+        flight = self._flights.get(key)
+        if flight is not None:
+            try:
+                results = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The first call was cancelled, not this one
+                return await process()
+            if self._is_shareable(results):
+                self.shared_local += 1
+                metrics.increment("llm.single_flight.shared_local")
+                return results
+            return await process()
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            results = await self._run_leader(key, process)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(e)
+                # Followers retrieve it; avoid the "never retrieved" warning when there are none
+                flight.exception()
+            raise
+        else:
+            flight.set_result(results)
+            return results
+        finally:
+            del self._flights[key]
+
+    async def _run_leader(
+        self, key: str, process: Callable[[], Awaitable[List[ProcessingResult]]]
+    ) -> List[ProcessingResult]:
+        """
+        Runs the pipeline as the first call of this process, unless another worker
+        holds the lock of the key, in which case its results are awaited.
+        """
+        lock_key = f"{key}:lock"
+        result_key = f"{key}:result"
+
+        results = self._load_results(result_key)
+        if results is None and not self.cache_service.add(lock_key, self.owner, expiry=self.lock_secs):
+            results = await self._wait_remote(lock_key, result_key)
+        if results is not None:
+            self.shared_remote += 1
+            metrics.increment("llm.single_flight.shared_remote")
+            logger.info("Identical message processed by another worker, sharing its results.")
+            return results
+
+        self.leaders += 1
+        metrics.increment("llm.single_flight.leaders")
+        try:
+            results = await process()
+            if self._is_shareable(results):
+                self._save_results(result_key, results)
+            return results
+        finally:
+            self.cache_service.delete(lock_key)
+
+    async def _wait_remote(self, lock_key: str, result_key: str) -> Optional[List[ProcessingResult]]:
+        """
+        Polls the results of the worker holding the lock.
+
+        Returns:
+            Optional[List[ProcessingResult]]: The results, None if the lock was released
+                                              or expired without them.
+        """
+        deadline = time.monotonic() + self.lock_secs
+        while time.monotonic() < deadline:
+            # Checked before waiting: without Redis the lock is never held
+            if self.cache_service.get(lock_key) is None:
+                return self._load_results(result_key)
+            await asyncio.sleep(self.POLL_INTERVAL_SECS)
+            results = self._load_results(result_key)
+            if results is not None:
+                return results
+        return None
+
+    def _is_shareable(self, results: List[ProcessingResult]) -> bool:
+        return bool(results) and not any(result.response_stream or result.error for result in results)
+
+    def _load_results(self, result_key: str) -> Optional[List[ProcessingResult]]:
+        cached_data = self.cache_service.get(result_key)
+        if not cached_data:
+            return None
+        try:
+            return pickle.loads(cached_data)  # TODO: pickle is not secure and fast, same as MessageService.
+        except Exception as e:
+            logger.error(f"Error loading shared LLM results: {e}")
+            return None
+
+    def _save_results(self, result_key: str, results: List[ProcessingResult]) -> None:
+        try:
+            self.cache_service.set(result_key, pickle.dumps(results), expiry=self.result_secs)
+        except Exception as e:
+            logger.error(f"Error sharing LLM results: {e}")
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the deduplication.
+
+        Returns:
+            dict: The runs executed, the calls served by a run of this or another worker and the runs in flight.
+        """
+        return {
+            "enabled": self.enabled,
+            "leaders": self.leaders,
+            "shared_local": self.shared_local,
+            "shared_remote": self.shared_remote,
+            "in_flight": len(self._flights),
+        }
+
+
+# Create a global instance
+llm_single_flight = LLMSingleFlight()
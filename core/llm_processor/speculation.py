@@ -0,0 +1,95 @@
+import threading
+from collections import deque
+
+from config import config
+from core.utils.metrics import metrics
+
+
+class SpeculationPolicy:
+    """
+    Decides whether the transaction extraction runs concurrently with the action detection.
+
+    Speculating saves the action detection latency on transactions and costs a wasted
+    extraction call on any other message, so it is only done while the share of
+    transactions among the last `window` detected actions is at least `min_ratio`.
+    Every detection is observed, speculated or not, so the policy turns itself back
+    on when the traffic goes back to mostly transactions.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = config.LLM_SPECULATIVE_EXTRACTION,
+        min_ratio: float = config.LLM_SPECULATION_MIN_TRANSACTION_RATIO,
+        window: int = config.LLM_SPECULATION_WINDOW,
+    ) -> None:
+        """
+        Initializes the speculation policy.
+
+        Args:
+            enabled (bool): Whether speculative extraction is allowed at all.
+            min_ratio (float): Minimum share of transactions to speculate.
+            window (int): Number of recent detected actions the share is computed on.
+        """
+        self.enabled = enabled
+        self.min_ratio = min_ratio
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.wasted = 0
+        self.saved_seconds = 0.0
+
+    def transaction_ratio(self) -> float:
+        """Returns the share of transactions among the recent detected actions, 1.0 before any."""
+        with self._lock:
+            return sum(self._recent) / len(self._recent) if self._recent else 1.0
+
+    def should_speculate(self) -> bool:
+        """Returns whether the extraction of the next message should start before its action is known."""
+        return self.enabled and self.transaction_ratio() >= self.min_ratio
+
+    def observe(self, is_transaction: bool) -> None:
+        """
+        Records the detected action of a message.
+
+        Args:
+            is_transaction (bool): Whether the message was classified as a transaction.
+        """
+        with self._lock:
+            self._recent.append(1 if is_transaction else 0)
+
+    def record_saved(self, seconds: float) -> None:
+        """
+        Records a speculative extraction that was used.
+
+        Args:
+            seconds (float): The latency saved, the time the extraction overlapped the detection.
+        """
+        self.saved += 1
+        self.saved_seconds += seconds
+        metrics.increment("llm.speculation.saved")
+        metrics.observe("llm.speculation.saved_seconds", seconds)
+
+    def record_wasted(self) -> None:
+        """Records a speculative extraction that was discarded."""
+        self.wasted += 1
+        metrics.increment("llm.speculation.wasted")
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the speculation.
+
+        Returns:
+            dict: Whether it's enabled and active, the transaction ratio and the saved and wasted calls.
+        """
+        return {
+            "enabled": self.enabled,
+            "active": self.should_speculate(),
+            "transaction_ratio": round(self.transaction_ratio(), 3),
+            "saved_calls": self.saved,
+            "wasted_calls": self.wasted,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+# Create a global instance
+speculation_policy = SpeculationPolicy()
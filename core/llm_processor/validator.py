@@ -1,3 +1,268 @@
+import asyncio
+import json
+import math
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytz
+
+from config import config
+from core.llm_processor.schemas import ProcessingResult
+from core.messages import ERROR_PROCESSING_MESSAGE
+from core.models.common.llm_stage import LLMStage
+from core.models.common.transaction_repair import TransactionRepair
+from core.models.financial.transaction import DEFAULT_CATEGORY, Transaction
+from core.prompts import TRANSACTION_REPAIR_HUMAN_PROMPT, TRANSACTION_REPAIR_PROMPT
+from core.utils.async_utils import run_llm_call
+from core.utils.deadline import Deadline
+from core.utils.metrics import metrics
+from integrations.providers.llm_akash import RotatingLLMClientPool as LLMAgent
+from logging_config import get_logger
+
+DEFAULT_CURRENCY = "ARS"
+DEFAULT_DESCRIPTION = "Sin descripción"
+
+# Normalized spellings (lowercase, no accents, no spaces or dots) of the currencies users write
+CURRENCY_ALIASES = {
+    "ars": "ARS", "$": "ARS", "ar$": "ARS", "peso": "ARS", "pesos": "ARS", "pesosargentinos": "ARS",
+    "usd": "USD", "us$": "USD", "u$s": "USD", "u$d": "USD", "uss": "USD", "dolar": "USD", "dolares": "USD",
+    "dollar": "USD", "dollars": "USD", "verde": "USD", "verdes": "USD", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+}
+_CURRENCY_CODE = re.compile(r"^[A-Z]{3}$")
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+
+def _normalize(text: str) -> str:
+    """Lowercases a text and strips its accents, e.g. "Educación " -> "educacion"."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
 class LLMResponseValidator:
-    def validate(self, response):
-        pass 
\ No newline at end of file
+    """
+    Validates the transactions extracted by the LLM and repairs them locally when possible,
+    so a malformed field doesn't reach the user or end the message in an error.
+
+    Deterministic repairs:
+        - amount: made positive. Text amounts like "1.500,50" are parsed by the Transaction model.
+        - currency: spellings and symbols normalized to the code ("u$s" -> "USD"), ARS by default.
+        - date: a date in the future or more than a year ago, whose year isn't in the message,
+          is moved to the latest past occurrence of its day (the LLM copies the year of the examples).
+        - category: matched to the whitelist of the transaction type, ignoring case and accents.
+          A missing category is "otros".
+
+    Only the fields that can't be repaired (a zero amount, an unknown category) are extracted
+    again with a targeted LLM call. Transactions whose amount is still invalid are dropped, an
+    unknown category falls back to "otros". Repairs are recorded in the metrics registry as
+    `llm.validator.repaired.<field>`.
+    """
+    TIMEZONE = pytz.timezone("America/Argentina/Buenos_Aires")
+    # Tolerance for timezone slips ("Z" dates) before a date counts as future
+    MAX_FUTURE = timedelta(days=1)
+    MAX_AGE = timedelta(days=366)
+
+    def __init__(self, llm_repair: bool = config.LLM_VALIDATOR_LLM_REPAIR):
+        """
+        Initializes the validator.
+
+        Args:
+            llm_repair (bool): Whether the fields that can't be repaired locally are extracted again with the LLM.
+        """
+        self.llm_repair = llm_repair
+        self.llm_client = LLMAgent(stage=LLMStage.EXTRACTION)
+        self.logger = get_logger(__name__)
+
+    async def validate(
+        self, results: List[ProcessingResult], content: str, deadline: Optional[Deadline] = None
+    ) -> List[ProcessingResult]:
+        """
+        Validates and repairs the transactions of the results. Other results are returned as they are.
+
+        Args:
+            results (List[ProcessingResult]): The results of the pipeline.
+            content (str): The user message, used to check the dates and to repair with the LLM.
+            deadline (Optional[Deadline]): The time budget of the message, bounds the repair calls.
+
+        Returns:
+            List[ProcessingResult]: The results with the repaired transactions, without the ones that
+                                    couldn't be repaired. An error result if none is left.
+        """
+        transactions = [result.data_object for result in results if isinstance(result.data_object, Transaction)]
+        if not transactions:
+            return results
+
+        now = datetime.now(self.TIMEZONE)
+        repaired = await asyncio.gather(
+            *(self._validate_transaction(transaction, content, now, deadline) for transaction in transactions)
+        )
+        valid = [transaction for transaction in repaired if transaction is not None]
+        if not valid:
+            self.logger.warning(f"[LLMResponseValidator] No valid transaction left for content: {content}")
+            return [ProcessingResult(error=ERROR_PROCESSING_MESSAGE)]
+
+        others = [result for result in results if not isinstance(result.data_object, Transaction)]
+        return [ProcessingResult(data_object=transaction) for transaction in valid] + others
+
+    async def _validate_transaction(
+        self, transaction: Transaction, content: str, now: datetime, deadline: Optional[Deadline]
+    ) -> Optional[Transaction]:
+        """
+        Repairs a transaction, with the LLM for the fields that can't be repaired locally.
+
+        Returns:
+            Optional[Transaction]: The valid transaction, None if its amount is still invalid.
+        """
+        updates, invalid = self._repair(transaction, content, now)
+        if invalid and self.llm_repair:
+            repair = await self._repair_with_llm(transaction, invalid, content, deadline)
+            if repair is not None:
+                llm_updates, invalid = self._repair_fields(transaction, repair, invalid)
+                updates.update(llm_updates)
+        if "amount" in invalid:
+            metrics.increment("llm.validator.dropped")
+            self.logger.warning(f"[LLMResponseValidator] Dropping transaction without a valid amount: {transaction}")
+            return None
+        if "category" in invalid:
+            updates["category"] = DEFAULT_CATEGORY
+        for field in updates:
+            metrics.increment(f"llm.validator.repaired.{field}")
+        return transaction.model_copy(update=updates) if updates else transaction
+
+    def _repair(self, transaction: Transaction, content: str, now: datetime) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Repairs the fields of a transaction that have a deterministic fix.
+
+        Returns:
+            Tuple[Dict[str, Any], List[str]]: The repaired fields with their values,
+                                              and the names of the fields still invalid.
+        """
+        updates = {}
+        invalid = []
+
+        amount = self._repair_amount(transaction.amount)
+        if amount is None:
+            invalid.append("amount")
+        elif amount != transaction.amount:
+            updates["amount"] = amount
+
+        currency = self._repair_currency(transaction.currency)
+        if currency != transaction.currency:
+            updates["currency"] = currency
+
+        date = self._repair_date(transaction.date, content, now)
+        if date != transaction.date:
+            updates["date"] = date
+
+        category = self._repair_category(transaction, transaction.category)
+        if category is None:
+            invalid.append("category")
+        elif category != transaction.category:
+            updates["category"] = category
+
+        if not transaction.description or not transaction.description.strip():
+            updates["description"] = DEFAULT_DESCRIPTION
+        return updates, invalid
+
+    def _repair_fields(self, transaction: Transaction, repair: TransactionRepair, fields: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Checks the fields extracted again by the LLM.
+
+        Returns:
+            Tuple[Dict[str, Any], List[str]]: The repaired fields with their values,
+                                              and the names of the fields still invalid.
+        """
+        updates = {}
+        invalid = []
+        if "amount" in fields:
+            amount = self._repair_amount(repair.amount) if repair.amount is not None else None
+            if amount is None:
+                invalid.append("amount")
+            else:
+                updates["amount"] = amount
+        if "category" in fields:
+            category = self._repair_category(transaction, repair.category) if repair.category else None
+            if category is None:
+                invalid.append("category")
+            else:
+                updates["category"] = category
+        return updates, invalid
+
+    def _repair_amount(self, amount: float) -> Optional[float]:
+        """Returns the positive amount, None if it's zero or not a number."""
+        if not math.isfinite(amount) or amount == 0:
+            return None
+        return abs(amount)
+
+    def _repair_currency(self, currency: Optional[str]) -> str:
+        """Returns the currency code of a spelling, ARS if unknown."""
+        normalized = _normalize(currency or "").replace(" ", "").replace(".", "")
+        if normalized in CURRENCY_ALIASES:
+            return CURRENCY_ALIASES[normalized]
+        code = normalized.upper()
+        return code if _CURRENCY_CODE.match(code) else DEFAULT_CURRENCY
+
+    def _repair_date(self, date: datetime, content: str, now: datetime) -> datetime:
+        """
+        Returns the date moved to the latest past occurrence of its day when it's out of range
+        and the message doesn't state a year.
+        """
+        local_date = date if date.tzinfo else self.TIMEZONE.localize(date)
+        if now - self.MAX_AGE <= local_date <= now + self.MAX_FUTURE:
+            return date
+        if _YEAR.search(content):
+            # The user stated a year, trust it
+            return date
+        try:
+            repaired = date.replace(year=now.year)
+            if (repaired if repaired.tzinfo else self.TIMEZONE.localize(repaired)) > now + self.MAX_FUTURE:
+                repaired = repaired.replace(year=now.year - 1)
+        except ValueError:
+            # February 29 on a non-leap year
+            repaired = now if date.tzinfo else now.replace(tzinfo=None)
+        self.logger.info(f"[LLMResponseValidator] Repaired date {date.isoformat()} -> {repaired.isoformat()}")
+        return repaired
+
+    def _repair_category(self, transaction: Transaction, category: Optional[str]) -> Optional[str]:
+        """Returns the whitelisted category matching the given one, "otros" if missing, None if unknown."""
+        if not category or not category.strip():
+            return DEFAULT_CATEGORY
+        normalized = _normalize(category)
+        for valid in Transaction.valid_categories(transaction.action):
+            if _normalize(valid) == normalized:
+                return valid
+        return None
+
+    async def _repair_with_llm(
+        self, transaction: Transaction, fields: List[str], content: str, deadline: Optional[Deadline]
+    ) -> Optional[TransactionRepair]:
+        """
+        Extracts again the invalid fields of a transaction with a targeted LLM call.
+
+        Returns:
+            Optional[TransactionRepair]: The extracted fields, None if the call failed.
+        """
+        metrics.increment("llm.validator.llm_repairs")
+        human_prompt = TRANSACTION_REPAIR_HUMAN_PROMPT.format(
+            content=content,
+            transaction=json.dumps(
+                transaction.model_dump(mode="json", include={"amount", "currency", "description", "category", "action"}),
+                ensure_ascii=False,
+            ),
+            fields=", ".join(fields),
+            categories=", ".join(Transaction.valid_categories(transaction.action)),
+        )
+        try:
+            repair = await run_llm_call(
+                self.llm_client.generate_response,
+                system_template=TRANSACTION_REPAIR_PROMPT,
+                human_template=human_prompt,
+                output=TransactionRepair,
+                deadline=deadline
+            )
+        except Exception as e:
+            self.logger.error(f"[LLMResponseValidator] Error repairing {fields} with the LLM: {e}")
+            return None
+        self.logger.info(f"[LLMResponseValidator] LLM repair for {fields}: {repair}")
+        return repair if isinstance(repair, TransactionRepair) else None
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from config import config
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class PendingGroup:
+    """
+    Represents the messages of a user held to be processed together.
+    """
+    messages: List[Any] = field(metadata={"description": "Messages received in the window, in arrival order"})
+    merge: Callable[[List[Any]], Any] = field(metadata={"description": "Merges the messages into one"})
+    dispatch: Callable[[Any], Any] = field(metadata={"description": "Submits the message to process"})
+    first_at: float = field(metadata={"description": "Monotonic time the first message arrived"})
+    last_at: float = field(metadata={"description": "Monotonic time the last message arrived"})
+    timer: Optional[asyncio.Task] = field(default=None, metadata={"description": "Dispatches the group when the window ends"})
+
+
+class MessageCoalescer:
+    """
+    Merges the quick consecutive typed messages of a user ("gasté 2000", "en el super")
+    into a single message, so they are extracted together with one LLM pipeline run.
+
+    Messages are held before they are submitted to the scheduler, so the window
+    doesn't keep a processing slot busy and the next messages of the chat aren't
+    stuck behind it in the serial queue of the scheduler.
+
+    - The first message of a user is held `window_secs`; every message arriving in
+      the meantime joins it and restarts the window, up to `max_wait_secs` since
+      the first one.
+    - When the window ends, the messages are merged with the `merge` of the platform
+      and passed once to the `dispatch` of the first one, which submits it.
+    - `flush` dispatches the held messages of a user right away, so a later update
+      that isn't held (e.g. a voice note) is not processed before them.
+    - Merged messages and the latency added by the window are recorded in the
+      metrics registry under `messages.coalesce.*`.
+
+    Groups live in the process, messages of a user delivered to different workers
+    are not merged. Held messages are only persisted for a restart once dispatched,
+    so `flush_all` must run before the shutdown drain. Must be used from a single
+    event loop (the server loop).
+    """
+
+    def __init__(
+        self,
+        window_secs: float = config.MESSAGE_COALESCE_WINDOW_SECS,
+        max_wait_secs: float = config.MESSAGE_COALESCE_MAX_WAIT_SECS,
+    ) -> None:
+        """
+        Initializes the message coalescer.
+
+        Args:
+            window_secs (float): Time to wait for another message of the user. 0 disables coalescing.
+            max_wait_secs (float): Longest a message waits for later ones.
+        """
+        self.window_secs = window_secs
+        self.max_wait_secs = max_wait_secs
+        self._groups: Dict[Hashable, PendingGroup] = {}
+        self.groups = 0
+        self.merged = 0
+
+    def add(
+        self,
+        key: Hashable,
+        message: T,
+        merge: Callable[[List[T]], T],
+        dispatch: Callable[[T], Any],
+    ) -> None:
+        """
+        Holds a typed message for the coalescing window of the user, or joins it to the held ones.
+
+        Args:
+            key (Hashable): The user (or chat) the message belongs to, with its platform.
+            message (T): The received platform message or update.
+            merge (Callable): Builds one message with the text of the given ones, in order.
+            dispatch (Callable): Submits the message to process. Only the one of the first message is called.
+        """
+        if self.window_secs <= 0:
+            dispatch(message)
+            return
+
+        now = time.monotonic()
+        group = self._groups.get(key)
+        if group is not None:
+            group.messages.append(message)
+            group.last_at = now
+            return
+
+        group = PendingGroup(messages=[message], merge=merge, dispatch=dispatch, first_at=now, last_at=now)
+        self._groups[key] = group
+        group.timer = asyncio.create_task(self._wait_and_dispatch(key, group), name=f"coalesce-{key}")
+
+    def flush(self, key: Hashable) -> None:
+        """
+        Dispatches the held messages of the user right away, if any.
+
+        Args:
+            key (Hashable): The user (or chat) the messages belong to, as given to add.
+        """
+        group = self._groups.get(key)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+        self._dispatch(key, group)
+
+    def flush_all(self) -> None:
+        """Dispatches every held message right away, e.g. before shutting down."""
+        for key in list(self._groups):
+            self.flush(key)
+
+    async def _wait_and_dispatch(self, key: Hashable, group: PendingGroup) -> None:
+        while (wait := self._remaining(group)) > 0:
+            await asyncio.sleep(wait)
+        try:
+            self._dispatch(key, group)
+        except Exception as e:
+            logger.error(f"Error dispatching coalesced messages of {key}: {e}")
+
+    def _dispatch(self, key: Hashable, group: PendingGroup) -> None:
+        if self._groups.get(key) is group:
+            del self._groups[key]
+
+        self.groups += 1
+        metrics.increment("messages.coalesce.groups")
+        metrics.observe("messages.coalesce.added_latency_seconds", time.monotonic() - group.first_at)
+        if len(group.messages) == 1:
+            group.dispatch(group.messages[0])
+            return
+
+        merged = len(group.messages) - 1
+        self.merged += merged
+        metrics.increment("messages.coalesce.merged", merged)
+        logger.info("Coalesced user messages", extra={"key": str(key), "messages": len(group.messages)})
+        group.dispatch(group.merge(group.messages))
+
+    def _remaining(self, group: PendingGroup) -> float:
+        deadline = min(group.last_at + self.window_secs, group.first_at + self.max_wait_secs)
+        return deadline - time.monotonic()
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the coalescing.
+
+        Returns:
+            dict: The window, the processed groups, the merged messages and the users currently waiting.
+        """
+        return {
+            "window_secs": self.window_secs,
+            "groups": self.groups,
+            "merged_messages": self.merged,
+            "waiting_users": len(self._groups),
+        }
+
+
+# Create a global instance
+message_coalescer = MessageCoalescer()
@@ -1,15 +1,23 @@
 # core/message_processor.py
-from typing import List
+from typing import List, Optional, Tuple
 
+from core.admission_controller import AdmissionRejectedError, admission_controller
 from core.data_server import DataSaver
 from core.interfaces.platform_adapter import PlatformAdapter
 from core.llm_processor.orchestrator import LLMOrchestrator
 from core.llm_processor.schemas import ProcessingResult
 from core.messages import (
+    BATCH_CONFIRMATION_HEADER,
+    BATCH_CONFIRMATION_ITEM,
+    CANCEL_ALL_BUTTON,
     CANCEL_BUTTON,
     CANCEL_MESSAGE,
+    CONFIRM_ALL_BUTTON,
     CONFIRM_BUTTON,
+    ERROR_PROCESSING_MESSAGE,
+    BATCH_IN_PROGRESS,
     MESSAGE_NOT_FOUND,
+    OVERLOADED_MESSAGE,
     SAVE_ERROR,
     SAVE_ERROR_CTA,
     SAVE_SUCCESS,
@@ -19,15 +27,29 @@ from core.messages import (
 )
 from core.models.common.command_button import CommandButton
 from core.models.common.simple_message import SimpleStringResponse
-from core.models.message import Message
+from core.models.base_model import FinancialModel
+from core.models.message import BatchItemStatus, Message, PendingBatch
+from core.reaction_dispatcher import reaction_dispatcher
 from core.services.message_service import MessageService
 from core.user_data_manager import UserDataManager
+from core.utils.deadline import Deadline
+from core.utils.metrics import metrics
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
 CONFIRM_SAVE = 1
 
+# Callback data of the batch confirmation buttons: <action>#<batch_id>[:<item index>]
+BATCH_CALLBACK_PATTERN = r"^(confirmall|cancelall|confirmitem|cancelitem)#"
+
+BATCH_STATUS_EMOJIS = {
+    BatchItemStatus.PENDING: "",
+    BatchItemStatus.CONFIRMED: "✅ ",
+    BatchItemStatus.CANCELLED: "❌ ",
+    BatchItemStatus.FAILED: "⚠️ ",
+}
+
 
 class MessageProcessor:
     def __init__(self):
@@ -41,31 +63,75 @@ class MessageProcessor:
         self,
         user_message: Message,
         platform: PlatformAdapter,
+        deadline: Optional[Deadline] = None,
     ) -> int:
         """
         Processes the user's message using the LLMProcessor and sends responses
-        with confirmation options.
+        with confirmation options. The work only starts once the admission
+        controller grants a processing slot; otherwise the user gets an overload message.
 
         Args:
             update: The Telegram Update object.
             context: The Telegram Context object.
+            deadline: The time budget of the message, started when its update arrived.
+                      A new one is started if not given.
 
         Returns:
             int: The state for the conversation handler (CONFIRM_SAVE).
         """
-        await platform.react_message("⏳")
+        deadline = deadline or Deadline.for_message()
+        try:
+            async with admission_controller.admit(user_message.user_id):
+                return await self._process_and_respond(user_message, platform, deadline)
+        except AdmissionRejectedError as e:
+            logger.warning(
+                "Message rejected by admission control",
+                extra={
+                    "user_id": user_message.user_id,
+                    "message_id": user_message.message_id,
+                    "reason": e.reason,
+                },
+            )
+            await platform.reply_text(OVERLOADED_MESSAGE)
+            return -1
+
+    async def _process_and_respond(
+        self,
+        user_message: Message,
+        platform: PlatformAdapter,
+        deadline: Deadline,
+    ) -> int:
+        """
+        Runs the LLM pipeline for an admitted message and sends the responses.
+        """
+        reaction = reaction_dispatcher.react(platform, "⏳")
+        try:
+            return await self._respond(user_message, platform, deadline)
+        finally:
+            reaction_dispatcher.clear(reaction)
+
+    async def _respond(
+        self,
+        user_message: Message,
+        platform: PlatformAdapter,
+        deadline: Deadline,
+    ) -> int:
         results: List[ProcessingResult] = await self.llm_processor.process_content(
-            user_message.message_text
+            user_message.message_text, user_id=user_message.user_id, deadline=deadline
         )
 
+        data_objects = [result.data_object for result in results if result.data_object]
+        if len(data_objects) > 1:
+            # One message (and one cache entry) for all the movements instead of one per movement
+            await self._send_batch_confirmation(user_message, platform, data_objects)
+            # The other results (e.g. an answer to a question in the same message) are still sent
+            for result in results:
+                if not result.data_object:
+                    await self._reply_result(platform, result)
+            return CONFIRM_SAVE
+
         for idx, result in enumerate(results):
-            if result.error:
-                await platform.reply_text(f"❌ {result.error}")
-                await platform.delete_reaction()
-                return -1
-            if result.response_text:
-                await platform.reply_text(result.response_text)
-                await platform.delete_reaction()
+            if await self._reply_result(platform, result):
                 return -1
             elif result.data_object:
                 response_text = result.data_object.to_presentation_string(
@@ -94,12 +160,10 @@ class MessageProcessor:
 
                 self.message_service.save_message(message=response_message)
 
-        await platform.delete_reaction()
-
         return CONFIRM_SAVE
 
     def save_and_respond(
-        self, user_id: str, message_id: str, platform: PlatformAdapter
+        self, user_id: str, message_id: str, platform: PlatformAdapter, deadline: Optional[Deadline] = None
     ) -> str:
         """
         Process and save a message for a specific user.
@@ -108,6 +172,7 @@ class MessageProcessor:
             user_id (str): The ID of the user
             message_id (str): The ID of the message to process
             platform (PlatformAdapter): The platform adapter instance
+            deadline (Optional[Deadline]): The time budget of the request, bounds the storage writes
 
         Returns:
             str: Response message
@@ -142,7 +207,7 @@ class MessageProcessor:
             return USER_NOT_FOUND
 
         success = self.data_saver.save_content(
-            recovered_message.message_object, user=user
+            recovered_message.message_object, user=user, deadline=deadline
         )
 
         if success:
@@ -176,6 +241,211 @@ class MessageProcessor:
                 recovered_message.message_object.get_description(), False
             )
 
+    async def _reply_result(self, platform: PlatformAdapter, result: ProcessingResult) -> bool:
+        """
+        Sends the error or the response text of a result.
+
+        Returns:
+            bool: True if a reply was sent, False if the result has none.
+        """
+        if result.error:
+            await platform.reply_text(f"❌ {result.error}")
+            return True
+        if result.response_stream:
+            try:
+                await platform.reply_text_stream(result.response_stream)
+            except Exception as e:
+                logger.error(f"Error streaming response: {e}", exc_info=True)
+                await platform.reply_text(f"❌ {ERROR_PROCESSING_MESSAGE}")
+            return True
+        if result.response_text:
+            await platform.reply_text(result.response_text)
+            return True
+        return False
+
+    async def _send_batch_confirmation(
+        self,
+        user_message: Message,
+        platform: PlatformAdapter,
+        data_objects: List[FinancialModel],
+    ) -> None:
+        """
+        Sends a single confirmation message listing all the extracted movements,
+        with buttons to confirm or cancel all of them or each one.
+        """
+        batch = PendingBatch(
+            user_id=user_message.user_id,
+            batch_id=platform.get_message_id(),
+            source=user_message.source,
+            items=data_objects,
+        )
+        # Saved before replying, so the buttons never point to a missing batch
+        self.message_service.save_batch(batch)
+        text, buttons = self._render_batch(batch, platform)
+        await platform.reply_with_buttons(text=text, buttons=buttons)
+
+    @staticmethod
+    def parse_batch_callback(callback_data: str) -> Tuple[str, bool, Optional[int]]:
+        """
+        Parses the callback data of a batch confirmation button.
+
+        Args:
+            callback_data (str): The callback data, e.g. "confirmall#123" or "cancelitem#123:2".
+
+        Returns:
+            Tuple[str, bool, Optional[int]]: The batch ID, whether it is a confirmation
+                                             and the item index (None for all the items).
+        """
+        action, _, payload = callback_data.partition("#")
+        batch_id, _, index = payload.partition(":")
+        return batch_id, action.startswith("confirm"), int(index) if action.endswith("item") else None
+
+    def resolve_batch_and_respond(
+        self,
+        user_id: str,
+        batch_id: str,
+        platform: PlatformAdapter,
+        confirm: bool,
+        index: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[str, List[CommandButton]]:
+        """
+        Confirms or cancels the pending items of a batch. Confirmed items are saved
+        together with one request per storage target. The batch is locked meanwhile, so
+        concurrent taps on its buttons never save the same item twice.
+
+        Args:
+            user_id (str): The unique identifier of the user who owns the batch
+            batch_id (str): The ID of the batch
+            platform (PlatformAdapter): The platform adapter instance
+            confirm (bool): True to save the items, False to cancel them
+            index (Optional[int]): The item to resolve. None resolves all the pending items.
+            deadline (Optional[Deadline]): The time budget of the request, bounds the storage writes
+
+        Returns:
+            Tuple[str, List[CommandButton]]: The updated batch message and the buttons
+                                             for the items still pending.
+        """
+        wait_secs = self.message_service.BATCH_LOCK_SECONDS
+        if deadline:
+            wait_secs = min(wait_secs, deadline.remaining())
+        if not self.message_service.lock_batch(user_id, batch_id, platform.get_platform_name(), wait_secs):
+            metrics.increment("batch.lock_timeouts")
+            return BATCH_IN_PROGRESS, []
+        try:
+            return self._resolve_batch(user_id, batch_id, platform, confirm, index, deadline)
+        finally:
+            self.message_service.unlock_batch(user_id, batch_id, platform.get_platform_name())
+
+    def _resolve_batch(
+        self,
+        user_id: str,
+        batch_id: str,
+        platform: PlatformAdapter,
+        confirm: bool,
+        index: Optional[int],
+        deadline: Optional[Deadline],
+    ) -> Tuple[str, List[CommandButton]]:
+        """
+        Resolves the items of a batch, holding its lock. Items already resolved
+        by an earlier tap are skipped.
+        """
+        log_extra = {
+            "user_id": user_id,
+            "batch_id": batch_id,
+            "platform": platform.get_platform_name(),
+        }
+        batch = self.message_service.get_batch(
+            user_id=user_id, batch_id=batch_id, platform=platform.get_platform_name()
+        )
+        if not batch:
+            logger.warning("Batch not found", extra=log_extra)
+            return MESSAGE_NOT_FOUND, []
+
+        targets = [
+            item_index
+            for item_index in ([index] if index is not None else batch.pending_indexes())
+            if 0 <= item_index < len(batch.items) and batch.statuses[item_index] == BatchItemStatus.PENDING
+        ]
+
+        status = BatchItemStatus.CANCELLED
+        if confirm and targets:
+            user = self.user_data_manager.get_user_data(user_id)
+            if not user:
+                logger.warning("User not found", extra=log_extra)
+                return USER_NOT_FOUND, []
+            success = self.data_saver.save_contents(
+                [batch.items[item_index] for item_index in targets], user=user, deadline=deadline
+            )
+            status = BatchItemStatus.CONFIRMED if success else BatchItemStatus.FAILED
+            if not success:
+                logger.error("Failed to save batch items", extra={**log_extra, "items": targets})
+
+        for item_index in targets:
+            batch.statuses[item_index] = status
+        logger.info("Batch items resolved", extra={**log_extra, "items": targets, "status": status.value})
+
+        if batch.pending_indexes():
+            self.message_service.save_batch(batch)
+        else:
+            self.message_service.delete_batch(
+                user_id=batch.user_id, batch_id=batch.batch_id, platform=batch.source
+            )
+
+        text, buttons = self._render_batch(batch, platform)
+        if not buttons:
+            if BatchItemStatus.FAILED in batch.statuses:
+                text = f"{text}\n\n{SAVE_ERROR_CTA}"
+            elif BatchItemStatus.CONFIRMED in batch.statuses:
+                text = f"{text}\n\n{SAVE_SUCCESS_CTA}"
+        return text, buttons
+
+    def _render_batch(
+        self, batch: PendingBatch, platform: PlatformAdapter
+    ) -> Tuple[str, List[CommandButton]]:
+        """
+        Builds the batch confirmation message and the buttons for its pending items.
+        Items are shown by their description only when the full presentation doesn't
+        fit in a message with buttons.
+        """
+        platform_name = platform.get_platform_name()
+        max_length = platform.MAX_BUTTONS_TEXT_LENGTH
+
+        text = self._format_batch(batch, lambda item: item.to_presentation_string(platform_name))
+        if len(text) > max_length:
+            text = self._format_batch(batch, lambda item: item.get_description())[:max_length]
+
+        pending = batch.pending_indexes()
+        buttons: List[CommandButton] = []
+        if len(pending) > 1:
+            buttons = [
+                CommandButton(text=CONFIRM_ALL_BUTTON, callback_data=f"confirmall#{batch.batch_id}", row=0),
+                CommandButton(text=CANCEL_ALL_BUTTON, callback_data=f"cancelall#{batch.batch_id}", row=0),
+            ]
+        # Platforms with few buttons per message get the buttons of the first pending items,
+        # the next ones show up as those are resolved
+        if platform.MAX_REPLY_BUTTONS is not None:
+            pending = pending[:max(platform.MAX_REPLY_BUTTONS - len(buttons), 0) // 2]
+        buttons.extend(
+            button
+            for item_index in pending
+            for button in (
+                CommandButton(text=f"✅ {item_index + 1}", callback_data=f"confirmitem#{batch.batch_id}:{item_index}", row=item_index + 1),
+                CommandButton(text=f"❌ {item_index + 1}", callback_data=f"cancelitem#{batch.batch_id}:{item_index}", row=item_index + 1),
+            )
+        )
+        return text, buttons
+
+    def _format_batch(self, batch: PendingBatch, format_item) -> str:
+        """
+        Formats the numbered list of the batch items, prefixed with their status.
+        """
+        lines = [BATCH_CONFIRMATION_HEADER.format(count=len(batch.items))]
+        for item_index, (item, status) in enumerate(zip(batch.items, batch.statuses)):
+            prefix = BATCH_CONFIRMATION_ITEM.format(status=BATCH_STATUS_EMOJIS[status], number=item_index + 1)
+            lines.append(f"{prefix} {format_item(item).strip()}")
+        return "\n".join(lines)
+
     def cancel_and_respond(
         self, user_id: str, message_id: str, platform: PlatformAdapter
     ) -> str:
@@ -247,12 +247,16 @@ All messages are formatted in HTML for better presentation.
 # Error messages
 UNEXPECTED_ERROR = "❌ Hubo un error inesperado durante el procesamiento."
 MESSAGE_NOT_FOUND = "❌ No se encontró el mensaje original."
+BATCH_IN_PROGRESS = "⏳ Todavía estoy guardando estos movimientos, probá de nuevo en unos segundos."
 USER_NOT_FOUND = "❌ Ocurrió un error inesperado al buscar el usuario."
 CANCEL_MESSAGE = "Movimiento Cancelado ❌"
 SAVE_ERROR = "Error ❌"
 SAVE_ERROR_CTA = (
     "Hubo un error al guardar tus datos. Por favor, intentá nuevamente más tarde."
 )
+OVERLOADED_MESSAGE = (
+    "⏳ Estoy con mucha carga en este momento. Por favor, enviame tu mensaje nuevamente en unos minutos."
+)
 
 # Success messages
 SAVE_SUCCESS = "Confirmado ✅"
@@ -261,6 +265,14 @@ SAVE_SUCCESS_CTA = "Podes verlo en www.quipubot.app"
 # Button texts
 CONFIRM_BUTTON = "✅ Confirmar"
 CANCEL_BUTTON = "❌ Cancelar"
+CONFIRM_ALL_BUTTON = "✅ Confirmar todo"
+CANCEL_ALL_BUTTON = "❌ Cancelar todo"
+# Button opening the options when they don't fit as buttons (WhatsApp lists)
+BUTTONS_LIST_TITLE = "Ver opciones"
+
+# Batch confirmation (several movements in one message)
+BATCH_CONFIRMATION_HEADER = "Encontré {count} movimientos:"
+BATCH_CONFIRMATION_ITEM = "{status}{number}."
 
 MSG_WEBAPP_NOT_REGISTERED_HTML = (
     "🚫 <b>¡Aún no creaste una cuenta en nuestra página web!</b>\n\n"
@@ -275,6 +287,7 @@ MSG_WEBAPP_NOT_REGISTERED_HTML = (
 # Voice Processing Messages
 MSG_VOICE_NO_TEXT = "❌ <b>No pude entender el mensaje de voz</b>\n\nPor favor, intentá enviar el mensaje nuevamente o escribí el texto directamente 📝"
 MSG_VOICE_PROCESSING_ERROR = "❌ <b>Hubo un error al procesar el mensaje de voz</b>\n\nPor favor, intentá nuevamente en unos minutos 🎙️"
+MSG_VOICE_TOO_LONG = "⏱️ <b>El mensaje de voz es demasiado largo</b>\n\nPor favor, enviá audios de hasta {max_duration} segundos 🎙️"
 
 ERROR_PROCESSING_MESSAGE = """No se pudo determinar una acción para registrar en base al mensaje. \
 \n Pobrá especificando el movimiento con "Gasté" o "Recibí" seguido del monto y la descripción del movimiento.
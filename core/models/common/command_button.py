@@ -1,11 +1,16 @@
+from typing import Optional
+
+
 class CommandButton:
-    def __init__(self, text: str, callback_data: str):
+    def __init__(self, text: str, callback_data: str, row: Optional[int] = None):
         """
         Initializes a CommandButton instance.
 
         Args:
             text (str): The text of the button.
             callback_data (str): The callback data associated with the button.
+            row (Optional[int]): Buttons with the same row are shown side by side where the platform allows it.
         """
         self.text = text
         self.callback_data = callback_data
+        self.row = row
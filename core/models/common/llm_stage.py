@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+from config import config
+
+
+class LLMStage(str, Enum):
+    """Defines the stages of the message pipeline that call the LLM."""
+    CLASSIFICATION = "classification"  # Action detection
+    EXTRACTION = "extraction"  # Financial actions from a transaction message
+    CONVERSATION = "conversation"  # Answers to questions, social and unknown messages
+
+
+@dataclass(frozen=True)
+class LLMStageSettings:
+    """
+    Represents the model configuration of a pipeline stage.
+    """
+    model_name: str = field(metadata={"description": "Model used by the stage"})
+    temperature: float = field(metadata={"description": "Sampling temperature"})
+    timeout: float = field(metadata={"description": "Request timeout in seconds"})
+    max_tokens: Optional[int] = field(default=None, metadata={"description": "Maximum output tokens, None for the model default"})
+    input_cost_per_million: float = field(default=0.0, metadata={"description": "USD per million input tokens, used to report cost"})
+    output_cost_per_million: float = field(default=0.0, metadata={"description": "USD per million output tokens, used to report cost"})
+
+    @classmethod
+    def for_stage(cls, stage: LLMStage) -> "LLMStageSettings":
+        """
+        Returns the settings of a stage from the LLM_<STAGE>_* config values.
+
+        Args:
+            stage (LLMStage): The pipeline stage.
+
+        Returns:
+            LLMStageSettings: The stage settings.
+        """
+        prefix = f"LLM_{stage.name}"
+        return cls(
+            model_name=getattr(config, f"{prefix}_MODEL"),
+            temperature=getattr(config, f"{prefix}_TEMPERATURE"),
+            timeout=getattr(config, f"{prefix}_TIMEOUT"),
+            max_tokens=getattr(config, f"{prefix}_MAX_TOKENS"),
+            input_cost_per_million=getattr(config, f"{prefix}_INPUT_COST_PER_1M"),
+            output_cost_per_million=getattr(config, f"{prefix}_OUTPUT_COST_PER_1M"),
+        )
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """
+        Returns the cost in USD of a request.
+
+        Args:
+            input_tokens (int): Prompt tokens.
+            output_tokens (int): Completion tokens.
+        """
+        return (
+            input_tokens * self.input_cost_per_million
+            + output_tokens * self.output_cost_per_million
+        ) / 1_000_000
@@ -0,0 +1,9 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class TransactionRepair(BaseModel):
+    """Represents the fields of a transaction extracted again by the LLM, when they couldn't be repaired locally."""
+    amount: Optional[float] = Field(default=None, description="Positive transaction amount, null if unknown")
+    category: Optional[str] = Field(default=None, description="Transaction category from the valid ones, null if unknown")
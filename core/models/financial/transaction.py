@@ -1,11 +1,12 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from core.models.base_model import FinancialModel
 from core.models.user import User
+from core.utils.amount_utils import parse_amount
 
 
 class TransactionType(str, Enum):
@@ -15,6 +16,18 @@ class TransactionType(str, Enum):
     INCOME = "ingreso"
 
 
+# Valid categories of each transaction type, keep in sync with TRANSACTION_PROMPT
+EXPENSE_CATEGORIES = (
+    "comida", "transporte", "alquiler", "servicios", "salud", "educación", "ocio",
+    "regalo", "deporte", "hogar", "viajes", "gastos mensuales", "otros",
+)
+INCOME_CATEGORIES = (
+    "salario", "venta", "regalo", "freelance", "inversión", "reembolso",
+    "ingresos recurrentes", "premio", "otros",
+)
+DEFAULT_CATEGORY = "otros"
+
+
 class Transaction(BaseModel, FinancialModel):
     """Represents a financial transaction."""
 
@@ -27,6 +40,17 @@ class Transaction(BaseModel, FinancialModel):
     )  # :TODO This could be an Enum. One for income and other for expenses.
     action: TransactionType = Field(description="Transaction action (income/expense)")
 
+    @field_validator("amount", mode="before")
+    @classmethod
+    def _parse_amount(cls, value: Any) -> Any:
+        """Accepts amounts written as text, e.g. "1.500,50"."""
+        return parse_amount(value) if isinstance(value, str) else value
+
+    @classmethod
+    def valid_categories(cls, action: TransactionType) -> Tuple[str, ...]:
+        """Returns the valid categories of a transaction type."""
+        return INCOME_CATEGORIES if action == TransactionType.INCOME else EXPENSE_CATEGORIES
+
     def _to_telegram_presentation(self) -> str:
         """
         Returns a formatted string representation for Telegram.
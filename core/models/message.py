@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 from core.models.base_model import FinancialModel 
 from core.models.common.source import Source
 
@@ -12,4 +13,32 @@ class Message:
     message_id: str = field(metadata={"description": "Message ID"})
     message_text: str = field(metadata={"description": "Message text"})
     source: Source = field(metadata={"description": "Source of the message (Telegram, WhatsApp)"})
-    message_object: Optional[FinancialModel] = field(default=None, metadata={"description": "Financial model associated with the message. It's optional because receive message don't have this attribute yet."})
\ No newline at end of file
+    message_object: Optional[FinancialModel] = field(default=None, metadata={"description": "Financial model associated with the message. It's optional because receive message don't have this attribute yet."})
+
+
+class BatchItemStatus(str, Enum):
+    """Defines the confirmation status of an item of a PendingBatch."""
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass
+class PendingBatch:
+    """
+    Represents the financial items extracted from a single user message, waiting for confirmation.
+    """
+    user_id: str = field(metadata={"description": "User ID from Supabase. Not telegram, not whatsapp, not webapp"})
+    batch_id: str = field(metadata={"description": "ID of the user message the items were extracted from"})
+    source: Source = field(metadata={"description": "Source of the message (Telegram, WhatsApp)"})
+    items: List[FinancialModel] = field(metadata={"description": "Financial models extracted from the message"})
+    statuses: List[BatchItemStatus] = field(default_factory=list, metadata={"description": "Confirmation status of each item"})
+
+    def __post_init__(self):
+        if not self.statuses:
+            self.statuses = [BatchItemStatus.PENDING] * len(self.items)
+
+    def pending_indexes(self) -> List[int]:
+        """Returns the indexes of the items that are not confirmed or cancelled yet."""
+        return [index for index, status in enumerate(self.statuses) if status == BatchItemStatus.PENDING]
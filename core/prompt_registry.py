@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional
+
+from config import config
+from core.models.common.llm_stage import LLMStage
+from core.prompts import (
+    ACTION_PROMPT,
+    PROMPT_VERSION,
+    QUESTION_RESPONSE_PROMPT,
+    QUESTION_RESPONSE_PROMPT_COMPACT,
+    SOCIAL_MESSAGE_RESPONSE_PROMPT,
+    TRANSACTION_PROMPT,
+    TRANSACTION_PROMPT_COMPACT,
+    UNKNOWN_MESSAGE_RESPONSE_PROMPT,
+)
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FULL_VARIANT = "full"
+COMPACT_VARIANT = "compact"
+
+
+class PromptName(str, Enum):
+    """Defines the system prompts of the message pipeline."""
+    ACTION = "action"
+    TRANSACTION = "transaction"
+    QUESTION = "question"
+    SOCIAL_MESSAGE = "social_message"
+    UNKNOWN_MESSAGE = "unknown_message"
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """
+    Represents a version of a system prompt.
+    """
+    name: PromptName = field(metadata={"description": "Prompt the variant belongs to"})
+    variant: str = field(metadata={"description": "Variant name, e.g. full or compact"})
+    version: str = field(metadata={"description": "Version of the variant text, bumped when it changes"})
+    template: str = field(metadata={"description": "System prompt, with '{{' and '}}' for literal braces"})
+    stage: LLMStage = field(metadata={"description": "Pipeline stage the prompt is sent in"})
+    description: str = field(default="", metadata={"description": "What changes compared to the full variant"})
+
+    @property
+    def key(self) -> str:
+        """Returns the identifier of the variant, e.g. "transaction:compact:1"."""
+        return f"{self.name.value}:{self.variant}:{self.version}"
+
+
+class PromptRegistry:
+    """
+    Holds the variants of every system prompt and serves the active one.
+
+    The "full" variant of each prompt is the one in core/prompts.py. Other variants (e.g.
+    "compact", with fewer examples) are served only when selected in LLM_PROMPT_VARIANTS,
+    after comparing them with scripts/evaluate_prompt_variants.py. The LLM response cache
+    keys on the prompt text, so switching variants never serves answers of another one.
+    """
+
+    def __init__(self, active: Dict[str, str] = config.LLM_PROMPT_VARIANTS) -> None:
+        """
+        Initializes the registry.
+
+        Args:
+            active (Dict[str, str]): The variant to serve by prompt name, "full" for the ones not listed.
+        """
+        self._variants: Dict[PromptName, Dict[str, PromptVariant]] = {}
+        self._active = dict(active)
+
+    def register(self, variant: PromptVariant) -> None:
+        """
+        Registers a prompt variant, replacing the one with the same name and variant.
+
+        Args:
+            variant (PromptVariant): The variant to register.
+        """
+        self._variants.setdefault(variant.name, {})[variant.variant] = variant
+
+    def get(self, name: PromptName, variant: Optional[str] = None) -> PromptVariant:
+        """
+        Returns a prompt variant.
+
+        Args:
+            name (PromptName): The prompt.
+            variant (Optional[str]): The variant, the active one if not given.
+
+        Returns:
+            PromptVariant: The variant, or the full one if the requested variant isn't registered.
+        """
+        variants = self._variants[name]
+        requested = variant or self._active.get(name.value, FULL_VARIANT)
+        if requested not in variants:
+            logger.warning(f"Prompt variant {name.value}:{requested} not registered, using {FULL_VARIANT}")
+            requested = FULL_VARIANT
+        return variants[requested]
+
+    def variants(self, name: PromptName) -> List[PromptVariant]:
+        """
+        Returns every variant of a prompt, the full one first.
+
+        Args:
+            name (PromptName): The prompt.
+
+        Returns:
+            List[PromptVariant]: The registered variants.
+        """
+        variants = self._variants.get(name, {})
+        return sorted(variants.values(), key=lambda variant: variant.variant != FULL_VARIANT)
+
+    def active(self) -> Dict[str, str]:
+        """
+        Returns the key of the variant served for each prompt.
+
+        Returns:
+            Dict[str, str]: The variant keys by prompt name.
+        """
+        return {name.value: self.get(name).key for name in self._variants}
+
+
+# Create a global instance
+prompt_registry = PromptRegistry()
+
+for _name, _template, _stage in (
+    (PromptName.ACTION, ACTION_PROMPT, LLMStage.CLASSIFICATION),
+    (PromptName.TRANSACTION, TRANSACTION_PROMPT, LLMStage.EXTRACTION),
+    (PromptName.QUESTION, QUESTION_RESPONSE_PROMPT, LLMStage.CONVERSATION),
+    (PromptName.SOCIAL_MESSAGE, SOCIAL_MESSAGE_RESPONSE_PROMPT, LLMStage.CONVERSATION),
+    (PromptName.UNKNOWN_MESSAGE, UNKNOWN_MESSAGE_RESPONSE_PROMPT, LLMStage.CONVERSATION),
+):
+    prompt_registry.register(PromptVariant(_name, FULL_VARIANT, PROMPT_VERSION, _template, _stage))
+
+prompt_registry.register(PromptVariant(
+    PromptName.TRANSACTION, COMPACT_VARIANT, "1", TRANSACTION_PROMPT_COMPACT, LLMStage.EXTRACTION,
+    description="Rules merged into the field list, one example with two transactions instead of four",
+))
+prompt_registry.register(PromptVariant(
+    PromptName.QUESTION, COMPACT_VARIANT, "1", QUESTION_RESPONSE_PROMPT_COMPACT, LLMStage.CONVERSATION,
+    description="Condensed app context, no examples",
+))
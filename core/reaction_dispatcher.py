@@ -0,0 +1,138 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+from config import config
+from core.interfaces.platform_adapter import PlatformAdapter
+from core.task_supervisor import task_supervisor
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ReactionHandle:
+    """
+    Represents a status reaction dispatched on a user message.
+    """
+    platform: PlatformAdapter = field(metadata={"description": "The adapter of the update the reaction belongs to"})
+    emoji: str = field(metadata={"description": "The emoji of the reaction"})
+    task: Optional[asyncio.Task] = field(default=None, metadata={"description": "The task sending the reaction"})
+    sent: bool = field(default=False, metadata={"description": "Whether the reaction request was sent to the platform"})
+
+
+class ReactionDispatcher:
+    """
+    Sends the status reactions (⏳, 🎧) in the background, off the message critical path.
+
+    - Reactions and their removal run as supervised tasks; failures are logged
+      and counted, never raised to the caller.
+    - A reaction is only sent after `coalesce_window_secs`. If it is cleared
+      before that (the reply was fast), neither the reaction nor its removal
+      reach the platform.
+    - Requests for the same message run in order, so a removal never overtakes
+      the reaction it removes.
+
+    Must be used from a single event loop (the server loop).
+    """
+
+    def __init__(self, coalesce_window_secs: float = config.REACTION_COALESCE_SECS) -> None:
+        """
+        Initializes the reaction dispatcher.
+
+        Args:
+            coalesce_window_secs (float): Delay before a reaction is sent, so it can be
+                                          dropped if it is cleared within that time.
+        """
+        self.coalesce_window_secs = coalesce_window_secs
+        self._last_tasks: Dict[str, asyncio.Task] = {}
+
+    def react(self, platform: PlatformAdapter, emoji: str) -> ReactionHandle:
+        """
+        Schedules a reaction on the message of the update. Does not wait for it.
+
+        Args:
+            platform (PlatformAdapter): The adapter of the update to react to.
+            emoji (str): The emoji to react with.
+
+        Returns:
+            ReactionHandle: The handle to pass to `clear`.
+        """
+        handle = ReactionHandle(platform=platform, emoji=emoji)
+
+        async def send() -> None:
+            handle.sent = True
+            await platform.react_message(emoji)
+
+        handle.task = self._dispatch(platform, "react", send, delay=self.coalesce_window_secs)
+        return handle
+
+    def clear(self, handle: Optional[ReactionHandle]) -> None:
+        """
+        Removes a reaction scheduled with `react`. Does not wait for it.
+
+        Args:
+            handle (Optional[ReactionHandle]): The handle returned by `react`.
+        """
+        if handle is None:
+            return
+        if not handle.sent:
+            # The reaction never reached the platform, there is nothing to remove
+            if handle.task and not handle.task.done():
+                handle.task.cancel()
+                metrics.increment("reactions.coalesced")
+            return
+        self._dispatch(handle.platform, "delete", handle.platform.delete_reaction)
+
+    def _dispatch(
+        self,
+        platform: PlatformAdapter,
+        action: str,
+        request: Callable[[], Awaitable],
+        delay: float = 0.0,
+    ) -> Optional[asyncio.Task]:
+        message_key = f"{platform.get_platform_name().value}:{platform.get_message_id()}"
+        previous = self._last_tasks.get(message_key)
+        task = task_supervisor.spawn(
+            self._run(action, request, previous, delay),
+            name=f"reaction-{action}-{message_key}",
+        )
+        if task is None:
+            return None
+
+        self._last_tasks[message_key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if self._last_tasks.get(message_key) is done:
+                del self._last_tasks[message_key]
+
+        task.add_done_callback(forget)
+        return task
+
+    async def _run(
+        self,
+        action: str,
+        request: Callable[[], Awaitable],
+        previous: Optional[asyncio.Task],
+        delay: float,
+    ) -> None:
+        if previous and not previous.done():
+            await asyncio.wait([previous])
+        if delay:
+            await asyncio.sleep(delay)
+
+        started_at = time.monotonic()
+        try:
+            await request()
+            metrics.increment(f"reactions.{action}.sent")
+        except Exception as e:
+            metrics.increment(f"reactions.{action}.failed")
+            logger.warning(f"Reaction {action} request failed: {e}")
+        finally:
+            metrics.observe("reactions.latency_seconds", time.monotonic() - started_at)
+
+
+# Create a global instance
+reaction_dispatcher = ReactionDispatcher()
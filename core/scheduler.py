@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Coroutine, Deque, Dict, Hashable, Optional, Tuple
+
+from config import config
+from core.admission_controller import admission_controller
+from core.task_supervisor import task_supervisor
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class Priority(str, Enum):
+    """
+    Defines the scheduling lanes for incoming updates.
+
+    FAST: cheap interactions (button callbacks, onboarding steps, commands).
+    SLOW: LLM-bound work (text and audio messages).
+    """
+
+    FAST = "fast"
+    SLOW = "slow"
+
+
+class PriorityScheduler:
+    """
+    Runs incoming updates as background tasks split in two priority lanes.
+
+    Both lanes share `max_concurrent` execution slots, but the slow lane can only
+    take `max_concurrent - fast_lane_reserved` of them. The remaining slots are
+    reserved for the fast lane, so button taps never wait behind a backlog of
+    LLM jobs. Slow work is only spawned while the admission backlog has room
+    (see AdmissionController.enter_backlog).
+
+    Work submitted with a `serial_key` (e.g. the chat ID) runs one at a time and in
+    submission order for that key within its lane: the next one is only spawned when
+    the previous one ends, so it doesn't hold a slot while waiting. Keys are separate
+    per lane, so fast work never queues behind the slow work of the same chat; work
+    that needs no ordering (button taps, commands) is submitted without a key.
+
+    Must be used from a single event loop (the server loop).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = config.SCHEDULER_MAX_CONCURRENT,
+        fast_lane_reserved: int = config.SCHEDULER_FAST_LANE_RESERVED,
+    ):
+        if fast_lane_reserved >= max_concurrent:
+            raise ValueError("fast_lane_reserved must be lower than max_concurrent")
+
+        self.max_concurrent = max_concurrent
+        self.fast_lane_reserved = fast_lane_reserved
+        self._total_slots = asyncio.Semaphore(max_concurrent)
+        self._slow_slots = asyncio.Semaphore(max_concurrent - fast_lane_reserved)
+        self._running: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._waiting: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        # Work waiting for the running work of the same serial key, by lane and key
+        self._serial: Dict[Tuple[Priority, Hashable], Deque[Dict[str, Any]]] = {}
+        logger.info(
+            f"PriorityScheduler initialized. Max concurrent: {max_concurrent}, "
+            f"Reserved for fast lane: {fast_lane_reserved}"
+        )
+
+    def submit(
+        self,
+        coro: Coroutine,
+        priority: Priority,
+        name: Optional[str] = None,
+        kind: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        on_rejected: Optional[Callable[[], Coroutine]] = None,
+        serial_key: Optional[Hashable] = None,
+    ) -> Optional[asyncio.Task]:
+        """
+        Schedules a coroutine in the given lane as a supervised background task.
+
+        Args:
+            coro (Coroutine): The work to run.
+            priority (Priority): The lane the work belongs to.
+            name (Optional[str]): A name for the task, used in logs.
+            kind (Optional[str]): The job kind, needed to resume it after a restart.
+            payload (Optional[Dict[str, Any]]): JSON-serializable data to resume the job.
+            on_rejected (Optional[Callable[[], Coroutine]]): Tells the user the work was shed,
+                                                              run in the fast lane when the backlog is full.
+            serial_key (Optional[Hashable]): Runs the work after the earlier work of the lane with the same key.
+
+        Returns:
+            Optional[asyncio.Task]: The task wrapping the scheduled work, or None if it waits for
+                                    earlier work of its serial key, the backlog is full or the
+                                    supervisor is draining and didn't start it.
+        """
+        job = dict(coro=coro, priority=priority, name=name, kind=kind, payload=payload, on_rejected=on_rejected)
+        if serial_key is None:
+            return self._spawn(**job)
+        serial_key = (priority, serial_key)
+        if serial_key in self._serial:
+            self._serial[serial_key].append(job)
+            metrics.increment(f"scheduler.{priority.value}.serialized")
+            return None
+        self._serial[serial_key] = deque([job])
+        return self._spawn_next(serial_key)
+
+    def _spawn_next(self, serial_key: Tuple[Priority, Hashable]) -> Optional[asyncio.Task]:
+        """
+        Spawns the next waiting work of a serial key. Work that isn't started (shed or
+        persisted while draining) is skipped, and the key is released once none is left.
+        """
+        pending = self._serial[serial_key]
+        while pending:
+            task = self._spawn(**pending.popleft())
+            if task is not None:
+                task.add_done_callback(lambda _: self._spawn_next(serial_key))
+                return task
+        del self._serial[serial_key]
+        return None
+
+    def _spawn(
+        self,
+        coro: Coroutine,
+        priority: Priority,
+        name: Optional[str],
+        kind: Optional[str],
+        payload: Optional[Dict[str, Any]],
+        on_rejected: Optional[Callable[[], Coroutine]],
+    ) -> Optional[asyncio.Task]:
+        if priority == Priority.SLOW and not admission_controller.enter_backlog():
+            coro.close()
+            if on_rejected:
+                self.submit(on_rejected(), Priority.FAST, name=f"{name or 'slow-task'}-rejected")
+            return None
+
+        task = task_supervisor.spawn(
+            self._run(coro, priority, name),
+            name=name or f"{priority.value}-task",
+            kind=kind,
+            payload=payload,
+        )
+        if priority == Priority.SLOW:
+            if task is None:
+                admission_controller.leave_backlog()
+            else:
+                # Also released when the task is cancelled before it starts
+                task.add_done_callback(lambda _: admission_controller.leave_backlog())
+        return task
+
+    async def _run(self, coro: Coroutine, priority: Priority, name: Optional[str]) -> None:
+        enqueued_at = time.monotonic()
+        self._waiting[priority] += 1
+        self._publish_gauges()
+        try:
+            if priority == Priority.SLOW:
+                await self._slow_slots.acquire()
+            try:
+                await self._total_slots.acquire()
+            except BaseException:
+                if priority == Priority.SLOW:
+                    self._slow_slots.release()
+                raise
+        except BaseException:
+            coro.close()
+            raise
+        finally:
+            self._waiting[priority] -= 1
+
+        metrics.observe(f"scheduler.{priority.value}.wait_seconds", time.monotonic() - enqueued_at)
+        self._running[priority] += 1
+        self._publish_gauges()
+        try:
+            await coro
+        except Exception as e:
+            logger.error(f"Unhandled error in scheduled task {name} ({priority.value} lane): {e}", exc_info=True)
+        finally:
+            self._running[priority] -= 1
+            self._total_slots.release()
+            if priority == Priority.SLOW:
+                self._slow_slots.release()
+            self._publish_gauges()
+
+    def _publish_gauges(self) -> None:
+        for priority in Priority:
+            metrics.set_gauge(f"scheduler.{priority.value}.running", self._running[priority])
+            metrics.set_gauge(f"scheduler.{priority.value}.waiting", self._waiting[priority])
+
+
+# Create a global instance
+scheduler = PriorityScheduler()
@@ -0,0 +1,219 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from config import config
+from core.interfaces.cache_service import CacheService
+from core.models.common.llm_stage import LLMStage, LLMStageSettings
+from core.prompts import PROMPT_VERSION
+from core.utils.metrics import metrics
+from integrations.cache.redis_client import cache_client
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class LLMResponseCacheService:
+    """
+    Service for caching LLM results of repeated messages ("hola", "gracias", "ayuda"),
+    so they don't pay the LLM calls again.
+
+    Entries are keyed on the normalized message (case, accents and whitespace folded),
+    the prompt version, the system prompt, the model of the pipeline stage and the
+    output model, so any prompt or model change invalidates them.
+
+    Only results that don't depend on the time of the message must be stored: the
+    detected Action and the SimpleStringResponse answers. Transactions are never
+    cached, their prompt embeds the current date.
+
+    A small in-process LRU sits in front of the cache service, so repeated messages
+    are still served when Redis is not available.
+    """
+    CACHE_PREFIX = "llm_responses"
+    CACHE_VERSION = 1
+    CACHE_EXPIRY_SECONDS = config.LLM_CACHE_TTL_SECS
+
+    def __init__(
+        self,
+        cache_service: CacheService = cache_client,
+        local_size: int = config.LLM_CACHE_LOCAL_SIZE,
+        max_content_chars: int = config.LLM_CACHE_MAX_CONTENT_CHARS,
+    ) -> None:
+        """
+        Initializes the LLM response cache service.
+
+        Args:
+            cache_service (CacheService): The cache service by default is the global instance of RedisCacheClient.
+            local_size (int): Maximum number of entries kept in the in-process cache.
+            max_content_chars (int): Longer messages are not cached, they are unlikely to repeat.
+        """
+        self.cache_service = cache_service
+        self.local_size = local_size
+        self.max_content_chars = max_content_chars
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @staticmethod
+    def normalize(content: str) -> str:
+        """
+        Folds case, accents and whitespace, so trivially different messages share an entry.
+
+        Args:
+            content (str): The user message.
+
+        Returns:
+            str: The normalized message.
+        """
+        decomposed = unicodedata.normalize("NFKD", content.casefold())
+        without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+        return _WHITESPACE.sub(" ", without_accents).strip()
+
+    def is_cacheable(self, content: str) -> bool:
+        """
+        Returns whether results for the message can be cached.
+
+        Args:
+            content (str): The user message.
+        """
+        return config.LLM_CACHE_ENABLED and 0 < len(content) <= self.max_content_chars
+
+    def _generate_key(self, content: str, system_prompt: str, output: Type[BaseModel], stage: LLMStage) -> str:
+        """
+        Generates the cache key for a message and prompt.
+
+        Args:
+            content (str): The user message.
+            system_prompt (str): The system prompt the message is sent with.
+            output (Type[BaseModel]): The output model of the LLM call.
+            stage (LLMStage): The pipeline stage of the LLM call, its model is part of the key.
+
+        Returns:
+            str: The generated cache key.
+        """
+        fingerprint = "\x1f".join(
+            [PROMPT_VERSION, LLMStageSettings.for_stage(stage).model_name, system_prompt, self.normalize(content)]
+        )
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        return f"{self.CACHE_PREFIX}:{output.__name__}:{digest}:v{self.CACHE_VERSION}"
+
+    def get(self, content: str, system_prompt: str, output: Type[ModelT], stage: LLMStage) -> Optional[ModelT]:
+        """
+        Retrieves the cached LLM result for a message, and records the lookup for the hit ratio.
+
+        Args:
+            content (str): The user message.
+            system_prompt (str): The system prompt the message is sent with.
+            output (Type[BaseModel]): The output model of the LLM call.
+            stage (LLMStage): The pipeline stage of the LLM call.
+
+        Returns:
+            Optional[BaseModel]: The cached result, None if not found or not cacheable.
+        """
+        if not self.is_cacheable(content):
+            return None
+
+        cache_key = self._generate_key(content, system_prompt, output, stage)
+        cached_json = self._get(cache_key)
+        result = None
+        if cached_json is not None:
+            try:
+                result = output.model_validate_json(cached_json)
+            except ValueError as e:
+                logger.warning(f"Discarding invalid cached {output.__name__}: {e}")
+
+        kind = output.__name__
+        if result is not None:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            metrics.increment(f"llm_cache.hits.{kind}")
+            logger.info(f"{kind} for message retrieved from cache.")
+        else:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            metrics.increment(f"llm_cache.misses.{kind}")
+        return result
+
+    def save(self, content: str, system_prompt: str, result: BaseModel, stage: LLMStage) -> bool:
+        """
+        Saves the LLM result for a message.
+
+        Args:
+            content (str): The user message.
+            system_prompt (str): The system prompt the message was sent with.
+            result (BaseModel): The LLM result, an instance of the output model.
+            stage (LLMStage): The pipeline stage of the LLM call.
+
+        Returns:
+            bool: True if the result was saved to the cache service, False otherwise.
+        """
+        if not self.is_cacheable(content):
+            return False
+
+        cache_key = self._generate_key(content, system_prompt, type(result), stage)
+        cached_json = result.model_dump_json()
+        self._set_local(cache_key, cached_json)
+        try:
+            return self.cache_service.set(
+                cache_key, cached_json.encode("utf-8"), expiry=self.CACHE_EXPIRY_SECONDS
+            )
+        except Exception as e:
+            logger.error(f"Error saving LLM response to cache: {e}")
+            return False
+
+    def _get(self, cache_key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(cache_key)
+            if entry:
+                expires_at, cached_json = entry
+                if expires_at > time.monotonic():
+                    self._local.move_to_end(cache_key)
+                    return cached_json
+                del self._local[cache_key]
+
+        cached_data = self.cache_service.get(cache_key)
+        if not cached_data:
+            return None
+        cached_json = cached_data.decode("utf-8") if isinstance(cached_data, bytes) else str(cached_data)
+        self._set_local(cache_key, cached_json)
+        return cached_json
+
+    def _set_local(self, cache_key: str, cached_json: str) -> None:
+        with self._lock:
+            self._local[cache_key] = (time.monotonic() + self.CACHE_EXPIRY_SECONDS, cached_json)
+            self._local.move_to_end(cache_key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        """Returns the ratio of LLM lookups served from the cache since startup."""
+        hits = sum(self.hits.values())
+        lookups = hits + sum(self.misses.values())
+        return hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the cache usage.
+
+        Returns:
+            dict: Hits and misses per output model, overall hit rate and number of in-process entries.
+        """
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "hit_rate": round(self.hit_rate(), 3),
+            "local_entries": len(self._local),
+        }
+
+
+# Create a global instance
+llm_response_cache_service = LLMResponseCacheService()
@@ -1,9 +1,11 @@
 import logging
+import os
 import pickle
+import time
 from typing import Optional
 from core.interfaces.cache_service import CacheService
 from integrations.cache.redis_client import cache_client
-from core.models.message import Message
+from core.models.message import Message, PendingBatch
 from core.models.message import Source  # Assuming Source enum is in the same file
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,9 @@ class MessageService:
     CACHE_PREFIX = "messages"
     CACHE_VERSION = 1
     CACHE_EXPIRY_SECONDS = 24 * 60 * 60  # 24 hours * 60 minutes * 60 seconds = 1 day
+    # Longest a batch is held by a confirmation, if its holder dies without releasing it
+    BATCH_LOCK_SECONDS = 60
+    LOCK_POLL_INTERVAL_SECS = 0.1
 
     def __init__(self, cache_service: CacheService = cache_client) -> None:
         """
@@ -24,6 +29,7 @@ class MessageService:
             cache_service (CacheService): The cache service by default is the global instance of RedisCacheClient.
         """
         self.cache_service = cache_service
+        self.owner = f"{os.getpid()}"
 
     def _generate_message_key(self, user_id: str, message_id: str, platform: Source) -> str:
         """
@@ -98,4 +104,114 @@ class MessageService:
         if deleted:
             logger.info(f"Message (ID: {message_id}, User: {user_id}, Platform: {platform.value}) deleted from cache.")
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def _generate_batch_key(self, user_id: str, batch_id: str, platform: Source) -> str:
+        """
+        Generates the cache key for the pending items of a message.
+
+        Args:
+            user_id (str): The ID of the user.
+            batch_id (str): The ID of the message the items were extracted from.
+            platform (Source): The platform where the message originated.
+
+        Returns:
+            str: The generated cache key.
+        """
+        return f"{self.CACHE_PREFIX}:batch:{user_id}:{platform.value}:{batch_id}:v{self.CACHE_VERSION}"
+
+    def get_batch(self, user_id: str, batch_id: str, platform: Source) -> Optional[PendingBatch]:
+        """
+        Retrieves the pending items of a message from the cache.
+
+        Args:
+            user_id (str): The ID of the user.
+            batch_id (str): The ID of the message the items were extracted from.
+            platform (Source): The platform where the message originated.
+
+        Returns:
+            Optional[PendingBatch]: The pending batch if found in the cache, None otherwise.
+        """
+        cached_data = self.cache_service.get(self._generate_batch_key(user_id, batch_id, platform))
+        if cached_data:
+            logger.info(f"Batch (ID: {batch_id}, User: {user_id}, Platform: {platform.value}) retrieved from cache.")
+            return pickle.loads(cached_data)
+        logger.info(f"Batch (ID: {batch_id}, User: {user_id}, Platform: {platform.value}) not found in cache.")
+        return None
+
+    def save_batch(self, batch: PendingBatch) -> bool:
+        """
+        Saves all the pending items of a message in a single cache entry.
+
+        Args:
+            batch (PendingBatch): The pending batch to save.
+
+        Returns:
+            bool: True if the batch was saved to the cache successfully, False otherwise.
+        """
+        cache_key = self._generate_batch_key(batch.user_id, batch.batch_id, batch.source)
+        try:
+            self.cache_service.set(cache_key, pickle.dumps(batch), expiry=self.CACHE_EXPIRY_SECONDS)
+            logger.info(f"Batch (ID: {batch.batch_id}, User: {batch.user_id}, Items: {len(batch.items)}) saved to cache.")
+            return True
+        except Exception as e:
+            logger.info(f"Error saving batch to cache: {e}")
+            return False
+
+    def delete_batch(self, user_id: str, batch_id: str, platform: Source) -> bool:
+        """
+        Deletes the pending items of a message from the cache.
+
+        Args:
+            user_id (str): The ID of the user.
+            batch_id (str): The ID of the message the items were extracted from.
+            platform (Source): The platform where the message originated.
+
+        Returns:
+            bool: True if the batch was deleted from the cache successfully, False otherwise.
+        """
+        deleted = self.cache_service.delete(self._generate_batch_key(user_id, batch_id, platform))
+        if deleted:
+            logger.info(f"Batch (ID: {batch_id}, User: {user_id}, Platform: {platform.value}) deleted from cache.")
+            return True
+        return False
+
+    def lock_batch(self, user_id: str, batch_id: str, platform: Source, wait_secs: float) -> bool:
+        """
+        Takes the lock of a batch (SET NX), waiting for the callback holding it.
+        Confirmations of the same batch (a double tap, an item and "confirm all") run one
+        at a time across workers, so each one sees the statuses written by the previous one.
+
+        Args:
+            user_id (str): The ID of the user.
+            batch_id (str): The ID of the message the items were extracted from.
+            platform (Source): The platform where the message originated.
+            wait_secs (float): Longest to wait for the lock.
+
+        Returns:
+            bool: True if the lock was taken, False if it's still held after waiting.
+        """
+        lock_key = f"{self._generate_batch_key(user_id, batch_id, platform)}:lock"
+        expires_at = time.monotonic() + wait_secs
+        while not self.cache_service.add(lock_key, self.owner, expiry=self.BATCH_LOCK_SECONDS):
+            # Checked before waiting: without Redis the lock is never held, nor the batch stored
+            if self.cache_service.get(lock_key) is None and not self.cache_service.add(
+                lock_key, self.owner, expiry=self.BATCH_LOCK_SECONDS
+            ):
+                return True
+            if time.monotonic() >= expires_at:
+                logger.warning(f"Batch (ID: {batch_id}, User: {user_id}) still locked after {wait_secs:.1f}s.")
+                return False
+            time.sleep(self.LOCK_POLL_INTERVAL_SECS)
+        return True
+
+    def unlock_batch(self, user_id: str, batch_id: str, platform: Source) -> None:
+        """
+        Releases the lock of a batch taken with lock_batch.
+
+        Args:
+            user_id (str): The ID of the user.
+            batch_id (str): The ID of the message the items were extracted from.
+            platform (Source): The platform where the message originated.
+        """
+        self.cache_service.delete(f"{self._generate_batch_key(user_id, batch_id, platform)}:lock")
@@ -0,0 +1,211 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from config import config
+from core.interfaces.cache_service import CacheService
+from core.models.message import Source
+from core.utils.metrics import metrics
+from integrations.cache.redis_client import cache_client
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranscriptionCacheService:
+    """
+    Service for caching audio transcriptions, so forwarded voice notes and client
+    retries don't go through the transcription service again.
+
+    Transcriptions are stored under two keys:
+    - the platform file id (Telegram file_unique_id, WhatsApp media sha256), which
+      allows skipping the download entirely.
+    - the SHA-256 of the audio content, which matches the same audio sent with a
+      different file id.
+
+    A small in-process LRU sits in front of the cache service, so repeated audio is
+    still served when Redis is not available.
+    """
+    CACHE_PREFIX = "transcriptions"
+    CACHE_VERSION = 1
+    CACHE_EXPIRY_SECONDS = config.TRANSCRIPTION_CACHE_TTL_SECS
+
+    def __init__(
+        self,
+        cache_service: CacheService = cache_client,
+        local_size: int = config.TRANSCRIPTION_CACHE_LOCAL_SIZE,
+    ) -> None:
+        """
+        Initializes the transcription cache service.
+
+        Args:
+            cache_service (CacheService): The cache service by default is the global instance of RedisCacheClient.
+            local_size (int): Maximum number of entries kept in the in-process cache.
+        """
+        self.cache_service = cache_service
+        self.local_size = local_size
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _generate_file_key(self, platform: Source, file_id: str) -> str:
+        """
+        Generates the cache key for a platform file id.
+
+        Args:
+            platform (Source): The platform the audio comes from.
+            file_id (str): The platform unique id of the audio file.
+
+        Returns:
+            str: The generated cache key.
+        """
+        return f"{self.CACHE_PREFIX}:file:{platform.value}:{file_id}:v{self.CACHE_VERSION}"
+
+    def _generate_content_key(self, content_hash: str) -> str:
+        """
+        Generates the cache key for the audio content.
+
+        Args:
+            content_hash (str): The SHA-256 hex digest of the audio as received from the platform.
+
+        Returns:
+            str: The generated cache key.
+        """
+        return f"{self.CACHE_PREFIX}:content:{content_hash}:v{self.CACHE_VERSION}"
+
+    def _get(self, cache_key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(cache_key)
+            if entry:
+                expires_at, transcription = entry
+                if expires_at > time.monotonic():
+                    self._local.move_to_end(cache_key)
+                    return transcription
+                del self._local[cache_key]
+
+        cached_data = self.cache_service.get(cache_key)
+        if not cached_data:
+            return None
+        transcription = cached_data.decode("utf-8") if isinstance(cached_data, bytes) else str(cached_data)
+        self._set_local(cache_key, transcription)
+        return transcription
+
+    def _set_local(self, cache_key: str, transcription: str) -> None:
+        with self._lock:
+            self._local[cache_key] = (time.monotonic() + self.CACHE_EXPIRY_SECONDS, transcription)
+            self._local.move_to_end(cache_key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def record_lookup(self, hit_kind: Optional[str]) -> None:
+        """
+        Records the outcome of the cache lookup for a voice note, used for the hit rate.
+
+        Args:
+            hit_kind (Optional[str]): "file" or "content" for the key that hit, None on a miss.
+        """
+        if hit_kind:
+            self.hits += 1
+            metrics.increment(f"transcription_cache.hits.{hit_kind}")
+        else:
+            self.misses += 1
+            metrics.increment("transcription_cache.misses")
+
+    def get_by_file_id(self, platform: Source, file_id: str) -> Optional[str]:
+        """
+        Retrieves the transcription of an audio file by its platform file id.
+
+        Args:
+            platform (Source): The platform the audio comes from.
+            file_id (str): The platform unique id of the audio file.
+
+        Returns:
+            Optional[str]: The transcription if found in the cache, None otherwise.
+        """
+        transcription = self._get(self._generate_file_key(platform, file_id))
+        if transcription is not None:
+            logger.info(f"Transcription for file {file_id} ({platform.value}) retrieved from cache.")
+        return transcription
+
+    def get_by_content(self, audio: bytes) -> Optional[str]:
+        """
+        Retrieves the transcription of an audio by its content hash.
+
+        Args:
+            audio (bytes): The audio as received from the platform.
+
+        Returns:
+            Optional[str]: The transcription if found in the cache, None otherwise.
+        """
+        transcription = self._get(self._generate_content_key(hashlib.sha256(audio).hexdigest()))
+        if transcription is not None:
+            logger.info("Transcription retrieved from cache by content hash.")
+        return transcription
+
+    def save_transcription(
+        self,
+        transcription: str,
+        audio: Optional[bytes] = None,
+        platform: Optional[Source] = None,
+        file_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ) -> bool:
+        """
+        Saves a transcription under the content hash and/or the platform file id.
+
+        Args:
+            transcription (str): The transcribed text.
+            audio (Optional[bytes]): The audio as received from the platform.
+            platform (Optional[Source]): The platform the audio comes from.
+            file_id (Optional[str]): The platform unique id of the audio file.
+            content_hash (Optional[str]): The SHA-256 hex digest of the audio, when it was
+                                          streamed and the bytes are not available.
+
+        Returns:
+            bool: True if the transcription was saved to the cache service, False otherwise.
+        """
+        if audio:
+            content_hash = hashlib.sha256(audio).hexdigest()
+        cache_keys = []
+        if content_hash:
+            cache_keys.append(self._generate_content_key(content_hash))
+        if platform and file_id:
+            cache_keys.append(self._generate_file_key(platform, file_id))
+
+        saved = bool(cache_keys)
+        for cache_key in cache_keys:
+            self._set_local(cache_key, transcription)
+            try:
+                saved = self.cache_service.set(
+                    cache_key, transcription.encode("utf-8"), expiry=self.CACHE_EXPIRY_SECONDS
+                ) and saved
+            except Exception as e:
+                logger.error(f"Error saving transcription to cache: {e}")
+                saved = False
+        return saved
+
+    def hit_rate(self) -> float:
+        """Returns the ratio of voice notes served from the cache since startup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the cache usage.
+
+        Returns:
+            dict: Hits, misses, hit rate and number of in-process entries.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 3),
+            "local_entries": len(self._local),
+        }
+
+
+# Create a global instance
+transcription_cache_service = TranscriptionCacheService()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+
+from core.interfaces.cache_service import CacheService
+from core.utils.metrics import metrics
+from integrations.cache.redis_client import cache_client
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SupervisedTask:
+    """
+    Represents a background job tracked by the TaskSupervisor.
+    """
+    name: str = field(metadata={"description": "Human readable name of the job, used in logs"})
+    task: Optional[asyncio.Task] = field(metadata={"description": "The asyncio task running the job, None if it was never started"})
+    started_at: float = field(metadata={"description": "Monotonic time when the job was spawned"})
+    kind: Optional[str] = field(default=None, metadata={"description": "Job kind, used to find the resumer for persisted jobs"})
+    payload: Optional[Dict[str, Any]] = field(default=None, metadata={"description": "JSON-serializable data needed to retry the job"})
+
+
+class TaskSupervisor:
+    """
+    Tracks every background job spawned by the bot and drains them on shutdown.
+
+    - Each job is registered with a name and start time, so the number of live
+      tasks and the age of the oldest one can be inspected at any time.
+    - On shutdown it stops accepting new work and waits for the running jobs
+      until a deadline. Jobs spawned with a `kind` and `payload` that did not
+      finish are persisted in the cache and replayed on the next startup by the
+      resumer registered for their kind.
+    """
+    # A list of JSON jobs
+    CACHE_KEY = "pending_jobs:v2"
+    CACHE_EXPIRY_SECONDS = 24 * 60 * 60  # 1 day
+
+    def __init__(self, cache_service: CacheService = cache_client) -> None:
+        """
+        Initializes the task supervisor.
+
+        Args:
+            cache_service (CacheService): The cache service used to persist unfinished jobs.
+                                         Defaults to the global instance of RedisCacheClient.
+        """
+        self.cache_service = cache_service
+        self._tasks: Dict[asyncio.Task, SupervisedTask] = {}
+        self._resumers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        self._accepting = True
+
+    @property
+    def accepting(self) -> bool:
+        """Whether new jobs are accepted (False once draining has started)."""
+        return self._accepting
+
+    def spawn(
+        self,
+        coro: Coroutine,
+        name: str,
+        kind: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Optional[asyncio.Task]:
+        """
+        Runs a coroutine as a tracked background task.
+
+        If the supervisor is draining the job is not started: it is persisted for
+        retry when it has a kind and payload, and dropped otherwise.
+
+        Args:
+            coro (Coroutine): The job to run.
+            name (str): The job name.
+            kind (Optional[str]): The job kind, needed to resume it after a restart.
+            payload (Optional[Dict[str, Any]]): JSON-serializable data to resume the job.
+
+        Returns:
+            Optional[asyncio.Task]: The created task, or None if the job was not started.
+        """
+        if not self._accepting:
+            coro.close()
+            logger.warning(f"Supervisor is draining, job {name} not started")
+            self._persist_jobs([SupervisedTask(name=name, task=None, started_at=time.monotonic(), kind=kind, payload=payload)])
+            return None
+
+        task = asyncio.create_task(coro, name=name)
+        self._tasks[task] = SupervisedTask(
+            name=name, task=task, started_at=time.monotonic(), kind=kind, payload=payload
+        )
+        task.add_done_callback(self._on_task_done)
+        metrics.increment("tasks.spawned")
+        metrics.set_gauge("tasks.live", len(self._tasks))
+        return task
+
+    def register_resumer(
+        self, kind: str, resumer: Callable[[Dict[str, Any]], Awaitable[Any]]
+    ) -> None:
+        """
+        Registers the coroutine function used to replay persisted jobs of a kind.
+
+        Args:
+            kind (str): The job kind.
+            resumer (Callable): Async function receiving the persisted payload.
+        """
+        self._resumers[kind] = resumer
+
+    def live_count(self) -> int:
+        """Returns the number of jobs currently running."""
+        return len(self._tasks)
+
+    def oldest_task_age(self) -> float:
+        """Returns the age in seconds of the oldest running job (0 if there are none)."""
+        if not self._tasks:
+            return 0.0
+        oldest = min(supervised.started_at for supervised in list(self._tasks.values()))
+        return time.monotonic() - oldest
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a JSON-serializable summary of the running jobs.
+
+        Returns:
+            Dict[str, Any]: Live count, oldest task age and the running jobs with their age.
+        """
+        now = time.monotonic()
+        running = sorted(list(self._tasks.values()), key=lambda supervised: supervised.started_at)
+        return {
+            "accepting": self._accepting,
+            "live": len(running),
+            "oldest_age_seconds": round(now - running[0].started_at, 3) if running else 0.0,
+            "tasks": [
+                {"name": supervised.name, "age_seconds": round(now - supervised.started_at, 3)}
+                for supervised in running
+            ],
+        }
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stops accepting new jobs and waits for the running ones.
+        Jobs still running after the timeout are cancelled, and the resumable ones are persisted.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+        """
+        self._accepting = False
+        pending = [task for task in self._tasks if task is not asyncio.current_task()]
+        logger.info(f"Draining {len(pending)} background jobs (timeout: {timeout}s)")
+        if not pending:
+            return
+
+        _, still_running = await asyncio.wait(pending, timeout=timeout)
+        if not still_running:
+            logger.info("All background jobs finished before shutdown")
+            return
+
+        unfinished = [self._tasks[task] for task in still_running if task in self._tasks]
+        logger.warning(
+            f"{len(unfinished)} background jobs did not finish in {timeout}s: "
+            f"{[supervised.name for supervised in unfinished]}"
+        )
+        self._persist_jobs(unfinished)
+        for task in still_running:
+            task.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+
+    async def resume_pending_jobs(self) -> int:
+        """
+        Replays the jobs persisted during the last shutdown.
+
+        Returns:
+            int: The number of jobs resumed.
+        """
+        resumed = 0
+        # Each job is popped atomically, so workers starting together never replay the same one
+        while (cached_job := self.cache_service.pop(self.CACHE_KEY)) is not None:
+            job = json.loads(cached_job)
+            resumer = self._resumers.get(job["kind"])
+            if not resumer:
+                logger.error(f"No resumer registered for job kind {job['kind']}. Job {job['name']} dropped.")
+                continue
+            try:
+                await resumer(job["payload"])
+                resumed += 1
+            except Exception as e:
+                logger.error(f"Error resuming job {job['name']}: {e}", exc_info=True)
+
+        metrics.increment("tasks.resumed", resumed)
+        logger.info(f"Resumed {resumed} pending jobs from previous shutdown")
+        return resumed
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        supervised = self._tasks.pop(task, None)
+        metrics.set_gauge("tasks.live", len(self._tasks))
+        if supervised:
+            metrics.observe("tasks.duration_seconds", time.monotonic() - supervised.started_at)
+        if not task.cancelled() and task.exception():
+            metrics.increment("tasks.failed")
+            logger.error(f"Background job {task.get_name()} failed: {task.exception()}")
+
+    def _persist_jobs(self, jobs: List[SupervisedTask]) -> None:
+        resumable = [job for job in jobs if job.kind and job.payload is not None]
+        dropped = len(jobs) - len(resumable)
+        if dropped:
+            metrics.increment("tasks.dropped", dropped)
+            logger.warning(f"{dropped} unfinished jobs are not resumable and were dropped")
+        if not resumable:
+            return
+
+        persisted = 0
+        for job in resumable:
+            try:
+                # Appended one by one, so jobs persisted by other workers at the same time are kept
+                if self.cache_service.push(
+                    self.CACHE_KEY,
+                    json.dumps({"name": job.name, "kind": job.kind, "payload": job.payload}),
+                    expiry=self.CACHE_EXPIRY_SECONDS,
+                ):
+                    persisted += 1
+            except Exception as e:
+                logger.error(f"Error persisting unfinished job {job.name}: {e}", exc_info=True)
+
+        if persisted:
+            metrics.increment("tasks.persisted", persisted)
+            logger.info(f"Persisted {persisted} unfinished jobs for retry")
+        if persisted < len(resumable):
+            logger.error(f"Could not persist {len(resumable) - persisted} unfinished jobs, they will be lost")
+
+
+# Create a global instance
+task_supervisor = TaskSupervisor()
@@ -0,0 +1,54 @@
+import re
+from typing import Union
+
+_NON_NUMERIC = re.compile(r"[^\d.,\-]")
+
+
+def parse_amount(value: Union[str, int, float]) -> float:
+    """
+    Parse an amount written with either decimal separator.
+    Currency symbols, codes and spaces around the number are ignored.
+
+    Args:
+        value (Union[str, int, float]): The amount to parse
+
+    Returns:
+        float: The parsed amount
+
+    Raises:
+        ValueError: If the value has no number
+
+    Examples:
+        >>> parse_amount("1.500,50")
+        1500.5
+        >>> parse_amount("$ 1,500.50")
+        1500.5
+        >>> parse_amount("1.500")
+        1500.0
+        >>> parse_amount("12,5")
+        12.5
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    number = _NON_NUMERIC.sub("", str(value))
+    negative = number.startswith("-")
+    number = number.replace("-", "")
+    if not any(char.isdigit() for char in number):
+        raise ValueError(f"No amount in {value!r}")
+
+    if "." in number and "," in number:
+        # The last separator is the decimal one
+        decimal, thousands = (".", ",") if number.rfind(".") > number.rfind(",") else (",", ".")
+        number = number.replace(thousands, "").replace(decimal, ".")
+    elif "." in number or "," in number:
+        separator = "." if "." in number else ","
+        integer, _, fraction = number.rpartition(separator)
+        # "1.500" and "1.500.000" group thousands, "12,5" and "0.500" have decimals
+        if number.count(separator) > 1 or (len(fraction) == 3 and integer.strip("0")):
+            number = number.replace(separator, "")
+        else:
+            number = f"{integer}.{fraction}"
+
+    amount = float(number)
+    return -amount if negative else amount
@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+from config import config
+
+T = TypeVar("T")
+
+_DONE = object()
+
+# The sync LLM clients hold their thread for the whole request, including the wait for
+# Akash key quota (see AkashKeyRateLimiter.acquire). They get their own bounded pool, so
+# a quota backlog never takes the default executor threads of the storage and cache calls.
+llm_executor = ThreadPoolExecutor(max_workers=config.LLM_THREAD_POOL_SIZE, thread_name_prefix="llm")
+
+
+async def run_llm_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking LLM client call in the LLM thread pool, like asyncio.to_thread does in the default one.
+
+    Args:
+        func (Callable[..., T]): The blocking call.
+        *args: Positional arguments of the call.
+        **kwargs: Keyword arguments of the call.
+
+    Returns:
+        T: The result of the call. Exceptions raised by it are re-raised here.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(llm_executor, partial(context.run, func, *args, **kwargs))
+
+
+async def iterate_in_thread(factory: Callable[[], Iterable[T]], executor: Optional[Executor] = None) -> AsyncIterator[T]:
+    """
+    Consumes a blocking iterator in a worker thread and yields its items on the event loop.
+
+    Used to stream from the sync LLM clients without blocking the loop between tokens.
+
+    Args:
+        factory (Callable[[], Iterable[T]]): Creates the iterator. Called in the worker thread.
+        executor (Optional[Executor]): The pool of the worker thread, the default executor if not given.
+
+    Yields:
+        T: The items of the iterator, in order. Exceptions raised by it are re-raised here.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = False
+
+    def produce() -> None:
+        try:
+            for item in factory():
+                if cancelled:
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+    loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Stop the producer at its next item if the consumer gave up early
+        cancelled = True
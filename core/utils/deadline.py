@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from config import config
+from core.utils.metrics import metrics
+
+
+class DeadlineExceededError(Exception):
+    """Raised when the time budget of a request runs out before a stage starts or finishes."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded at stage {stage}")
+        self.stage = stage
+
+
+# The deadline of the update handled by the current task, see Deadline.bind
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("current_deadline", default=None)
+
+
+class Deadline:
+    """
+    The time budget of a user request, created when its update arrives and passed
+    through every stage that calls an external service (transcription, LLM, storage).
+
+    Each stage uses the remaining budget as its timeout and gives up once the budget
+    is exhausted, so retries and fallbacks never run past it. Misses are recorded in
+    the metrics registry as `deadline.missed.<stage>`.
+    """
+
+    def __init__(self, budget_secs: float) -> None:
+        """
+        Starts the deadline.
+
+        Args:
+            budget_secs (float): The time budget in seconds, from now.
+        """
+        self.budget_secs = budget_secs
+        self.expires_at = time.monotonic() + budget_secs
+
+    @classmethod
+    def for_message(cls) -> "Deadline":
+        """Starts a deadline with the configured budget of a user message."""
+        return cls(config.MESSAGE_DEADLINE_SECS)
+
+    @classmethod
+    def current(cls) -> "Deadline":
+        """
+        Returns the deadline bound to the update being handled, started when the update was
+        received, so the time it waited in the scheduler counts. Starts one if none is bound.
+        """
+        return _current_deadline.get() or cls.for_message()
+
+    def bind(self) -> None:
+        """
+        Makes this the deadline of the update handled by the current task, for handlers
+        whose signature can't receive it (python-telegram-bot callbacks).
+        """
+        _current_deadline.set(self)
+
+    def remaining(self) -> float:
+        """Returns the seconds left in the budget, 0 once it's exhausted."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is exhausted."""
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        """
+        Raises if the budget is exhausted, recording the miss for the stage.
+
+        Args:
+            stage (str): The stage about to run or that just failed, e.g. "llm.extraction".
+
+        Raises:
+            DeadlineExceededError: If the budget is exhausted.
+        """
+        if self.expired:
+            metrics.increment(f"deadline.missed.{stage}")
+            raise DeadlineExceededError(stage)
+
+    def timeout(self, stage: str, limit: Optional[float] = None) -> float:
+        """
+        Returns the timeout for a stage: the remaining budget, capped at the stage's own limit.
+
+        Args:
+            stage (str): The stage about to run.
+            limit (Optional[float]): The timeout of the stage without a deadline.
+
+        Returns:
+            float: The timeout in seconds.
+
+        Raises:
+            DeadlineExceededError: If the budget is already exhausted.
+        """
+        self.check(stage)
+        remaining = self.remaining()
+        return min(limit, remaining) if limit else remaining
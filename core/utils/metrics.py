@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry.
+
+    Keeps counters, gauges and latency timers in memory so they can be exposed
+    through the `/metrics` endpoint and inspected in the logs. Timers keep a
+    bounded window of the most recent samples to compute percentiles.
+    Thread-safe: all mutations are protected by a Lock.
+    """
+
+    TIMER_WINDOW_SIZE = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timers: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.TIMER_WINDOW_SIZE)
+        )
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The counter name.
+            value (float): The amount to add. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets the current value of a gauge.
+
+        Args:
+            name (str): The gauge name.
+            value (float): The current value.
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a latency sample for a timer.
+
+        Args:
+            name (str): The timer name.
+            seconds (float): The observed duration in seconds.
+        """
+        with self._lock:
+            self._timers[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Context manager that records the duration of the wrapped block.
+
+        Args:
+            name (str): The timer name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def get_counter(self, name: str) -> float:
+        """Returns the current value of a counter (0 if it was never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a JSON-serializable snapshot of all metrics.
+
+        Returns:
+            Dict[str, Any]: Counters, gauges and timer summaries (count, avg, p50, p99, max).
+        """
+        with self._lock:
+            timers = {
+                name: self._summarize(list(samples))
+                for name, samples in self._timers.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timers": timers,
+            }
+
+    @staticmethod
+    def _summarize(samples) -> Dict[str, float]:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        count = len(ordered)
+        return {
+            "count": count,
+            "avg": round(sum(ordered) / count, 4),
+            "p50": round(ordered[int(0.50 * (count - 1))], 4),
+            "p99": round(ordered[int(0.99 * (count - 1))], 4),
+            "max": round(ordered[-1], 4),
+        }
+
+
+# Create a global instance
+metrics = MetricsRegistry()
@@ -99,6 +99,101 @@ class RedisCacheClient(CacheService):
             logger.error(f"Error setting key {key} in Redis: {e}")
             return False
 
+    def add(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        """
+        Sets a value in the cache only if the key doesn't exist (SET NX).
+
+        Args:
+            key (str): The key to set.
+            value (Any): The value to store.
+            expiry (Optional[int]): The expiry time in seconds.
+
+        Returns:
+            bool: True if the value was set, False if the key exists or on error.
+        """
+        if not self.redis_client:
+            logger.warning("Redis client not available. Cache disabled.")
+            return False
+
+        try:
+            return bool(self.redis_client.set(key, value, ex=expiry, nx=True))
+        except redis.RedisError as e:
+            logger.error(f"Error adding key {key} to Redis: {e}")
+            return False
+
+    def increment(self, key: str, amount: int = 1, expiry: Optional[int] = None) -> Optional[int]:
+        """
+        Adds an amount to an integer counter (INCRBY), creating it at 0 if missing.
+
+        Args:
+            key (str): The key of the counter.
+            amount (int): The amount to add, negative to subtract.
+            expiry (Optional[int]): The expiry time in seconds, refreshed on every increment.
+
+        Returns:
+            Optional[int]: The new value of the counter, None on error.
+        """
+        if not self.redis_client:
+            logger.warning("Redis client not available. Cache disabled.")
+            return None
+
+        try:
+            pipeline = self.redis_client.pipeline()
+            pipeline.incrby(key, amount)
+            if expiry:
+                pipeline.expire(key, expiry)
+            return int(pipeline.execute()[0])
+        except redis.RedisError as e:
+            logger.error(f"Error incrementing key {key} in Redis: {e}")
+            return None
+
+    def push(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        """
+        Appends a value to the end of a list (RPUSH).
+
+        Args:
+            key (str): The key of the list.
+            value (Any): The value to append.
+            expiry (Optional[int]): The expiry time in seconds, refreshed on every push.
+
+        Returns:
+            bool: True if the value was appended, False on error.
+        """
+        if not self.redis_client:
+            logger.warning("Redis client not available. Cache disabled.")
+            return False
+
+        try:
+            pipeline = self.redis_client.pipeline()
+            pipeline.rpush(key, value)
+            if expiry:
+                pipeline.expire(key, expiry)
+            pipeline.execute()
+            return True
+        except redis.RedisError as e:
+            logger.error(f"Error pushing to key {key} in Redis: {e}")
+            return False
+
+    def pop(self, key: str) -> Optional[Any]:
+        """
+        Removes and returns the first value of a list (LPOP).
+
+        Args:
+            key (str): The key of the list.
+
+        Returns:
+            Optional[Any]: The first value, None if the list is empty or on error.
+        """
+        if not self.redis_client:
+            logger.warning("Redis client not available. Cache disabled.")
+            return None
+
+        try:
+            return self.redis_client.lpop(key)
+        except redis.RedisError as e:
+            logger.error(f"Error popping from key {key} in Redis: {e}")
+            return None
+
     def delete(self, key: str) -> bool:
         """
         Deletes a value from the cache.
@@ -0,0 +1,158 @@
+import json
+import pickle
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+from telegram.ext._utils.types import ConversationDict, ConversationKey
+
+from core.interfaces.cache_service import CacheService
+from integrations.cache.redis_client import cache_client
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class RedisPersistence(BasePersistence):
+    """
+    python-telegram-bot persistence backed by the cache service (Redis).
+
+    Stores conversation states, user_data and chat_data outside the process so that
+    several workers can serve the same bot. The cache interface has no key scan, so
+    data is never bulk-loaded at startup: it is loaded per user/chat right before each
+    update is handled (refresh_* methods) and per conversation key by
+    RedisConversationHandler.
+
+    bot_data and callback_data are not stored.
+    """
+    CACHE_PREFIX = "telegram"
+    CACHE_VERSION = 1
+    CACHE_EXPIRY_SECONDS = 30 * 24 * 60 * 60  # 30 days
+
+    def __init__(self, cache_service: CacheService = cache_client, update_interval: float = 60) -> None:
+        """
+        Initializes the persistence.
+
+        Args:
+            cache_service (CacheService): The cache service used to store the data.
+                                         Defaults to the global instance of RedisCacheClient.
+            update_interval (float): Seconds between the application's periodic persistence updates.
+        """
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=True, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.cache_service = cache_service
+
+    def _generate_key(self, kind: str, identifier: Any) -> str:
+        """
+        Generates the cache key for a piece of data.
+
+        Args:
+            kind (str): The data kind (user_data, chat_data, conversation:<name>).
+            identifier (Any): The user ID, chat ID or conversation key.
+
+        Returns:
+            str: The generated cache key.
+        """
+        return f"{self.CACHE_PREFIX}:{kind}:{identifier}:v{self.CACHE_VERSION}"
+
+    def _conversation_identifier(self, key: ConversationKey) -> str:
+        return ":".join(str(part) for part in key)
+
+    def _load_pickled(self, cache_key: str) -> Optional[Dict]:
+        cached_data = self.cache_service.get(cache_key)
+        if not cached_data:
+            return None
+        try:
+            return pickle.loads(cached_data)  # TODO: pickle is not secure and fast, same as MessageService.
+        except Exception as e:
+            logger.error(f"Error loading {cache_key} from cache: {e}")
+            return None
+
+    def _save_pickled(self, cache_key: str, data: Dict) -> None:
+        try:
+            self.cache_service.set(cache_key, pickle.dumps(data), expiry=self.CACHE_EXPIRY_SECONDS)
+        except Exception as e:
+            logger.error(f"Error saving {cache_key} to cache: {e}")
+
+    def load_conversation_state(self, name: str, key: ConversationKey) -> Optional[object]:
+        """
+        Reads the current state of a single conversation.
+
+        Args:
+            name (str): The conversation handler name.
+            key (ConversationKey): The conversation key (chat ID, user ID).
+
+        Returns:
+            Optional[object]: The stored state, or None if the conversation is not active.
+        """
+        cached_data = self.cache_service.get(
+            self._generate_key(f"conversation:{name}", self._conversation_identifier(key))
+        )
+        return json.loads(cached_data) if cached_data else None
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        # Loaded lazily in refresh_user_data
+        return {}
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        # Loaded lazily in refresh_chat_data
+        return {}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def get_callback_data(self) -> Optional[Tuple]:
+        return None
+
+    async def get_conversations(self, name: str) -> ConversationDict:
+        # Loaded lazily by RedisConversationHandler
+        return {}
+
+    async def update_conversation(self, name: str, key: ConversationKey, new_state: Optional[object]) -> None:
+        cache_key = self._generate_key(f"conversation:{name}", self._conversation_identifier(key))
+        if new_state is None:
+            self.cache_service.delete(cache_key)
+            return
+        self.cache_service.set(cache_key, json.dumps(new_state), expiry=self.CACHE_EXPIRY_SECONDS)
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        self._save_pickled(self._generate_key("user_data", user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        self._save_pickled(self._generate_key("chat_data", chat_id), data)
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_callback_data(self, data: Tuple) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self.cache_service.delete(self._generate_key("chat_data", chat_id))
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self.cache_service.delete(self._generate_key("user_data", user_id))
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        stored = self._load_pickled(self._generate_key("user_data", user_id))
+        if stored is not None:
+            user_data.clear()
+            user_data.update(stored)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        stored = self._load_pickled(self._generate_key("chat_data", chat_id))
+        if stored is not None:
+            chat_data.clear()
+            chat_data.update(stored)
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def flush(self) -> None:
+        # Every update is written straight to the cache, nothing to flush.
+        pass
+
+
+# Create a global instance
+telegram_persistence = RedisPersistence()
@@ -1,21 +1,24 @@
 from abc import ABC, abstractmethod
 from core.models.common.action_type import Action
-from typing import Any, Type, Union
+from typing import Any, Optional, Type, Union
 
 from core.models.common.financial_type import FinantialActions
 from core.models.common.simple_message import SimpleStringResponse
+from core.models.common.transaction_repair import TransactionRepair
+from core.utils.deadline import Deadline
 
 class LLMClientInterface(ABC):
     """Interface for language model clients."""
 
     @abstractmethod
-    def generate_response(self, prompt: str, output: Type[Union[Action, FinantialActions, SimpleStringResponse]]) -> Type[Union[Action, FinantialActions, SimpleStringResponse]]:
+    def generate_response(self, prompt: str, output: Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]], deadline: Optional[Deadline] = None) -> Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]]:
         """
         Generates a response from the language model.
 
         Args:
             prompt: The prompt to send to the model.
             output_model: An optional Pydantic model to structure the response.
+            deadline: The time budget of the request, used as its timeout.
 
         Returns:
             The response generated by the model, possibly structured.
@@ -0,0 +1,290 @@
+import asyncio
+import time
+import warnings
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+from pywa_async.errors import ThrottlingError
+from telegram.error import RetryAfter
+
+from config import config
+from core.models.common.source import Source
+from core.utils.metrics import metrics
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter. Must be used from a single event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of tokens (the allowed burst).
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        """
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def block(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given time, e.g. after a 429 response.
+
+        Args:
+            seconds (float): The time to wait, usually the Retry-After of the platform.
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket is full again, so dropping it doesn't change the limits."""
+        elapsed = time.monotonic() - self.updated_at
+        return time.monotonic() >= self.blocked_until and self.tokens + elapsed * self.rate >= self.capacity
+
+
+class OutboundDispatcher:
+    """
+    Sends every outbound platform request (replies, edits, reactions) through
+    per-recipient and per-platform token buckets.
+
+    - Requests wait for a token of the recipient bucket and then of the global
+      bucket of the platform, so bursts are spread instead of hitting the
+      Bot API and Cloud API throttles.
+    - Throttled requests (Telegram RetryAfter, WhatsApp throttling errors or
+      HTTP 429) block the bucket for the Retry-After time and are retried,
+      since the platform rejected them and they are safe to resend. Telegram
+      doesn't tell a chat flood limit from the bot-wide one, so when several
+      recipients are throttled at once the global bucket backs off too.
+    - Latency, local throttling waits and platform rate limits are recorded
+      in the metrics registry under `outbound.*`.
+
+    Must be used from a single event loop (the server loop).
+    """
+    # Longest Retry-After honoured before giving up on the request
+    MAX_RETRY_WAIT_SECS = 30.0
+    # Backoff when the platform throttles without a Retry-After
+    DEFAULT_RETRY_WAIT_SECS = 1.0
+    # Recipient buckets kept in memory, idle ones are dropped first
+    MAX_RECIPIENT_BUCKETS = 10000
+    # Recipients throttled within the window that make the whole platform back off
+    GLOBAL_LIMIT_RECIPIENTS = 3
+    GLOBAL_LIMIT_WINDOW_SECS = 2.0
+
+    def __init__(
+        self,
+        max_retries: int = config.OUTBOUND_MAX_RETRIES,
+        recipient_burst: float = config.OUTBOUND_RECIPIENT_BURST,
+    ) -> None:
+        """
+        Initializes the dispatcher with the rates of each platform from the config.
+
+        Args:
+            max_retries (int): Retries of a request throttled by the platform.
+            recipient_burst (float): Requests to a single recipient allowed at once.
+        """
+        self.max_retries = max_retries
+        self.recipient_burst = recipient_burst
+        self.rates: Dict[Source, Tuple[float, float]] = {
+            # (global requests per second, requests per second to a single recipient)
+            Source.TELEGRAM: (config.OUTBOUND_TELEGRAM_GLOBAL_RATE, config.OUTBOUND_TELEGRAM_RECIPIENT_RATE),
+            Source.WHATSAPP: (config.OUTBOUND_WHATSAPP_GLOBAL_RATE, config.OUTBOUND_WHATSAPP_RECIPIENT_RATE),
+        }
+        self._global_buckets: Dict[Source, TokenBucket] = {
+            platform: TokenBucket(rate=global_rate, capacity=global_rate)
+            for platform, (global_rate, _) in self.rates.items()
+        }
+        self._recipient_buckets: "OrderedDict[Tuple[Source, str], TokenBucket]" = OrderedDict()
+        # Last time each recipient was throttled, by platform
+        self._recipient_limits: Dict[Source, Dict[str, float]] = {platform: {} for platform in self.rates}
+
+    async def send(
+        self,
+        platform: Source,
+        recipient: str,
+        request: Callable[[], Awaitable[T]],
+        kind: str = "message",
+    ) -> T:
+        """
+        Runs an outbound request once the rate limits allow it.
+
+        Args:
+            platform (Source): The platform the request goes to.
+            recipient (str): The chat or phone number the request is about.
+            request (Callable): Creates the request coroutine. Called again on each retry.
+            kind (str): The request kind, used in logs and metrics.
+
+        Returns:
+            The result of the request.
+
+        Raises:
+            Exception: The error of the request, once it's not throttled or the retries run out.
+        """
+        global_bucket = self._global_buckets[platform]
+        recipient_bucket = self._get_recipient_bucket(platform, str(recipient))
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(recipient_bucket, platform, "recipient")
+            await self._acquire(global_bucket, platform, "global")
+
+            started_at = time.monotonic()
+            try:
+                result = await request()
+                metrics.observe(f"outbound.{platform.value}.send_seconds", time.monotonic() - started_at)
+                metrics.increment(f"outbound.{platform.value}.sent")
+                return result
+            except Exception as e:
+                retry_after = self._get_retry_after(e)
+                if retry_after is None:
+                    metrics.increment(f"outbound.{platform.value}.errors")
+                    raise
+                metrics.increment(f"outbound.{platform.value}.rate_limited")
+                if attempt >= self.max_retries or retry_after > self.MAX_RETRY_WAIT_SECS:
+                    logger.error(f"Outbound {kind} to {recipient} ({platform.value}) rate limited, giving up: {e}")
+                    raise
+                logger.warning(
+                    f"Outbound {kind} to {recipient} ({platform.value}) rate limited, retrying in {retry_after:.1f}s"
+                )
+                metrics.increment(f"outbound.{platform.value}.retries")
+                # A 429 on a single chat only slows that chat; otherwise the whole platform backs off
+                if self._is_recipient_limit(e):
+                    recipient_bucket.block(retry_after)
+                    if self._is_global_limit(platform, str(recipient)):
+                        metrics.increment(f"outbound.{platform.value}.global_backoffs")
+                        global_bucket.block(retry_after)
+                else:
+                    global_bucket.block(retry_after)
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the limiter state.
+
+        Returns:
+            dict: The configured rates and the number of tracked recipients.
+        """
+        return {
+            "rates": {
+                platform.value: {"global": global_rate, "recipient": recipient_rate}
+                for platform, (global_rate, recipient_rate) in self.rates.items()
+            },
+            "tracked_recipients": len(self._recipient_buckets),
+        }
+
+    async def _acquire(self, bucket: TokenBucket, platform: Source, scope: str) -> None:
+        waited = 0.0
+        while (wait := bucket.reserve()) > 0:
+            waited += wait
+            await asyncio.sleep(wait)
+        if waited:
+            metrics.increment(f"outbound.{platform.value}.throttled.{scope}")
+            metrics.observe(f"outbound.{platform.value}.throttle_wait_seconds", waited)
+
+    def _get_recipient_bucket(self, platform: Source, recipient: str) -> TokenBucket:
+        key = (platform, recipient)
+        bucket = self._recipient_buckets.get(key)
+        if bucket is None:
+            _, recipient_rate = self.rates[platform]
+            bucket = TokenBucket(rate=recipient_rate, capacity=self.recipient_burst)
+            self._recipient_buckets[key] = bucket
+            if len(self._recipient_buckets) > self.MAX_RECIPIENT_BUCKETS:
+                self._prune_recipient_buckets()
+        self._recipient_buckets.move_to_end(key)
+        return bucket
+
+    def _prune_recipient_buckets(self) -> None:
+        for key in [key for key, bucket in self._recipient_buckets.items() if bucket.idle]:
+            del self._recipient_buckets[key]
+        while len(self._recipient_buckets) > self.MAX_RECIPIENT_BUCKETS:
+            self._recipient_buckets.popitem(last=False)
+
+    def _get_retry_after(self, error: Exception) -> Optional[float]:
+        """
+        Returns the seconds to wait if the error is a platform rate limit, None otherwise.
+        """
+        if isinstance(error, RetryAfter):
+            # The public retry_after warns about its int/timedelta deprecation in PTB 22
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                retry_after = error.retry_after
+            return retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+
+        response = None
+        if isinstance(error, ThrottlingError):
+            response = error.raw_response
+        elif isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            response = error.response
+        else:
+            return None
+
+        header = response.headers.get("Retry-After") if response is not None else None
+        try:
+            return float(header) if header else self.DEFAULT_RETRY_WAIT_SECS
+        except ValueError:
+            return self.DEFAULT_RETRY_WAIT_SECS
+
+    def _is_recipient_limit(self, error: Exception) -> bool:
+        # Telegram flood control and the WhatsApp pair rate limit apply to a single chat
+        return isinstance(error, RetryAfter) or getattr(error, "code", None) == 131056
+
+    def _is_global_limit(self, platform: Source, recipient: str) -> bool:
+        """
+        Records a recipient throttle and returns whether enough recipients were throttled
+        within the window to take it as a limit of the whole platform.
+        """
+        now = time.monotonic()
+        limits = self._recipient_limits[platform]
+        limits[recipient] = now
+        for throttled, throttled_at in list(limits.items()):
+            if now - throttled_at > self.GLOBAL_LIMIT_WINDOW_SECS:
+                del limits[throttled]
+        return len(limits) >= self.GLOBAL_LIMIT_RECIPIENTS
+
+
+def build_http_session() -> httpx.AsyncClient:
+    """
+    Creates an HTTP client with a keep-alive connection pool for the platform APIs.
+
+    Returns:
+        httpx.AsyncClient: The client, to be closed on shutdown.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.OUTBOUND_POOL_SIZE,
+            max_keepalive_connections=config.OUTBOUND_POOL_SIZE,
+            keepalive_expiry=config.OUTBOUND_KEEPALIVE_SECS,
+        ),
+        timeout=httpx.Timeout(config.OUTBOUND_TIMEOUT_SECS),
+    )
+
+
+# Create a global instance
+outbound_dispatcher = OutboundDispatcher()
@@ -1,15 +1,24 @@
+import time
+from typing import AsyncIterator, Optional
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 
 from core.interfaces.platform_adapter import PlatformAdapter
 from core.models.common.command_button import CommandButton
 from core.models.message import Message, Source
 from core.models.user import User
+from integrations.platforms.outbound_dispatcher import outbound_dispatcher
 
 class TelegramAdapter(PlatformAdapter):
     """
     Adapter for Telegram platform to handle message replies and button interactions.
     Implements the PlatformAdapter interface.
     """
+    # Telegram limits edits of the same message to about one per second
+    STREAM_EDIT_INTERVAL_SECS = 1.0
+    MAX_MESSAGE_LENGTH = 4096
+    MAX_BUTTONS_TEXT_LENGTH = MAX_MESSAGE_LENGTH
 
     def __init__(self, update, user: User=None):
         """
@@ -110,6 +119,45 @@ class TelegramAdapter(PlatformAdapter):
         voice = self.get_voice_message()
         return voice.file_id if voice else None
 
+    def get_voice_unique_id(self) -> Optional[str]:
+        """
+        Returns the file_unique_id of the voice message, which is the same for forwarded copies.
+
+        Returns:
+            Optional[str]: The unique id of the voice message file, or None if not present.
+        """
+        voice = self.get_voice_message()
+        return voice.file_unique_id if voice else None
+
+    async def download_voice_message(self) -> Optional[bytes]:
+        """
+        Downloads the voice message of the update into memory.
+
+        Returns:
+            Optional[bytes]: The audio content, or None if the update has no voice message.
+        """
+        voice = self.get_voice_message()
+        if not voice:
+            return None
+        file = await voice.get_file()
+        return bytes(await file.download_as_bytearray())
+
+    def stream_voice_message(self) -> Optional[AsyncIterator[bytes]]:
+        """
+        Streams the voice message of the update.
+        The Bot API client has no streaming download, so the file is yielded as a single chunk.
+
+        Returns:
+            Optional[AsyncIterator[bytes]]: The audio chunks, or None if the update has no voice message.
+        """
+        if not self.get_voice_message():
+            return None
+
+        async def chunks():
+            yield await self.download_voice_message()
+
+        return chunks()
+
     def get_callback_query(self):
         """
         Returns the callback query from the update if available.
@@ -127,9 +175,66 @@ class TelegramAdapter(PlatformAdapter):
             text (str): The text to be sent as a reply.
             *kwargs: Additional keyword arguments for platform-specific options.
         """
-        if self.update.callback_query:
-            return self.update.callback_query.message.reply_text(text, parse_mode='HTML', **kwargs)
-        return self.update.message.reply_text(text, parse_mode='HTML', **kwargs)
+        target = self.update.callback_query.message if self.update.callback_query else self.update.message
+        return self._send("reply_text", lambda: target.reply_text(text, parse_mode='HTML', **kwargs))
+
+    async def reply_text_stream(self, chunks: AsyncIterator[str]):
+        """
+        Sends the first chunk as a reply and edits it while the rest arrives.
+        Edits are throttled, and the final text is sent as HTML once complete.
+
+        Args:
+            chunks (AsyncIterator[str]): The pieces of the reply text, in order.
+
+        Returns:
+            The last message sent.
+        """
+        target = self.update.callback_query.message if self.update.callback_query else self.update.message
+        message = None
+        text = ""
+        shown = ""
+        last_edit_at = 0.0
+        async for chunk in chunks:
+            text += chunk
+            if len(text) > self.MAX_MESSAGE_LENGTH and message:
+                # Close the current message and continue the reply in a new one
+                await self._finish_stream_message(message, shown, text[:len(shown)])
+                text = text[len(shown):]
+                message, shown = None, ""
+            if not text.strip():
+                continue
+            if message is None:
+                message = await self._send("reply_text", lambda: target.reply_text(text[:self.MAX_MESSAGE_LENGTH]))
+                shown, last_edit_at = text[:self.MAX_MESSAGE_LENGTH], time.monotonic()
+            elif text != shown and time.monotonic() - last_edit_at >= self.STREAM_EDIT_INTERVAL_SECS:
+                await self._send("edit_text", lambda: message.edit_text(text))
+                shown, last_edit_at = text, time.monotonic()
+
+        if message is None:
+            return None
+        while len(text) > self.MAX_MESSAGE_LENGTH:
+            await self._finish_stream_message(message, shown, shown)
+            text = text[len(shown):]
+            shown = text[:self.MAX_MESSAGE_LENGTH]
+            message = await self._send("reply_text", lambda: target.reply_text(shown))
+        await self._finish_stream_message(message, shown, text)
+        return message
+
+    async def _finish_stream_message(self, message, shown: str, text: str):
+        """
+        Edits a streamed message with its final text, formatted as HTML.
+        Falls back to plain text if the text is not valid HTML.
+
+        Args:
+            message: The Telegram message being streamed.
+            shown (str): The text currently displayed in the message.
+            text (str): The final text of the message.
+        """
+        try:
+            await self._send("edit_text", lambda: message.edit_text(text, parse_mode='HTML'))
+        except BadRequest:
+            if text != shown:
+                await self._send("edit_text", lambda: message.edit_text(text))
 
     def reply_with_buttons(self, text: str, buttons: list[CommandButton], **kwargs):
         """
@@ -144,10 +249,26 @@ class TelegramAdapter(PlatformAdapter):
         keyboard = self._button_to_keyboard(buttons)
         reply_markup = InlineKeyboardMarkup(keyboard)
 
-        if self.update.callback_query:
-            return self.update.callback_query.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML', **kwargs)
-        return self.update.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML', **kwargs)
+        target = self.update.callback_query.message if self.update.callback_query else self.update.message
+        return self._send(
+            "reply_with_buttons",
+            lambda: target.reply_text(text, reply_markup=reply_markup, parse_mode='HTML', **kwargs)
+        )
     
+    def edit_callback_message(self, text: str, buttons: Optional[list[CommandButton]] = None):
+        """
+        Edits the message whose button was pressed.
+
+        Args:
+            text (str): The new text of the message.
+            buttons (Optional[list]): The CommandButton objects to keep in the message. None removes them.
+        """
+        reply_markup = InlineKeyboardMarkup(self._button_to_keyboard(buttons)) if buttons else None
+        return self._send(
+            "edit_text",
+            lambda: self.update.callback_query.edit_message_text(text=text, reply_markup=reply_markup, parse_mode='HTML')
+        )
+
     def react_message(self, emoji):
         """
         Reacts to a telegram message with the specified emoji.
@@ -158,13 +279,13 @@ class TelegramAdapter(PlatformAdapter):
         Returns:
             The result of the Telegram API send_reaction call.
         """
-        return self.update.message.set_reaction("🤝")
+        return self._send("reaction", lambda: self.update.message.set_reaction("🤝"))
     
     def delete_reaction(self):
         """
         Deletes the reaction from the message.
         """
-        return self.update.message.set_reaction()
+        return self._send("reaction", lambda: self.update.message.set_reaction())
 
     def clean_up_processing_message(self, message):
         """
@@ -175,6 +296,16 @@ class TelegramAdapter(PlatformAdapter):
         """
         return message.delete()
 
+    def _send(self, kind: str, request):
+        """
+        Sends a request to the chat of the update through the outbound dispatcher (rate limits and retries).
+
+        Args:
+            kind (str): The request kind, used in logs and metrics.
+            request: Creates the Bot API request coroutine.
+        """
+        return outbound_dispatcher.send(Source.TELEGRAM, self.update.effective_chat.id, request, kind=kind)
+
     def _button_to_keyboard(self, buttons: list[CommandButton]):
         """
         Converts a list of CommandButton objects to a format suitable for Telegram's InlineKeyboardMarkup.
@@ -186,7 +317,12 @@ class TelegramAdapter(PlatformAdapter):
             list: A list of lists containing InlineKeyboardButton objects.
         """
 
-        return [
-            [InlineKeyboardButton(text=button.text, callback_data=button.callback_data)]
-            for button in buttons
-        ]
+        keyboard = []
+        for index, button in enumerate(buttons):
+            inline_button = InlineKeyboardButton(text=button.text, callback_data=button.callback_data)
+            # Consecutive buttons with the same row are placed side by side
+            if index and button.row is not None and button.row == buttons[index - 1].row:
+                keyboard[-1].append(inline_button)
+            else:
+                keyboard.append([inline_button])
+        return keyboard
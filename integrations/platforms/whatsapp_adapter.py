@@ -1,16 +1,26 @@
-from typing import List
+import re
+from typing import AsyncIterator, List, Optional
 from pywa_async import WhatsApp, types
 
 from core.interfaces.platform_adapter import PlatformAdapter
+from core.messages import BUTTONS_LIST_TITLE
 from core.models.common.command_button import CommandButton
 from core.models.message import Message, Source
 from core.models.user import User
+from integrations.platforms.outbound_dispatcher import outbound_dispatcher
 
 class WhatsAppV2Adapter(PlatformAdapter):
     """
     Adapter for WhatsApp platform to handle message replies and button interactions.
     Implements the PlatformAdapter interface using PyWa library.
     """
+    # WhatsApp messages can't be edited, streamed replies are sent in sentence-sized messages
+    STREAM_MIN_CHUNK_CHARS = 80
+    _SENTENCE_END = re.compile(r"[.!?…](?=\s)|\n")
+    # Limits of the interactive messages: up to 3 reply buttons, more are sent as a list of up to 10 rows
+    MAX_QUICK_REPLY_BUTTONS = 3
+    MAX_REPLY_BUTTONS = 10
+    MAX_BUTTONS_TEXT_LENGTH = 1024
 
     def __init__(self, wa: WhatsApp, update: types.Message, user: User = None):
         """
@@ -110,6 +120,45 @@ class WhatsAppV2Adapter(PlatformAdapter):
         voice = self.get_voice_message()
         return voice.id if voice else None
 
+    def get_voice_unique_id(self) -> Optional[str]:
+        """
+        Returns the sha256 of the audio file sent by WhatsApp in the webhook.
+
+        Returns:
+            Optional[str]: The hash of the audio file, or None if not present.
+        """
+        audio = self.update.audio if hasattr(self.update, 'audio') else None
+        return audio.sha256 if audio else None
+
+    async def download_voice_message(self) -> Optional[bytes]:
+        """
+        Downloads the voice message of the update into memory.
+
+        Returns:
+            Optional[bytes]: The audio content, or None if the update has no audio.
+        """
+        audio = self.update.audio if hasattr(self.update, 'audio') else None
+        if not audio:
+            return None
+        return await audio.get_bytes()
+
+    def stream_voice_message(self) -> Optional[AsyncIterator[bytes]]:
+        """
+        Streams the audio of the update from the WhatsApp media URL in chunks.
+
+        Returns:
+            Optional[AsyncIterator[bytes]]: The audio chunks, or None if the update has no audio.
+        """
+        audio = self.update.audio if hasattr(self.update, 'audio') else None
+        if not audio:
+            return None
+
+        async def chunks():
+            async for chunk in await audio.stream():
+                yield chunk
+
+        return chunks()
+
     def get_callback_query(self):
         """
         Returns the callback query from the update if available.
@@ -127,27 +176,62 @@ class WhatsAppV2Adapter(PlatformAdapter):
             text (str): The text to be sent as a reply.
             **kwargs: Additional keyword arguments for platform-specific options.
         """
-        return await self.wa.send_message(
-            to=self._sanitize_number(self.get_platform_user_id()),
-            text=text,
-            **kwargs
+        recipient = self._sanitize_number(self.get_platform_user_id())
+        return await outbound_dispatcher.send(
+            Source.WHATSAPP,
+            recipient,
+            lambda: self.wa.send_message(to=recipient, text=text, **kwargs),
+            kind="reply_text"
         )
 
+    async def reply_text_stream(self, chunks: AsyncIterator[str]):
+        """
+        Sends the reply in several messages, each ending at a sentence boundary
+        once at least STREAM_MIN_CHUNK_CHARS characters are available.
+
+        Args:
+            chunks (AsyncIterator[str]): The pieces of the reply text, in order.
+        """
+        buffer = ""
+        async for chunk in chunks:
+            buffer += chunk
+            cut = self._stream_cut_position(buffer)
+            if cut:
+                await self.reply_text(buffer[:cut].strip())
+                buffer = buffer[cut:]
+        if buffer.strip():
+            await self.reply_text(buffer.strip())
+
+    def _stream_cut_position(self, text: str) -> int:
+        """
+        Returns the position after the last sentence end in the text if the text
+        before it is long enough to be sent, 0 otherwise.
+        """
+        ends = [match.end() for match in self._SENTENCE_END.finditer(text)]
+        if ends and len(text[:ends[-1]].strip()) >= self.STREAM_MIN_CHUNK_CHARS:
+            return ends[-1]
+        return 0
+
     async def reply_with_buttons(self, text: str, buttons: List[CommandButton], **kwargs):
         """
-        Sends a reply with buttons to the user.
+        Sends a reply with buttons to the user. More than 3 buttons are sent as
+        the rows of a list message.
 
         Args:
             text (str): The text to be sent as a reply.
             buttons (list): A list of CommandButton objects to be included in the reply.
             **kwargs: Additional keyword arguments for platform-specific options.
         """
-        keyboard = self._button_to_keyboard(buttons)
-        return await self.wa.send_message(
-            to=self._sanitize_number(self.get_platform_user_id()),
-            text=text,
-            buttons=keyboard,
-            **kwargs
+        if len(buttons) > self.MAX_QUICK_REPLY_BUTTONS:
+            keyboard = self._button_to_section_list(buttons)
+        else:
+            keyboard = self._button_to_keyboard(buttons)
+        recipient = self._sanitize_number(self.get_platform_user_id())
+        return await outbound_dispatcher.send(
+            Source.WHATSAPP,
+            recipient,
+            lambda: self.wa.send_message(to=recipient, text=text, buttons=keyboard, **kwargs),
+            kind="reply_with_buttons"
         )
     
     async def react_message(self, emoji):
@@ -160,20 +244,24 @@ class WhatsAppV2Adapter(PlatformAdapter):
         Returns:
             The result of the WhatsApp API react_message call.
         """
-        return await self.wa.send_reaction(
-            to=self._sanitize_number(self.get_platform_user_id()),
-            message_id=self.get_message_id(),
-            emoji=emoji
+        recipient = self._sanitize_number(self.get_platform_user_id())
+        return await outbound_dispatcher.send(
+            Source.WHATSAPP,
+            recipient,
+            lambda: self.wa.send_reaction(to=recipient, message_id=self.get_message_id(), emoji=emoji),
+            kind="reaction"
         )
         
     async def delete_reaction(self):
         """
         Deletes the reaction from the message.
         """
-        return await self.wa.send_reaction(
-            to=self._sanitize_number(self.get_platform_user_id()),
-            message_id=self.get_message_id(),
-            emoji=""
+        recipient = self._sanitize_number(self.get_platform_user_id())
+        return await outbound_dispatcher.send(
+            Source.WHATSAPP,
+            recipient,
+            lambda: self.wa.send_reaction(to=recipient, message_id=self.get_message_id(), emoji=""),
+            kind="reaction"
         )
         
     def clean_up_processing_message(self, message):
@@ -205,6 +293,26 @@ class WhatsAppV2Adapter(PlatformAdapter):
             )
             for button in buttons
         ]
+
+    def _button_to_section_list(self, buttons: list[CommandButton]) -> types.SectionList:
+        """
+        Converts a list of CommandButton objects to the rows of a WhatsApp list message.
+        Selecting a row sends a CallbackSelection with the callback data of its button.
+
+        Args:
+            buttons (list): A list of CommandButton objects, up to MAX_REPLY_BUTTONS.
+
+        Returns:
+            types.SectionList: The list, opened with the BUTTONS_LIST_TITLE button.
+        """
+        rows = [
+            types.SectionRow(title=button.text, callback_data=button.callback_data)
+            for button in buttons[:self.MAX_REPLY_BUTTONS]
+        ]
+        return types.SectionList(
+            button_title=BUTTONS_LIST_TITLE,
+            sections=[types.Section(title=BUTTONS_LIST_TITLE, rows=rows)],
+        )
     
             
     def _sanitize_number(self, raw_number: str) -> str:
@@ -1,8 +1,14 @@
+import hashlib
+import time
+from functools import lru_cache
 from logging_config import get_logger
 from itertools import cycle
 from threading import Lock
-from typing import Type, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
+from langchain_core.callbacks import UsageMetadataCallbackHandler
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 from langchain.prompts import (
     ChatPromptTemplate,
@@ -13,21 +19,241 @@ from langchain.prompts import (
 from pydantic import SecretStr
 
 from config import config
+from core.interfaces.cache_service import CacheService
 from core.models.common.action_type import Action
 from core.models.common.financial_type import FinantialActions
+from core.models.common.llm_stage import LLMStage, LLMStageSettings
 from core.models.common.simple_message import SimpleStringResponse
+from core.models.common.transaction_repair import TransactionRepair
+from core.prompts import (
+    ACTION_PROMPT,
+    QUESTION_RESPONSE_PROMPT,
+    SOCIAL_MESSAGE_RESPONSE_PROMPT,
+    TRANSACTION_PROMPT,
+    UNKNOWN_MESSAGE_RESPONSE_PROMPT,
+)
 from integrations.llm_providers_interface import LLMClientInterface
+from core.utils.deadline import Deadline
+from core.utils.metrics import metrics
+from integrations.cache.redis_client import cache_client
 from integrations.providers.llm_openai import OpenAILLM
 
 logger = get_logger(__name__)
 
+# The human message is bound as a value, never parsed as a template, so braces in user text are kept as is
+HUMAN_INPUT_VARIABLE = "human_input"
+
+# System prompts of the message pipeline, parsed when the pool is created
+PRECOMPILED_SYSTEM_PROMPTS = (
+    ACTION_PROMPT,
+    TRANSACTION_PROMPT,
+    QUESTION_RESPONSE_PROMPT,
+    SOCIAL_MESSAGE_RESPONSE_PROMPT,
+    UNKNOWN_MESSAGE_RESPONSE_PROMPT,
+)
+STRUCTURED_OUTPUTS = (Action, FinantialActions, SimpleStringResponse)
+
+
+@lru_cache(maxsize=32)
+def get_prompt_template(system_template: str) -> ChatPromptTemplate:
+    """
+    Returns the chat template for a system prompt, parsed only the first time.
+
+    Args:
+        system_template (str): The system prompt, with "{{" and "}}" for literal braces.
+
+    Returns:
+        ChatPromptTemplate: A system and a human message, the latter filled from HUMAN_INPUT_VARIABLE.
+    """
+    return ChatPromptTemplate.from_messages([
+        SystemMessagePromptTemplate.from_template(system_template),
+        HumanMessagePromptTemplate.from_template(f"{{{HUMAN_INPUT_VARIABLE}}}"),
+    ])
+
+
+class AkashRateLimitedError(Exception):
+    """Raised when no Akash key has quota left within the queueing time."""
+    pass
+
+
+class AkashKeyRateLimiter:
+    """
+    Enforces the requests/min and tokens/min quotas of each Akash API key before
+    sending, instead of finding out from a failed call.
+
+    - Usage is counted in one-minute windows with atomic increments in the cache
+      service, so every worker sees the same counters. Without Redis each worker
+      counts on its own.
+    - Prompt tokens are estimated from the rendered prompt (about 4 characters per
+      token) plus the max output tokens of the stage; the estimate is corrected
+      with the usage reported by the API once the request finishes.
+    - Requests go to the first key, in round-robin order, with quota left. When
+      every key is exhausted they wait for quota up to `max_queue_secs` (and the
+      request deadline), then fail so the pool falls back to OpenAI.
+
+    Thread-safe: the pools call it from the LLM worker threads.
+    """
+    CACHE_PREFIX = "llm_rate"
+    CACHE_VERSION = 1
+    WINDOW_SECS = 60
+    CHARS_PER_TOKEN = 4
+    POLL_INTERVAL_SECS = 0.25
+
+    def __init__(
+        self,
+        cache_service: CacheService = cache_client,
+        api_keys: List[str] = config.AKASH_API_KEY,
+        requests_per_min: List[int] = config.LLM_AKASH_REQUESTS_PER_MIN,
+        tokens_per_min: List[int] = config.LLM_AKASH_TOKENS_PER_MIN,
+        max_queue_secs: float = config.LLM_AKASH_MAX_QUEUE_SECS,
+    ) -> None:
+        """
+        Initializes the rate limiter.
+
+        Args:
+            cache_service (CacheService): The cache service by default is the global instance of RedisCacheClient.
+            api_keys (List[str]): The Akash API keys, in the order of the pool clients.
+            requests_per_min (List[int]): Requests per minute of each key, a single value applies to all. 0 is unlimited.
+            tokens_per_min (List[int]): Tokens per minute of each key, a single value applies to all. 0 is unlimited.
+            max_queue_secs (float): Longest a request waits for a key with quota.
+        """
+        self.cache_service = cache_service
+        # Keys are identified by a hash in Redis, never stored as is
+        self.key_ids = [hashlib.sha256(key.strip().encode("utf-8")).hexdigest()[:12] for key in api_keys]
+        self.requests_per_min = self._per_key(requests_per_min)
+        self.tokens_per_min = self._per_key(tokens_per_min)
+        self.max_queue_secs = max_queue_secs
+        self._keys_cycle = cycle(range(len(self.key_ids)))
+        self._lock = Lock()
+        self._local_counters: Dict[str, int] = {}
+
+    def _per_key(self, limits: List[int]) -> List[int]:
+        return [limits[min(index, len(limits) - 1)] if limits else 0 for index in range(len(self.key_ids))]
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """
+        Estimates the tokens of a text, without a tokenizer.
+
+        Args:
+            text (str): The rendered prompt.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    def acquire(self, tokens: int, deadline: Optional[Deadline] = None) -> int:
+        """
+        Reserves a request and its tokens on a key with quota left, waiting for quota if needed.
+        The wait blocks the calling thread: callers on the event loop run the LLM calls in
+        the LLM thread pool (see core.utils.async_utils.run_llm_call).
+
+        Args:
+            tokens (int): The estimated tokens of the request.
+            deadline (Optional[Deadline]): The time budget of the request, bounds the wait.
+
+        Returns:
+            int: The index of the key (and of its client in the pool).
+
+        Raises:
+            AkashRateLimitedError: If no key has quota before the queueing time runs out.
+        """
+        with self._lock:
+            first = next(self._keys_cycle)
+        started_at = time.monotonic()
+        max_wait = min(self.max_queue_secs, deadline.remaining()) if deadline else self.max_queue_secs
+        while True:
+            for offset in range(len(self.key_ids)):
+                index = (first + offset) % len(self.key_ids)
+                if self._try_reserve(index, tokens):
+                    waited = time.monotonic() - started_at
+                    if waited:
+                        metrics.observe("llm.akash.queue_wait_seconds", waited)
+                    return index
+            remaining = max_wait - (time.monotonic() - started_at)
+            if remaining <= 0:
+                metrics.increment("llm.akash.rate_limited")
+                raise AkashRateLimitedError(f"No Akash key has quota left for {tokens} tokens")
+            metrics.increment("llm.akash.queued")
+            time.sleep(min(self.POLL_INTERVAL_SECS, remaining))
+
+    def record_usage(self, index: int, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Corrects the tokens counted for a request with the usage reported by the API.
+
+        Args:
+            index (int): The index of the key the request was sent with.
+            estimated_tokens (int): The tokens reserved by `acquire`.
+            actual_tokens (int): The input and output tokens reported by the API.
+        """
+        if not self.tokens_per_min[index] or not actual_tokens or actual_tokens == estimated_tokens:
+            return
+        self._increment(self._counter_key(index, "tokens"), actual_tokens - estimated_tokens)
+
+    def _try_reserve(self, index: int, tokens: int) -> bool:
+        """
+        Counts the request on the key if it stays within its quotas, atomically per counter.
+        """
+        reserved = []
+        for kind, amount, limit in (
+            ("requests", 1, self.requests_per_min[index]),
+            ("tokens", tokens, self.tokens_per_min[index]),
+        ):
+            if not limit:
+                continue
+            counter_key = self._counter_key(index, kind)
+            used = self._increment(counter_key, amount)
+            reserved.append((counter_key, amount))
+            # A request larger than the whole quota still goes through on an unused window
+            if used > limit and used > amount:
+                for reserved_key, reserved_amount in reserved:
+                    self._increment(reserved_key, -reserved_amount)
+                return False
+        return True
+
+    def _counter_key(self, index: int, kind: str) -> str:
+        window = int(time.time() // self.WINDOW_SECS)
+        return f"{self.CACHE_PREFIX}:{self.key_ids[index]}:{kind}:{window}:v{self.CACHE_VERSION}"
+
+    def _increment(self, counter_key: str, amount: int) -> int:
+        value = self.cache_service.increment(counter_key, amount, expiry=2 * self.WINDOW_SECS)
+        if value is not None:
+            return value
+        # Redis is not available, count in this worker only
+        with self._lock:
+            value = self._local_counters.get(counter_key, 0) + amount
+            self._local_counters[counter_key] = value
+            if len(self._local_counters) > 8 * len(self.key_ids):
+                current = f":{int(time.time() // self.WINDOW_SECS)}:"
+                self._local_counters = {
+                    key: count for key, count in self._local_counters.items() if current in key
+                }
+            return value
+
+    def stats(self) -> dict:
+        """
+        Returns a JSON-serializable summary of the configured quotas.
+
+        Returns:
+            dict: The requests and tokens per minute of each key, by key hash.
+        """
+        return {
+            key_id: {"requests_per_min": requests, "tokens_per_min": tokens}
+            for key_id, requests, tokens in zip(self.key_ids, self.requests_per_min, self.tokens_per_min)
+        }
+
+
 class RotatingLLMClientPool(LLMClientInterface):
     """
     LLM client pool with rotating API keys to bypass per-key rate limits.
 
-    - Rotates between multiple ChatOpenAI instances on each invocation.
-    - Uses `itertools.cycle` to maintain a consistent round-robin strategy.
-    - Thread-safe: access to the client cycle is protected by a Lock.
+    - Each pool serves one pipeline stage (classification, extraction, conversation),
+      with the model, temperature, timeout and max tokens configured for it, and
+      reports latency, tokens and cost as `llm.<stage>.*` metrics.
+    - Rotates between multiple ChatOpenAI instances on each invocation, skipping
+      the keys without quota left (see AkashKeyRateLimiter).
+    - Thread-safe: access to the runnables cache is protected by a Lock.
 
     Expected configuration:
         The environment variable `AKASH_API_KEYS` must contain the API keys separated by commas.
@@ -35,12 +261,19 @@ class RotatingLLMClientPool(LLMClientInterface):
     :TODO Error fallback:
         If an API key fails (e.g., `RateLimitError` or `AuthenticationError`), catch the exception
         and retry using another key from the pool, up to a maximum number of attempts.
-
-    :TODO Per-key usage control:
-        Track counters or timestamps per API key to avoid hitting limits proactively instead of waiting for errors.
     """
 
-    def __init__(self):
+    def __init__(self, stage: LLMStage = LLMStage.EXTRACTION, rate_limiter: Optional[AkashKeyRateLimiter] = None):
+        """
+        Initializes the clients with the model settings of a pipeline stage.
+
+        Args:
+            stage (LLMStage): The pipeline stage, used for the model settings and the metrics.
+            rate_limiter (Optional[AkashKeyRateLimiter]): The key quotas, shared by every pool by default.
+        """
+        self.stage = stage
+        self.rate_limiter = rate_limiter or akash_rate_limiter
+        self.settings = LLMStageSettings.for_stage(stage)
         self.fallback_llm = OpenAILLM()
         self.clients = []
         for key in config.AKASH_API_KEY:
@@ -48,55 +281,178 @@ class RotatingLLMClientPool(LLMClientInterface):
                 ChatOpenAI(
                     base_url=config.AKASH_API_BASE_URL,
                     api_key=SecretStr(key.strip()),
-                    model=config.LLM_MODEL_NAME,
-                    temperature=config.LLM_TEMPERATURE,
-                    timeout=config.LLM_TIMEOUT,
-                    max_retries=config.LLM_AKASH_RETRIES
+                    model=self.settings.model_name,
+                    temperature=self.settings.temperature,
+                    timeout=self.settings.timeout,
+                    max_tokens=self.settings.max_tokens,
+                    max_retries=config.LLM_AKASH_RETRIES,
+                    # Report token usage when streaming too, for the cost metrics
+                    stream_usage=True
                 )
             )
             logger.info(
-                f"Initialized timeout:{config.LLM_TIMEOUT} retries: {config.LLM_AKASH_RETRIES}"
+                f"Initialized {stage.value} client model: {self.settings.model_name} "
+                f"timeout:{self.settings.timeout} retries: {config.LLM_AKASH_RETRIES}"
             )
 
-        self._clients_cycle = cycle(self.clients)
         self._lock = Lock()
+        # Structured output runnables per (client index, output schema, streaming)
+        self._runnables: Dict[Tuple[int, type, bool], Runnable] = {}
+        self._precompile()
         logger.info(
             f"Initialized {len(self.clients)} LLM clients with rotating API keys"
         )
 
-    def _get_next_client(self) -> ChatOpenAI:
-        with self._lock:
-            return next(self._clients_cycle)
+    def _precompile(self) -> None:
+        """
+        Parses the pipeline prompts and builds the structured output runnables of every client,
+        so requests only fill the templates and invoke.
+        """
+        for system_template in PRECOMPILED_SYSTEM_PROMPTS:
+            get_prompt_template(system_template)
+        for index in range(len(self.clients)):
+            for output in STRUCTURED_OUTPUTS:
+                self._get_runnable(index, output)
+                self._get_runnable(index, output, streaming=True)
+
+    def _get_runnable(self, index: int, output: type, streaming: bool = False) -> Runnable:
+        """
+        Returns the structured output runnable of a client, built only the first time.
+
+        Args:
+            index (int): The client index in the pool.
+            output (type): The pydantic output model.
+            streaming (bool): Whether the runnable is used to stream partial objects.
+        """
+        key = (index, output, streaming)
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            # A JSON schema (instead of the pydantic model) lets the parser emit partial objects
+            schema = output.model_json_schema() if streaming else output
+            runnable = self.clients[index].with_structured_output(schema)
+            with self._lock:
+                runnable = self._runnables.setdefault(key, runnable)
+        return runnable
 
     def generate_response(
         self,
         system_template: str,
         human_template: str,
-        output: Type[Union[Action, FinantialActions, SimpleStringResponse]]
-    ) -> Union[Action, FinantialActions, SimpleStringResponse]:
+        output: Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]],
+        deadline: Optional[Deadline] = None
+    ) -> Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]:
         """
         Uses the next available client to execute a prompt and returns a structured response of the given output type.
         Handles errors and falls back to OpenAI LLM if needed.
+        With a deadline, the request times out with the remaining budget and there is no fallback past it.
         """
         chat_prompt = self._get_chat_prompt(system_template, human_template)
+        usage = UsageMetadataCallbackHandler()
+        started_at = time.monotonic()
+        request_kwargs = self._get_request_kwargs(deadline)
+        estimated_tokens = self._estimate_tokens(chat_prompt)
         try:
-            client = self._get_next_client().with_structured_output(output)
-            response = client.invoke(chat_prompt)
+            index = self.rate_limiter.acquire(estimated_tokens, deadline)
+            client = self._get_runnable(index, output)
+            response = client.invoke(chat_prompt, config={"callbacks": [usage]}, **request_kwargs)
             logger.info(f"Answer from akash: {response}")
+            self._record_usage(usage, started_at)
+            self.rate_limiter.record_usage(index, estimated_tokens, self._total_tokens(usage))
             if isinstance(response, dict):
                 return output(**response)
             return response
         except Exception as e:
+            if deadline:
+                deadline.check(f"llm.{self.stage.value}")
             logger.error(
                 f"Failed to generate response with rotating clients. Falling back to OpenAI LLM. Error: {e}", exc_info=True
             )
-            fallback_response = self.fallback_llm.generate_response(chat_prompt, output)
+            metrics.increment(f"llm.{self.stage.value}.fallbacks")
+            fallback_response = self.fallback_llm.generate_response(chat_prompt, output, deadline=deadline)
+            self._record_usage(usage, started_at)
             if isinstance(fallback_response, dict):
                 return output(**fallback_response)
             return fallback_response
 
-    def _get_chat_prompt(self, system_template: str, human_template: str) -> str:
-        system_prompt = SystemMessagePromptTemplate.from_template(system_template)
-        human_prompt = HumanMessagePromptTemplate.from_template(human_template)
-        chat_prompt = ChatPromptTemplate.from_messages([system_prompt, human_prompt])
-        return chat_prompt.format()
+    def stream_response(
+        self,
+        system_template: str,
+        human_template: str,
+        output: Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]],
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the structured response as partial dicts that grow while tokens arrive,
+        e.g. {"response": "Ho"}, {"response": "Hola!"}. Blocking, run it in a thread.
+        Falls back to OpenAI LLM if the stream fails before producing anything.
+        With a deadline, the stream times out with the remaining budget when it starts.
+        """
+        chat_prompt = self._get_chat_prompt(system_template, human_template)
+        usage = UsageMetadataCallbackHandler()
+        started_at = time.monotonic()
+        request_kwargs = self._get_request_kwargs(deadline)
+        estimated_tokens = self._estimate_tokens(chat_prompt)
+        started = False
+        try:
+            index = self.rate_limiter.acquire(estimated_tokens, deadline)
+            client = self._get_runnable(index, output, streaming=True)
+            for partial in client.stream(chat_prompt, config={"callbacks": [usage]}, **request_kwargs):
+                started = True
+                yield partial
+        except Exception as e:
+            if started:
+                raise
+            if deadline:
+                deadline.check(f"llm.{self.stage.value}")
+            logger.error(
+                f"Failed to stream response with rotating clients. Falling back to OpenAI LLM. Error: {e}", exc_info=True
+            )
+            metrics.increment(f"llm.{self.stage.value}.fallbacks")
+            yield from self.fallback_llm.stream_response(chat_prompt, output, deadline=deadline)
+        else:
+            self.rate_limiter.record_usage(index, estimated_tokens, self._total_tokens(usage))
+        self._record_usage(usage, started_at)
+
+    def _estimate_tokens(self, chat_prompt: PromptValue) -> int:
+        """
+        Estimates the tokens of a request for the key quotas: the rendered prompt plus the max output tokens.
+        """
+        return self.rate_limiter.estimate_tokens(chat_prompt.to_string()) + (self.settings.max_tokens or 0)
+
+    @staticmethod
+    def _total_tokens(usage: UsageMetadataCallbackHandler) -> int:
+        return sum(model_usage.get("total_tokens", 0) for model_usage in usage.usage_metadata.values())
+
+    def _get_request_kwargs(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """
+        Returns the per-request arguments: the timeout left by the deadline, if any.
+        Raises DeadlineExceededError if the budget is already exhausted.
+        """
+        if deadline is None:
+            return {}
+        return {"timeout": deadline.timeout(f"llm.{self.stage.value}", self.settings.timeout)}
+
+    def _record_usage(self, usage: UsageMetadataCallbackHandler, started_at: float) -> None:
+        """
+        Records the latency, tokens and cost of a request in the metrics of the stage.
+        Only the tokens of the stage model are priced; OpenAI fallback calls only count
+        in the latency and `fallbacks` metrics.
+        """
+        prefix = f"llm.{self.stage.value}"
+        metrics.observe(f"{prefix}.latency_seconds", time.monotonic() - started_at)
+        metrics.increment(f"{prefix}.requests")
+        for model_name, model_usage in usage.usage_metadata.items():
+            input_tokens = model_usage.get("input_tokens", 0)
+            output_tokens = model_usage.get("output_tokens", 0)
+            metrics.increment(f"{prefix}.input_tokens", input_tokens)
+            metrics.increment(f"{prefix}.output_tokens", output_tokens)
+            # Providers may return the model name with a prefix or a version suffix
+            if self.settings.model_name in model_name or model_name in self.settings.model_name:
+                metrics.increment(f"{prefix}.cost_usd", self.settings.cost(input_tokens, output_tokens))
+
+    def _get_chat_prompt(self, system_template: str, human_template: str) -> PromptValue:
+        return get_prompt_template(system_template).format_prompt(**{HUMAN_INPUT_VARIABLE: human_template})
+
+
+# Create a global instance
+akash_rate_limiter = AkashKeyRateLimiter()
@@ -1,5 +1,8 @@
 from logging_config import get_logger
-from typing import Type, Union
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional, Tuple, Type, Union
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
 
@@ -7,6 +10,8 @@ from config import config
 from core.models.common.action_type import Action
 from core.models.common.financial_type import FinantialActions
 from core.models.common.simple_message import SimpleStringResponse
+from core.models.common.transaction_repair import TransactionRepair
+from core.utils.deadline import Deadline
 from integrations.llm_providers_interface import LLMClientInterface
 
 logger = get_logger(__name__)
@@ -25,16 +30,55 @@ class OpenAILLM(LLMClientInterface):
             api_key=SecretStr(config.OPENAI_API_KEY),
             temperature=0,
             model=config.OPENAI_CHAT_COMPLETIONS_MODEL,
+            timeout=config.OPENAI_TIMEOUT,
         )
+        # Structured output runnables per (output schema, streaming)
+        self._runnables: Dict[Tuple[type, bool], Runnable] = {}
+        self._lock = Lock()
 
-    def generate_response(self, prompt: str, output: Type[Union[Action, FinantialActions, SimpleStringResponse]]) -> Union[Action, FinantialActions, SimpleStringResponse]:
+    def _get_runnable(self, output: type, streaming: bool = False) -> Runnable:
+        """
+        Returns the structured output runnable for an output model, built only the first time.
+        """
+        key = (output, streaming)
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            # A JSON schema (instead of the pydantic model) lets the parser emit partial objects
+            runnable = self.llm.with_structured_output(output.model_json_schema() if streaming else output)
+            with self._lock:
+                runnable = self._runnables.setdefault(key, runnable)
+        return runnable
+
+    def generate_response(self, prompt: Union[str, PromptValue], output: Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]], deadline: Optional[Deadline] = None) -> Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]:
         """
         Sends a prompt to the Akash LLM and returns the generated response.
         Logs the request and any errors during the API call.
+        With a deadline, the request times out with the remaining budget.
         """
-        client = self.llm.with_structured_output(output)
-        response = client.invoke(prompt)
+        client = self._get_runnable(output)
+        try:
+            response = client.invoke(prompt, **self._get_request_kwargs(deadline))
+        except Exception:
+            if deadline:
+                deadline.check("llm.fallback")
+            raise
         logger.info(f"Response from Open API: {response}")
         if isinstance(response, dict):
             return output(**response)
         return response
+
+    def stream_response(self, prompt: Union[str, PromptValue], output: Type[Union[Action, FinantialActions, SimpleStringResponse, TransactionRepair]], deadline: Optional[Deadline] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the structured response as partial dicts that grow while tokens arrive.
+        """
+        client = self._get_runnable(output, streaming=True)
+        yield from client.stream(prompt, **self._get_request_kwargs(deadline))
+
+    def _get_request_kwargs(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """
+        Returns the per-request arguments: the timeout left by the deadline, if any.
+        Raises DeadlineExceededError if the budget is already exhausted.
+        """
+        if deadline is None:
+            return {}
+        return {"timeout": deadline.timeout("llm.fallback", config.OPENAI_TIMEOUT)}
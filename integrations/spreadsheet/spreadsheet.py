@@ -153,3 +153,34 @@ class SpreadsheetManager:
             logger.error(f"Error inserting row: {e}")
             return False
 
+    def insert_rows_by_id(self, sheet_id: str, worksheet_name: str, rows_data: List[List[str]]) -> bool:
+        """
+        Appends several rows to a specific worksheet in a single request.
+
+        Args:
+            sheet_id: The ID of the spreadsheet
+            worksheet_name: The name of the worksheet
+            rows_data: The rows to insert, each as a list
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if config.ENVIRONMENT == "TEST":
+            return True
+
+        try:
+            spreadsheet = self.get_spreadsheet_by_id(sheet_id)
+            if not spreadsheet:
+                return False
+
+            worksheet = spreadsheet.worksheet(worksheet_name)
+            worksheet.append_rows(rows_data)
+            logger.info(f"{len(rows_data)} rows inserted successfully into '{worksheet_name}' of spreadsheet '{sheet_id}'")
+            return True
+        except gspread.WorksheetNotFound:
+            logger.error(f"Worksheet '{worksheet_name}' not found in spreadsheet '{sheet_id}'")
+            return False
+        except Exception as e:
+            logger.error(f"Error inserting rows: {e}")
+            return False
+
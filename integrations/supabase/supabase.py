@@ -1,6 +1,6 @@
 from logging_config import get_logger
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 from supabase import create_client, Client
 from config import config
 
@@ -15,8 +15,8 @@ class SupabaseManager(SupabaseManagerService):
     def __init__(self):
         self._client: Client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
 
-    def insert(self, table_name: str, data: Dict[str, Any]) -> bool:
-        """Inserts a new record into the specified table."""        
+    def insert(self, table_name: str, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> bool:
+        """Inserts a new record, or several records in a single request, into the specified table."""
         try:
             response = self._client.table(table_name).insert(data).execute()
             
@@ -1,4 +1,10 @@
+import asyncio
+import io
 from dataclasses import dataclass
+from typing import AsyncIterable, BinaryIO, Optional, Union
+
+from core.utils.deadline import Deadline
+from core.utils.metrics import metrics
 from logging_config import get_logger
 from config import config
 
@@ -19,6 +25,9 @@ class InvalidApiResponseError(TranscriptionServiceError):
     """Exception for invalid or unexpected API responses."""
     pass
 
+# Audio accepted by the client: the whole clip, a file-like object or an async byte stream
+AudioSource = Union[bytes, BinaryIO, AsyncIterable[bytes]]
+
 @dataclass
 class TranscriptionResponse:
     """
@@ -29,17 +38,56 @@ class TranscriptionResponse:
 class TranscriptionServiceClient:
     """
     Client for interacting with a transcription service.
+
+    Keeps a single long-lived aiohttp session so connections to the service are
+    pooled and reused between voice notes. The session is opened lazily (or by
+    start()) and must be closed with close() on shutdown.
     """
-    def __init__(self, base_url: str = None):
+    # Gateway errors are returned before the service starts the transcription, safe to retry
+    RETRYABLE_STATUSES = (502, 503, 504)
+    RETRY_BACKOFF_SECS = 0.5
+
+    def __init__(
+        self,
+        base_url: str = None,
+        pool_size: int = config.TRANSCRIPTION_POOL_SIZE,
+        keepalive_secs: float = config.TRANSCRIPTION_KEEPALIVE_SECS,
+        connect_timeout_secs: float = config.TRANSCRIPTION_CONNECT_TIMEOUT_SECS,
+        timeout_secs: float = config.TRANSCRIPTION_TIMEOUT_SECS,
+        max_retries: int = config.TRANSCRIPTION_MAX_RETRIES,
+    ):
         self._base_url = base_url or config.TRANSCRIPTION_API_BASE_URL
+        self._pool_size = pool_size
+        self._keepalive_secs = keepalive_secs
+        self._timeout = aiohttp.ClientTimeout(total=timeout_secs, connect=connect_timeout_secs)
+        self._max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
         logger.info(f"TranscriptionServiceClient initialized with base URL: {self._base_url}")
 
-    async def transcribe(self, audio_file: bytes) -> TranscriptionResponse:
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=self._keepalive_secs)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def start(self) -> None:
+        """Opens the shared HTTP session. Must be called from the server event loop."""
+        self._get_session()
+        logger.info(f"TranscriptionServiceClient session opened. Pool size: {self._pool_size}")
+
+    async def transcribe(self, audio_file: AudioSource, deadline: Optional[Deadline] = None) -> TranscriptionResponse:
         """
         Calls the /transcribe endpoint to upload and transcribe audio.
+        Connection errors and gateway errors (502, 503, 504) are retried up to max_retries times.
+        With a deadline, each attempt times out with the remaining budget and no retry starts past it.
+
+        File-like objects and async byte streams are sent with chunked transfer encoding,
+        so the clip is never held in memory as a whole. A stream can only be read once,
+        so requests sending an async stream are not retried.
 
         Args:
-            audio_file: The audio file content as bytes.
+            audio_file: The audio file content as bytes, a file-like object or an async byte stream.
+            deadline: The time budget of the request.
 
         Returns:
             TranscriptionResponse: A dictionary containing the transcription.
@@ -49,40 +97,108 @@ class TranscriptionServiceClient:
             HttpRequestError: If there's an issue with the HTTP request.
             InvalidApiResponseError: If the API response is invalid or unexpected.
             TranscriptionServiceError: For other service-specific errors.
+            DeadlineExceededError: If the deadline is exhausted before or during the transcription.
         """
+        metrics.increment("transcription.requests")
+        try:
+            with metrics.timer("transcription.latency_seconds"):
+                return await self._transcribe_with_retries(audio_file, deadline)
+        except TranscriptionServiceError:
+            metrics.increment("transcription.errors")
+            if deadline:
+                deadline.check("transcription")
+            raise
+
+    async def _transcribe_with_retries(
+        self, audio_file: AudioSource, deadline: Optional[Deadline] = None
+    ) -> TranscriptionResponse:
+        replayable = isinstance(audio_file, (bytes, bytearray)) or self._is_seekable(audio_file)
+        start_position = audio_file.tell() if not isinstance(audio_file, (bytes, bytearray)) and replayable else 0
+        max_retries = self._max_retries if replayable else 0
+
+        attempt = 0
+        while True:
+            timeout = None
+            if deadline:
+                timeout = aiohttp.ClientTimeout(
+                    total=deadline.timeout("transcription", self._timeout.total),
+                    connect=self._timeout.connect,
+                )
+            try:
+                return await self._post_transcribe(audio_file, timeout)
+            except _RetryableError as e:
+                if attempt >= max_retries:
+                    raise HttpRequestError(str(e)) from e
+                attempt += 1
+                metrics.increment("transcription.retries")
+                logger.warning(f"Retrying transcription ({attempt}/{max_retries}) after error: {e}")
+                if not isinstance(audio_file, (bytes, bytearray)):
+                    audio_file.seek(start_position)
+                await asyncio.sleep(self.RETRY_BACKOFF_SECS * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _is_seekable(audio_file: AudioSource) -> bool:
+        try:
+            return isinstance(audio_file, io.IOBase) and audio_file.seekable()
+        except (ValueError, OSError):
+            return False
+
+    async def _post_transcribe(
+        self, audio_file: AudioSource, timeout: Optional[aiohttp.ClientTimeout] = None
+    ) -> TranscriptionResponse:
         endpoint = "transcribe"
         # Add max_duration as a query param
         max_duration = config.MAX_DURATION_AUDIO_IN_SECS
         url = f"{self._base_url}/{endpoint}?max_duration={max_duration}"
-        data = {'file': audio_file}
-        logger.info(f"Sending POST request to: {url}, with form data keys: {list(data.keys())}")
+        # aiohttp streams file-like and async iterable parts with chunked transfer encoding
+        data = aiohttp.FormData()
+        data.add_field('file', audio_file, filename='file', content_type='application/octet-stream')
+        logger.info(f"Sending POST request to: {url}, with form data keys: ['file']")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data) as response:
-                    if not response.ok:
-                        error_message = await response.text()
-                        logger.error(f"HTTP error {response.status} at {url}: {error_message}")
-                        raise HttpRequestError(f"HTTP error {response.status} at {url}: {error_message}")
-                    try:
-                        response_data = await response.json()
-                        logger.debug(f"Received API response from {url}: {response_data}")
-                        # Type check the response data
-                        if "transcription" in response_data and isinstance(response_data["transcription"], str):
-                            logger.info(response_data)
-                            return TranscriptionResponse(transcription=response_data["transcription"])
-                        else:
-                            logger.error(f"Invalid API response format: {response_data}")
-                            raise InvalidApiResponseError(f"Invalid API response format: {response_data}")
-                    except aiohttp.ContentTypeError:
-                        response_text = await response.text()
-                        logger.error(f"Invalid JSON response received from {url}: {response_text}")
-                        raise InvalidApiResponseError(f"Invalid JSON response received from {url}: {response_text}")
+            async with self._get_session().post(url, data=data, timeout=timeout or self._timeout) as response:
+                if not response.ok:
+                    error_message = await response.text()
+                    logger.error(f"HTTP error {response.status} at {url}: {error_message}")
+                    if response.status in self.RETRYABLE_STATUSES:
+                        raise _RetryableError(f"HTTP error {response.status} at {url}: {error_message}")
+                    raise HttpRequestError(f"HTTP error {response.status} at {url}: {error_message}")
+                try:
+                    response_data = await response.json()
+                    logger.debug(f"Received API response from {url}: {response_data}")
+                    # Type check the response data
+                    if "transcription" in response_data and isinstance(response_data["transcription"], str):
+                        logger.info(response_data)
+                        return TranscriptionResponse(transcription=response_data["transcription"])
+                    else:
+                        logger.error(f"Invalid API response format: {response_data}")
+                        raise InvalidApiResponseError(f"Invalid API response format: {response_data}")
+                except aiohttp.ContentTypeError:
+                    response_text = await response.text()
+                    logger.error(f"Invalid JSON response received from {url}: {response_text}")
+                    raise InvalidApiResponseError(f"Invalid JSON response received from {url}: {response_text}")
+        except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+            logger.error(f"Connection error during POST to {url}: {e}")
+            raise _RetryableError(f"Connection error during POST to {url}: {e}")
         except aiohttp.ClientError as e:
             logger.error(f"AIOHTTP client error during POST to {url}: {e}")
             raise HttpRequestError(f"AIOHTTP client error during POST to {url}: {e}")
+        except asyncio.TimeoutError as e:
+            logger.error(f"Timeout during POST to {url}")
+            raise HttpRequestError(f"Timeout during POST to {url}") from e
 
     async def close(self) -> None:
-        """No explicit closing needed as sessions are created per request."""
-        logger.info("TranscriptionServiceClient.close() called - no explicit action needed.")
-        pass
+        """Closes the shared HTTP session and its pooled connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            logger.info("TranscriptionServiceClient session closed.")
+        self._session = None
+
+
+class _RetryableError(Exception):
+    """Internal signal for failures that are safe to retry."""
+    pass
+
+
+# Create a global instance
+transcription_client = TranscriptionServiceClient()
@@ -0,0 +1,105 @@
+"""
+Input tokens of every system prompt variant and of the LLM requests of each message type.
+
+Counts with tiktoken when its encoding can be loaded (it's downloaded on first use),
+otherwise estimates 4 characters per token. The structured output schema is sent with
+every request too, so it's counted apart. Needs the app environment (.env) to import the config:
+
+    python scripts/analyze_prompt_tokens.py --message "gaste 2500 en el super"
+"""
+import argparse
+import json
+import os
+import sys
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_processor.prompt_builder import PromptBuilder  # noqa: E402
+from core.models.common.action_type import Action, ActionTypes  # noqa: E402
+from core.prompt_registry import PromptName, prompt_registry  # noqa: E402
+from integrations.providers.llm_akash import HUMAN_INPUT_VARIABLE, get_prompt_template  # noqa: E402
+
+ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+
+# The prompt answering each message type, after the action prompt
+ANSWER_PROMPTS = {
+    ActionTypes.TRANSACTION: PromptName.TRANSACTION,
+    ActionTypes.QUESTION: PromptName.QUESTION,
+    ActionTypes.SOCIAL_MESSAGE: PromptName.SOCIAL_MESSAGE,
+    ActionTypes.UNKNOWN_MESSAGE: PromptName.UNKNOWN_MESSAGE,
+}
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING)
+    except Exception:
+        return None
+
+
+def tokenizer_name() -> str:
+    return f"tiktoken {ENCODING}" if _encoding() else f"estimate ({CHARS_PER_TOKEN} chars per token)"
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    return len(encoding.encode(text)) if encoding else len(text) // CHARS_PER_TOKEN + 1
+
+
+def request_tokens(system_template: str, human_template: str, output: type) -> dict:
+    # The prompt as sent: literal braces unescaped and the human message filled in
+    messages = get_prompt_template(system_template).format_messages(**{HUMAN_INPUT_VARIABLE: human_template})
+    return {
+        "system": count_tokens(messages[0].content),
+        "human": count_tokens(messages[1].content),
+        "schema": count_tokens(json.dumps(output.model_json_schema(), ensure_ascii=False)),
+    }
+
+
+def print_variants():
+    active = prompt_registry.active()
+    print(f"{'prompt':>16} {'variant':>8} {'version':>8} {'stage':>15} {'chars':>7} {'tokens':>7} {'saved':>7}  active")
+    for name in PromptName:
+        full_tokens = None
+        for variant in prompt_registry.variants(name):
+            text = get_prompt_template(variant.template).format_messages(**{HUMAN_INPUT_VARIABLE: ""})[0].content
+            tokens = count_tokens(text)
+            full_tokens = full_tokens or tokens
+            print(
+                f"{name.value:>16} {variant.variant:>8} {variant.version:>8} {variant.stage.value:>15} "
+                f"{len(text):>7} {tokens:>7} {1 - tokens / full_tokens:>6.0%}  "
+                f"{'*' if active[name.value] == variant.key else ''}"
+            )
+
+
+def print_requests(message: str):
+    action_request = request_tokens(prompt_registry.get(PromptName.ACTION).template, message, Action)
+    print(f"\nInput tokens per message type: {PromptName.ACTION.value} request + answer request (system/human/schema)")
+    print(f"{'message type':>16} {'variant':>8} {'classification':>16} {'answer stage':>13} {'answer':>18} {'total':>7}")
+    for action_type, name in ANSWER_PROMPTS.items():
+        for variant in prompt_registry.variants(name):
+            builder = PromptBuilder(variants={name: variant.variant})
+            prompt = builder.build_prompt(message, Action(action_type=action_type, message=message))
+            answer = request_tokens(prompt.system_prompt, prompt.human_prompt, prompt.output_model)
+            total = sum(action_request.values()) + sum(answer.values())
+            print(
+                f"{action_type.value:>16} {variant.variant:>8} "
+                f"{'/'.join(str(tokens) for tokens in action_request.values()):>16} {prompt.stage.value:>13} "
+                f"{'/'.join(str(tokens) for tokens in answer.values()):>18} {total:>7}"
+            )
+
+
+def main(args):
+    print(f"Tokenizer: {tokenizer_name()}\n")
+    print_variants()
+    print_requests(args.message)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the input tokens of the prompts per variant and pipeline stage")
+    parser.add_argument("--message", default="gaste 2500 en el super y 800 de cafe", help="User message of the requests")
+    main(parser.parse_args())
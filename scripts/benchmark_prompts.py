@@ -0,0 +1,79 @@
+"""
+Per-request CPU time of preparing an LLM call: rebuilding the prompt templates and
+the structured output runnable on every request vs reusing the precompiled ones.
+
+No LLM is called, only the work done before the request is measured.
+Needs the app environment (.env) to import the config:
+
+    python scripts/benchmark_prompts.py --iterations 200
+"""
+import argparse
+import os
+import sys
+import time
+
+from langchain.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    SystemMessagePromptTemplate,
+)
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_processor.prompt_builder import PromptBuilder  # noqa: E402
+from core.models.common.action_type import Action, ActionTypes  # noqa: E402
+from core.prompts import ACTION_PROMPT  # noqa: E402
+from integrations.providers.llm_akash import HUMAN_INPUT_VARIABLE, get_prompt_template  # noqa: E402
+
+MESSAGE = "gaste 2500 en el super y 800 de cafe"
+
+
+def per_request_before(client: ChatOpenAI, system_template: str, human_template: str, output: type):
+    # What RotatingLLMClientPool did on every request
+    system_prompt = SystemMessagePromptTemplate.from_template(system_template)
+    human_prompt = HumanMessagePromptTemplate.from_template(human_template)
+    chat_prompt = ChatPromptTemplate.from_messages([system_prompt, human_prompt]).format()
+    return client.with_structured_output(output), chat_prompt
+
+
+def per_request_after(runnables: dict, system_template: str, human_template: str, output: type):
+    chat_prompt = get_prompt_template(system_template).format_prompt(**{HUMAN_INPUT_VARIABLE: human_template})
+    return runnables[output], chat_prompt
+
+
+def cpu_time_per_call(function, iterations: int, *args) -> float:
+    started_at = time.process_time()
+    for _ in range(iterations):
+        function(*args)
+    return (time.process_time() - started_at) / iterations
+
+
+def main(args):
+    client = ChatOpenAI(api_key=SecretStr("sk-benchmark"), base_url="http://127.0.0.1:9", model="benchmark")
+    builder = PromptBuilder()
+    requests = [("action", ACTION_PROMPT, MESSAGE, Action)]
+    for action_type in (ActionTypes.TRANSACTION, ActionTypes.QUESTION, ActionTypes.SOCIAL_MESSAGE):
+        prompt = builder.build_prompt(MESSAGE, Action(action_type=action_type, message=MESSAGE))
+        requests.append((action_type.value, prompt.system_prompt, prompt.human_prompt, prompt.output_model))
+
+    # Built once, as the pool does at startup
+    runnables = {output: client.with_structured_output(output) for _, _, _, output in requests}
+    for _, system_template, _, _ in requests:
+        get_prompt_template(system_template)
+
+    print(f"{'request':>15} {'prompt KB':>10} {'before (ms)':>12} {'after (ms)':>11} {'saved (ms)':>11}")
+    for name, system_template, human_template, output in requests:
+        before = cpu_time_per_call(per_request_before, args.iterations, client, system_template, human_template, output)
+        after = cpu_time_per_call(per_request_after, args.iterations, runnables, system_template, human_template, output)
+        print(
+            f"{name:>15} {len(system_template) / 1024:>10.1f} {before * 1000:>12.3f} "
+            f"{after * 1000:>11.3f} {(before - after) * 1000:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prompt and runnable preparation per LLM request")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests prepared per measurement")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Load test for the web layer. Compares requests/s and latency percentiles between
+the Flask (WsgiToAsgi) and the native ASGI server modes.
+
+Start the server in one mode, run the benchmark, then repeat with the other one:
+
+    python app.py --server flask &
+    python scripts/benchmark_server.py --url http://localhost:8080/healthcheck
+
+    python app.py --server asgi &
+    python scripts/benchmark_server.py --url http://localhost:8080/healthcheck
+
+Use --method POST with --body to benchmark a webhook, e.g. /telegram/webhook with
+an update JSON. Note that webhook requests are processed by the bot.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+async def run_benchmark(url, method, body, total_requests, concurrency):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total_requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, content=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Content-Type": "application/json"} if body else None
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=30) as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "url": url,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Quipu web layer")
+    parser.add_argument("--url", default="http://localhost:8080/healthcheck", help="URL to benchmark")
+    parser.add_argument("--method", default="GET", help="HTTP method (default: GET)")
+    parser.add_argument("--body", default=None, help="Path to a JSON file sent as request body")
+    parser.add_argument("--requests", type=int, default=5000, help="Total number of requests (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent connections (default: 50)")
+    args = parser.parse_args()
+
+    body = None
+    if args.body:
+        with open(args.body, "rb") as body_file:
+            body = body_file.read()
+
+    result = asyncio.run(run_benchmark(args.url, args.method.upper(), body, args.requests, args.concurrency))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
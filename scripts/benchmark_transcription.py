@@ -0,0 +1,96 @@
+"""
+Latency of single-request vs chunked parallel transcription by clip length.
+
+Runs a local stub transcription server whose processing time grows linearly
+with the audio length, generates synthetic voice notes (tone bursts separated
+by short pauses) with ffmpeg, and times AudioProcessor with chunking off and on.
+
+Needs ffmpeg and the app environment (.env) to import the config:
+
+    python scripts/benchmark_transcription.py --lengths 10 20 30 45 60
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config  # noqa: E402
+from core.audio_processor import AudioProcessor  # noqa: E402
+
+# 16 kbps Opus, the pre-processing output
+BYTES_PER_AUDIO_SEC = 2000
+
+
+def generate_clip(ffmpeg: str, length_secs: int) -> bytes:
+    # 2.5s of "speech" followed by a 0.7s pause, repeated
+    return subprocess.run(
+        [
+            ffmpeg, "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=f=300:r=48000:d={length_secs}",
+            "-af", "volume='if(lt(mod(t,3.2),2.5),1,0)':eval=frame",
+            "-c:a", "libopus", "-b:a", "32k", "-f", "ogg", "pipe:1",
+        ],
+        check=True,
+        capture_output=True,
+    ).stdout
+
+
+async def start_stub_server(port: int, base_latency: float, realtime_factor: float) -> web.AppRunner:
+    async def transcribe(request: web.Request) -> web.Response:
+        form = await request.post()
+        audio = form["file"].file.read() if hasattr(form["file"], "file") else form["file"]
+        audio_secs = len(audio) / BYTES_PER_AUDIO_SEC
+        await asyncio.sleep(base_latency + audio_secs * realtime_factor)
+        return web.json_response({"transcription": f"segment of {audio_secs:.1f}s"})
+
+    app = web.Application(client_max_size=50 * 1024 * 1024)
+    app.router.add_post("/transcribe", transcribe)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def time_transcription(processor: AudioProcessor, clip: bytes, chunking: bool, runs: int) -> float:
+    config.TRANSCRIPTION_CHUNKING_ENABLED = chunking
+    audio = await processor._preprocess(clip)
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        await processor._transcribe(audio)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+async def main(args):
+    runner = await start_stub_server(args.port, args.base_latency, args.realtime_factor)
+    processor = AudioProcessor(base_url=f"http://127.0.0.1:{args.port}")
+    if not processor.preprocessor.available:
+        sys.exit("ffmpeg is required for the benchmark")
+
+    print(f"{'length (s)':>10} {'single (s)':>11} {'chunked (s)':>12} {'speedup':>8}")
+    try:
+        for length in args.lengths:
+            clip = generate_clip(processor.preprocessor.ffmpeg_path, length)
+            single = await time_transcription(processor, clip, chunking=False, runs=args.runs)
+            chunked = await time_transcription(processor, clip, chunking=True, runs=args.runs)
+            print(f"{length:>10} {single:>11.2f} {chunked:>12.2f} {single / chunked:>7.1f}x")
+    finally:
+        await processor.transcription_client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chunked transcription against a stub server")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 20, 30, 45, 60], help="Clip lengths in seconds")
+    parser.add_argument("--base-latency", type=float, default=0.3, help="Stub fixed latency per request (s)")
+    parser.add_argument("--realtime-factor", type=float, default=0.2, help="Stub processing seconds per audio second")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement, the fastest is reported")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the stub server")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,228 @@
+"""
+Offline accuracy vs input tokens of the prompt variants, to decide whether a variant
+(e.g. "compact") can be promoted with LLM_PROMPT_VARIANTS.
+
+The corpus is a JSONL file, one message per line:
+
+    {"prompt": "transaction", "message": "gasté 2 gambas de luz",
+     "expected": {"actions": [{"amount": 200, "currency": "ARS", "category": "servicios", "action": "gasto"}]},
+     "responses": {"transaction:full:1": {...}, "transaction:compact:1": {...}}}
+    {"prompt": "question", "message": "¿dónde veo mis gastos?", "expected": {"must_contain": ["quipubot.app"]}}
+
+Transactions are scored on the amount, currency, category and action of every extracted
+transaction, answers on containing every expected snippet. By default a local stub LLM
+replays the recorded `responses` of each variant key, so the comparison runs offline
+and is repeatable. Record them once against the configured models (needs the app
+environment and the Akash keys):
+
+    python scripts/evaluate_prompt_variants.py --live --record corpus_recorded.jsonl
+    python scripts/evaluate_prompt_variants.py --corpus corpus_recorded.jsonl
+
+The input tokens are counted for every message, with or without a recorded response.
+`--expected-stub` answers every variant with the expected result instead, which runs the
+whole harness deterministically without recordings (e.g. in CI) but scores every variant 100%.
+"""
+import argparse
+import json
+import os
+import sys
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyze_prompt_tokens import ANSWER_PROMPTS, request_tokens, tokenizer_name  # noqa: E402
+from core.llm_processor.prompt_builder import PromptBuilder  # noqa: E402
+from core.models.common.action_type import Action  # noqa: E402
+from core.models.common.financial_type import FinantialActions  # noqa: E402
+from core.prompt_registry import FULL_VARIANT, PromptName, prompt_registry  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prompt_eval_corpus.jsonl")
+ACTION_TYPES = {name: action_type for action_type, name in ANSWER_PROMPTS.items()}
+TRANSACTION_FIELDS = ("amount", "currency", "category", "action")
+
+
+class StubLLM:
+    """Replays the responses recorded in the corpus, by message and prompt variant key."""
+
+    def __init__(self, records: list):
+        self.responses = {
+            (record["message"], key): response
+            for record in records
+            for key, response in record.get("responses", {}).items()
+        }
+
+    def generate_response(self, variant_key: str, message: str, output: type, **kwargs):
+        response = self.responses.get((message, variant_key))
+        return None if response is None else output.model_validate(response)
+
+
+class ExpectedStubLLM:
+    """Answers every variant with the expected result of the message, to check the harness without recordings."""
+
+    def __init__(self, records: list):
+        self.expected = {record["message"]: record["expected"] for record in records}
+
+    def generate_response(self, variant_key: str, message: str, output: type, **kwargs):
+        expected = self.expected.get(message)
+        if expected is None:
+            return None
+        if output is FinantialActions:
+            date = datetime.now().isoformat()
+            return output.model_validate(
+                {"actions": [{**action, "description": message, "date": date} for action in expected.get("actions", [])]}
+            )
+        return output.model_validate({"response": " ".join(expected.get("must_contain", []))})
+
+
+class LiveLLM:
+    """Calls the configured model of each stage, as the pipeline does."""
+
+    def __init__(self):
+        from integrations.providers.llm_akash import RotatingLLMClientPool
+        self.pools = {}
+        self._pool_class = RotatingLLMClientPool
+
+    def generate_response(self, variant_key: str, message: str, output: type, stage, **kwargs):
+        if stage not in self.pools:
+            self.pools[stage] = self._pool_class(stage=stage)
+        pool = self.pools[stage]
+        return pool.generate_response(output=output, **kwargs)
+
+
+def _normalize(value) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(value).strip().lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def score_transactions(response: FinantialActions, expected: dict) -> dict:
+    """Returns whether every transaction matches, and the matching fields out of the expected ones."""
+    extracted = sorted((transaction.model_dump(mode="json") for transaction in response.actions), key=lambda t: t["amount"])
+    wanted = sorted(expected.get("actions", []), key=lambda t: t["amount"])
+    fields = 0
+    for got, want in zip(extracted, wanted):
+        fields += abs(got["amount"] - want["amount"]) < 0.01
+        fields += sum(_normalize(got[field]) == _normalize(want[field]) for field in TRANSACTION_FIELDS[1:])
+    total = len(wanted) * len(TRANSACTION_FIELDS)
+    return {"correct": len(extracted) == len(wanted) and fields == total, "fields": fields, "total_fields": total}
+
+
+def score_answer(response, expected: dict) -> dict:
+    text = _normalize(response.response)
+    snippets = expected.get("must_contain", [])
+    found = sum(_normalize(snippet) in text for snippet in snippets)
+    return {"correct": found == len(snippets), "fields": found, "total_fields": len(snippets)}
+
+
+def evaluate(records: list, llm, live: bool) -> dict:
+    results = defaultdict(
+        lambda: {"requests": 0, "scored": 0, "correct": 0, "fields": 0, "total_fields": 0, "tokens": 0, "missing": 0}
+    )
+    for record in records:
+        name = PromptName(record["prompt"])
+        action_type = ACTION_TYPES[name]
+        message = record["message"]
+        for variant in prompt_registry.variants(name):
+            prompt = PromptBuilder(variants={name: variant.variant}).build_prompt(
+                message, Action(action_type=action_type, message=message)
+            )
+            try:
+                response = llm.generate_response(
+                    variant_key=variant.key,
+                    message=message,
+                    output=prompt.output_model,
+                    stage=prompt.stage,
+                    system_template=prompt.system_prompt,
+                    human_template=prompt.human_prompt,
+                )
+            except Exception as e:
+                print(f"Error on {variant.key} for {message!r}: {e}", file=sys.stderr)
+                response = None
+
+            stats = results[variant.key]
+            # The request is the same with or without a response, so its tokens always count
+            stats["requests"] += 1
+            stats["tokens"] += sum(request_tokens(prompt.system_prompt, prompt.human_prompt, prompt.output_model).values())
+            if response is None and not live:
+                stats["missing"] += 1
+                continue
+            if live and response is not None:
+                record.setdefault("responses", {})[variant.key] = response.model_dump(mode="json")
+            score = (
+                {"correct": False, "fields": 0, "total_fields": 0} if response is None
+                else score_transactions(response, record["expected"]) if prompt.output_model is FinantialActions
+                else score_answer(response, record["expected"])
+            )
+            stats["scored"] += 1
+            stats["correct"] += score["correct"]
+            stats["fields"] += score["fields"]
+            stats["total_fields"] += score["total_fields"]
+    return results
+
+
+def print_report(results: dict, max_accuracy_drop: float):
+    print(f"Tokenizer: {tokenizer_name()}\n")
+    print(
+        f"{'variant':>24} {'scored':>7} {'missing':>8} {'accuracy':>9} {'fields':>7} "
+        f"{'tokens/req':>11} {'saved':>6}  verdict"
+    )
+    for name in PromptName:
+        full = None
+        for variant in prompt_registry.variants(name):
+            stats = results.get(variant.key)
+            if not stats:
+                continue
+            scored = stats["scored"]
+            accuracy = stats["correct"] / scored if scored else 0.0
+            fields = stats["fields"] / stats["total_fields"] if stats["total_fields"] else 0.0
+            tokens = stats["tokens"] / stats["requests"] if stats["requests"] else 0.0
+            if variant.variant == FULL_VARIANT:
+                full = (accuracy if scored else None, tokens)
+                saved, verdict = 0.0, ""
+            elif not scored or full is None or full[0] is None:
+                saved = 1 - tokens / full[1] if full and full[1] else 0.0
+                verdict = "not enough data"
+            else:
+                saved = 1 - tokens / full[1]
+                verdict = "promote" if accuracy >= full[0] - max_accuracy_drop else "keep full"
+            print(
+                f"{variant.key:>24} {scored:>7} {stats['missing']:>8} {accuracy:>9.1%} {fields:>7.1%} "
+                f"{tokens:>11.0f} {saved:>6.0%}  {verdict}"
+            )
+
+
+def main(args):
+    with open(args.corpus, encoding="utf-8") as corpus:
+        records = [json.loads(line) for line in corpus if line.strip()]
+    if args.prompts:
+        records = [record for record in records if record["prompt"] in args.prompts]
+
+    llm = LiveLLM() if args.live else ExpectedStubLLM(records) if args.expected_stub else StubLLM(records)
+    results = evaluate(records, llm, live=args.live)
+    print_report(results, args.max_accuracy_drop)
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as output:
+            for record in records:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"\nRecorded responses written to {args.record}")
+    if args.expected_stub:
+        print("\nEvery variant answered with the expected results, only the tokens are meaningful")
+    elif not args.live and any(stats["missing"] for stats in results.values()):
+        print("\nSome variants have no recorded responses, record them with --live --record <corpus>")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the accuracy and input tokens of the prompt variants")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL corpus of messages and expected results")
+    parser.add_argument("--prompts", nargs="+", choices=[name.value for name in ACTION_TYPES], help="Prompts to evaluate")
+    parser.add_argument("--live", action="store_true", help="Call the configured models instead of the stub LLM")
+    parser.add_argument(
+        "--expected-stub", action="store_true", help="Answer with the expected results, to run without recorded responses"
+    )
+    parser.add_argument("--record", help="Write the corpus with the responses of this run (with --live)")
+    parser.add_argument(
+        "--max-accuracy-drop", type=float, default=0.02, help="Accuracy a variant may lose against full to be promoted"
+    )
+    main(parser.parse_args())
@@ -3,13 +3,23 @@ import argparse
 import sys
 import logging
 import asyncio
+from functools import partial
 from pathlib import Path
+from typing import List
 from flask import Blueprint, Response, request, make_response
 from asgiref.wsgi import WsgiToAsgi
 import uvicorn
 from http import HTTPStatus
 from telegram import Update
 from api.telegram.bot import register_handlers, get_application, setup_webhook
+from api.telegram.handlers.conversation_handler import has_active_conversation
+from api.telegram.handlers.onboarding_handlers import onboarding_conv_handler
+from core.message_coalescer import message_coalescer
+from core.messages import OVERLOADED_MESSAGE
+from core.models.common.source import Source
+from core.scheduler import Priority, scheduler
+from core.task_supervisor import task_supervisor
+from core.utils.deadline import Deadline
 
 def get_version():
     """Get version from version.txt file"""
@@ -32,18 +42,119 @@ app = Blueprint('telegram', __name__)
 application = get_application()
 register_handlers(application)
 
+TELEGRAM_UPDATE_JOB = "telegram_update"
+
+# Background task pulling updates from the queue. Will be set in initialize_telegram
+update_processor = None
+
 logger.info(f"Starting Quipu Telegram version {get_version()}")
 
+def get_update_priority(update: Update) -> Priority:
+    """
+    Returns the scheduling lane for an update.
+    Button callbacks, commands and onboarding steps (e.g. the sheet URL reply)
+    are cheap and go to the fast lane, everything else (text and voice messages)
+    is LLM-bound.
+    """
+    if update.callback_query:
+        return Priority.FAST
+    message = update.effective_message
+    if message and message.text and message.text.startswith("/"):
+        return Priority.FAST
+    if has_active_conversation(onboarding_conv_handler, update):
+        return Priority.FAST
+    return Priority.SLOW
+
+def get_serial_key(update: Update):
+    """
+    Returns the key of the updates that must run one at a time and in order, or None.
+    Messages of a chat are ordered within their lane (LLM messages on one side, onboarding
+    steps on the other). Button callbacks and commands are not, so a tap on the buttons of a
+    reply never waits for the next message of the chat to be processed.
+    """
+    if update.callback_query or not update.effective_chat:
+        return None
+    message = update.effective_message
+    if message and message.text and message.text.startswith("/"):
+        return None
+    return update.effective_chat.id
+
+async def process_update(update: Update, deadline: Deadline):
+    """
+    Handles an update and writes the resulting state to the persistence right away.
+    The deadline started when the update was received is bound for the handlers (Deadline.current).
+    """
+    deadline.bind()
+    await application.process_update(update)
+    if application.persistence:
+        # Other workers may receive the next update of this conversation
+        await application.update_persistence()
+
+def merge_updates(updates: List[Update]) -> Update:
+    """Builds the update of the first message with the text of all of them, one per line (see MessageCoalescer)"""
+    data = updates[0].to_dict()
+    data["message"]["text"] = "\n".join(update.message.text for update in updates)
+    return Update.de_json(data=data, bot=application.bot)
+
+def reply_overloaded(update: Update):
+    """Returns the reply sent when an update is shed because the pipeline backlog is full"""
+    message = update.effective_message
+    return (lambda: message.reply_text(OVERLOADED_MESSAGE)) if message else None
+
+def submit_update(update: Update, priority: Priority, deadline: Deadline):
+    """Schedules the processing of an update in its lane"""
+    scheduler.submit(
+        process_update(update, deadline),
+        priority,
+        name=f"telegram-update-{update.update_id}",
+        kind=TELEGRAM_UPDATE_JOB,
+        payload=update.to_dict(),
+        on_rejected=reply_overloaded(update),
+        # Messages of a chat don't race each other or the conversation state
+        serial_key=get_serial_key(update),
+    )
+
 async def process_updates():
     while True:
         logger.info("Running update process")
         try:
             update = await application.update_queue.get()
+            # Started before scheduling, so the time queued in the lanes counts against the budget
+            deadline = Deadline.for_message()
             logger.info(f"Procesando actualización: {update}")
-            await application.process_update(update)
+            priority = get_update_priority(update)
+            chat_key = (Source.TELEGRAM, update.effective_chat.id) if update.effective_chat else None
+            if priority == Priority.SLOW and update.message and update.message.text:
+                # Typed LLM messages wait here for the next ones of the chat, without holding a slot
+                message_coalescer.add(
+                    chat_key, update, merge_updates, partial(submit_update, priority=priority, deadline=deadline)
+                )
+            else:
+                if chat_key:
+                    # Held messages of the chat go first
+                    message_coalescer.flush(chat_key)
+                submit_update(update, priority, deadline)
         finally:
             application.update_queue.task_done()
-        await asyncio.sleep(0.1)  # Pequeña pausa para no consumir CPU al 100%
+
+async def enqueue_update(data: dict) -> HTTPStatus:
+    """Parses a webhook payload and puts the update in the queue. Shared by the Flask and ASGI servers"""
+    try:
+        update = Update.de_json(data=data, bot=application.bot)
+        await application.update_queue.put(update)
+        return HTTPStatus.OK
+    except Exception as e:
+        logger.error(f"Error al procesar la actualización: {e}")
+        return HTTPStatus.INTERNAL_SERVER_ERROR
+
+def get_health_status() -> dict:
+    """Health check payload with version info"""
+    return {
+        "status": "healthycheck",
+        "service": "quipu-telegram",
+        "version": get_version(),
+        "timestamp": asyncio.get_event_loop().time()
+    }
 
 @app.post("/webhook")
 async def telegram_webhook() -> Response:
@@ -51,37 +162,36 @@ async def telegram_webhook() -> Response:
     logger.info(f"Headers de la petición: {request.headers}")
     logger.info(f"Cuerpo de la petición: {request.get_data(as_text=True)}")
     logger.info(f"App: {application}")
-    try:
-        update = Update.de_json(data=request.json, bot=application.bot)
-        await application.update_queue.put(update)
-        return Response(status=HTTPStatus.OK)
-    except Exception as e:
-        logger.error(f"Error al procesar la actualización: {e}")
-        return Response(status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    return Response(status=await enqueue_update(request.json))
 
 @app.get("/healthcheck")
 async def healthcheck():
     """Health check endpoint with version info"""
-    version = get_version()
-    status = {
-        "status": "healthycheck",
-        "service": "quipu-telegram",
-        "version": version,
-        "timestamp": asyncio.get_event_loop().time()
-    }
-    return make_response(status, HTTPStatus.OK)
+    return make_response(get_health_status(), HTTPStatus.OK)
 
 @app.get("/version")
 async def version_endpoint():
     """Version endpoint"""
     return make_response({"version": get_version()}, HTTPStatus.OK)
 
+async def resume_update(payload: dict):
+    """Puts back in the queue an update that was not processed before the last shutdown"""
+    await application.update_queue.put(Update.de_json(data=payload, bot=application.bot))
+
 async def initialize_telegram(debug: bool = False):
     """Initialize Telegram service"""
+    global update_processor
     await setup_webhook()
     await application.initialize()
     await application.start()
-    asyncio.create_task(process_updates())
+    task_supervisor.register_resumer(TELEGRAM_UPDATE_JOB, resume_update)
+    update_processor = asyncio.create_task(process_updates())
+
+async def shutdown_telegram():
+    """Stop pulling updates and shutdown Telegram service"""
+    if update_processor:
+        update_processor.cancel()
+    await application.stop()
 
 def main_cli():
     """CLI entry point with argument parsing"""
@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The config validates these at import time, the tests don't reach the services
+for _name in (
+    "OPENAI_API_KEY", "AKASH_API_BASE_URL", "AKASH_API_KEY", "GOOGLE_CREDENTIALS",
+    "GOOGLE_SHEET_TEMPLATE_URL", "GOOGLE_SERVICE_ACCOUNT_EMAIL", "SUPABASE_KEY",
+    "TRANSCRIPTION_API_BASE_URL", "WEBAPP_BASE_URL", "WEBHOOK_URL", "WHATSAPP_BASE_URL",
+    "WHATSAPP_VERIFY_TOKEN", "WHATSAPP_PHONE_ID", "WHATSAPP_TOKEN", "WHATSAPP_APP_ID", "WHATSAPP_APP_SECRET",
+):
+    os.environ.setdefault(_name, "test")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:test")
+os.environ.setdefault("USE_CLOUDWATCH", "false")
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+# Replies to one chat are not spread over seconds
+os.environ.setdefault("OUTBOUND_TELEGRAM_RECIPIENT_RATE", "1000")
+
+from core.interfaces.cache_service import CacheService  # noqa: E402
+
+
+class InMemoryCacheService(CacheService):
+    """Cache service over a dict, shared by the workers and threads as Redis would be."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        self.data[key] = value
+        return True
+
+    def add(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        with self._lock:
+            if key in self.data:
+                return False
+            self.data[key] = value
+            return True
+
+    def increment(self, key: str, amount: int = 1, expiry: Optional[int] = None) -> Optional[int]:
+        with self._lock:
+            self.data[key] = int(self.data.get(key, 0)) + amount
+            return self.data[key]
+
+    def push(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        with self._lock:
+            self.data.setdefault(key, deque()).append(value)
+            return True
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            values = self.data.get(key)
+            return values.popleft() if values else None
+
+    def delete(self, key: str) -> bool:
+        return self.data.pop(key, None) is not None
+
+
+@pytest.fixture
+def cache() -> InMemoryCacheService:
+    return InMemoryCacheService()
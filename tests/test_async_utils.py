@@ -0,0 +1,22 @@
+import asyncio
+import threading
+
+from core.utils.async_utils import run_llm_call
+from core.utils.deadline import Deadline
+
+
+def test_llm_calls_run_in_their_own_pool_with_the_caller_context():
+    def llm_call(prompt: str):
+        return prompt, threading.current_thread().name, Deadline.current()
+
+    async def scenario():
+        deadline = Deadline(10)
+        deadline.bind()
+        return deadline, await run_llm_call(llm_call, "hola")
+
+    deadline, (prompt, thread_name, current) = asyncio.run(scenario())
+
+    assert prompt == "hola"
+    # Not a default executor thread, a quota wait doesn't starve the storage calls
+    assert thread_name.startswith("llm")
+    assert current is deadline
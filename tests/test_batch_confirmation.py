@@ -0,0 +1,92 @@
+"""
+Concurrent taps on the buttons of a batch confirmation (a double tap on "confirm all",
+or an item and "confirm all") must save every movement once.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import List
+from unittest.mock import MagicMock
+
+from core.message_processor import MessageProcessor
+from core.models.common.source import Source
+from core.models.financial.transaction import Transaction
+from core.models.message import PendingBatch
+from core.services.message_service import MessageService
+
+USER_ID = "user-1"
+BATCH_ID = "100"
+
+
+class SlowDataSaver:
+    """Records the saved items, slow enough for the taps to overlap."""
+
+    def __init__(self) -> None:
+        self.saved: List[str] = []
+
+    def save_contents(self, contents, user, deadline=None) -> bool:
+        time.sleep(0.2)
+        self.saved.extend(content.description for content in contents)
+        return True
+
+
+def make_processor(cache) -> MessageProcessor:
+    # Built without __init__, which connects to the LLM and storage services
+    processor = MessageProcessor.__new__(MessageProcessor)
+    processor.message_service = MessageService(cache_service=cache)
+    processor.data_saver = SlowDataSaver()
+    processor.user_data_manager = MagicMock()
+    return processor
+
+
+def make_platform() -> MagicMock:
+    platform = MagicMock()
+    platform.get_platform_name.return_value = Source.TELEGRAM
+    platform.MAX_REPLY_BUTTONS = None
+    platform.MAX_BUTTONS_TEXT_LENGTH = 4096
+    return platform
+
+
+def save_batch(processor: MessageProcessor) -> None:
+    items = [
+        Transaction(amount=amount, currency="ARS", description=description, date=datetime(2025, 1, 1),
+                    category="comida", action="gasto")
+        for amount, description in ((1500, "super"), (800, "cafe"))
+    ]
+    processor.message_service.save_batch(
+        PendingBatch(user_id=USER_ID, batch_id=BATCH_ID, source=Source.TELEGRAM, items=items)
+    )
+
+
+def tap_concurrently(processor: MessageProcessor, indexes: List) -> None:
+    threads = [
+        threading.Thread(
+            target=processor.resolve_batch_and_respond,
+            kwargs=dict(user_id=USER_ID, batch_id=BATCH_ID, platform=make_platform(), confirm=True, index=index),
+        )
+        for index in indexes
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_double_confirm_all_saves_each_item_once(cache):
+    processor = make_processor(cache)
+    save_batch(processor)
+
+    tap_concurrently(processor, [None, None])
+
+    assert sorted(processor.data_saver.saved) == ["cafe", "super"]
+
+
+def test_confirm_item_and_confirm_all_save_each_item_once(cache):
+    processor = make_processor(cache)
+    save_batch(processor)
+
+    tap_concurrently(processor, [0, None])
+
+    assert sorted(processor.data_saver.saved) == ["cafe", "super"]
+    # Whichever tap ran last saw the status written by the other one and resolved the batch
+    assert processor.message_service.get_batch(user_id=USER_ID, batch_id=BATCH_ID, platform=Source.TELEGRAM) is None
@@ -0,0 +1,26 @@
+import asyncio
+
+from core.utils.deadline import Deadline
+
+
+def test_handlers_get_the_deadline_started_at_receipt():
+    async def handler() -> Deadline:
+        return Deadline.current()
+
+    async def process_update(deadline: Deadline) -> Deadline:
+        deadline.bind()
+        return await handler()
+
+    async def scenario():
+        received = Deadline(10)
+        # Queued for a while before a slot frees up
+        await asyncio.sleep(0.05)
+        bound = await asyncio.create_task(process_update(received))
+        return received, bound, await asyncio.create_task(handler())
+
+    received, bound, unbound = asyncio.run(scenario())
+
+    assert bound is received
+    assert bound.remaining() < 10 - 0.05
+    # Other tasks don't see it and start their own
+    assert unbound is not received
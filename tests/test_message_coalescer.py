@@ -0,0 +1,47 @@
+import asyncio
+from typing import List
+
+from core.message_coalescer import MessageCoalescer
+
+
+def merge(messages: List[str]) -> str:
+    return "\n".join(messages)
+
+
+def test_messages_in_the_window_are_dispatched_once_merged():
+    dispatched: List[str] = []
+
+    async def scenario() -> None:
+        coalescer = MessageCoalescer(window_secs=0.05, max_wait_secs=1)
+        coalescer.add("chat", "gasté 2000", merge, dispatched.append)
+        coalescer.add("chat", "en el super", merge, lambda message: dispatched.append(f"second: {message}"))
+        coalescer.add("other", "cafe 800", merge, dispatched.append)
+        # Nothing is submitted while the window is open
+        assert dispatched == []
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    # Each user is dispatched once, whichever window ends first
+    assert sorted(dispatched) == ["cafe 800", "gasté 2000\nen el super"]
+
+
+def test_flush_dispatches_the_held_messages_first():
+    dispatched: List[str] = []
+
+    async def scenario() -> None:
+        coalescer = MessageCoalescer(window_secs=10, max_wait_secs=10)
+        coalescer.add("chat", "gasté 2000", merge, dispatched.append)
+        # A voice note of the chat arrives: the held text goes before it
+        coalescer.flush("chat")
+        dispatched.append("voice note")
+        await asyncio.sleep(0)
+        assert coalescer.stats()["waiting_users"] == 0
+
+    asyncio.run(scenario())
+    assert dispatched == ["gasté 2000", "voice note"]
+
+
+def test_disabled_window_dispatches_right_away():
+    dispatched: List[str] = []
+    MessageCoalescer(window_secs=0).add("chat", "gasté 2000", merge, dispatched.append)
+    assert dispatched == ["gasté 2000"]
@@ -0,0 +1,265 @@
+"""
+Two PTB applications (two workers) sharing one RedisPersistence store: a conversation
+started in one worker must continue in the other, with its user_data.
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ConversationHandler, MessageHandler, filters
+from telegram.request import BaseRequest
+
+from api.telegram.handlers.conversation_handler import RedisConversationHandler
+from core.interfaces.cache_service import CacheService
+from core.models.user import User
+from integrations.cache.telegram_persistence import RedisPersistence
+from integrations.spreadsheet.spreadsheet import SpreadsheetManager
+
+AWAITING_URL, AWAITING_CONFIRMATION = 1, 2
+CHAT_ID = USER_ID = 42
+BOT = {"id": 123456, "is_bot": True, "first_name": "Quipu", "username": "quipu_test_bot"}
+
+
+class Tap(str):
+    """The callback data of an inline button tap, as a step of run_workers."""
+
+
+class BotApiRequest(BaseRequest):
+    """Answers the Bot API locally and records the methods called by the worker."""
+
+    def __init__(self, name: str = "", calls: Optional[List[Tuple[str, str]]] = None) -> None:
+        self.name = name
+        self.calls = calls if calls is not None else []
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def do_request(self, url: str, method: str, request_data=None, **kwargs) -> Tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        if api_method == "getMe":
+            result = BOT
+        else:
+            self.calls.append((self.name, api_method))
+            result = make_message(0, BOT, "") if api_method == "sendMessage" else True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+class Worker:
+    """
+    A PTB application as one server worker, with the given conversation or an
+    onboarding-like one that records its callbacks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        persistence: RedisPersistence,
+        calls: List[Tuple[str, str]],
+        conversation: Optional[ConversationHandler] = None,
+    ) -> None:
+        self.name = name
+        self.calls = calls
+        self.conversation = conversation or RedisConversationHandler(
+            name="onboarding",
+            persistence=persistence,
+            entry_points=[CommandHandler("start", self.start)],
+            states={
+                AWAITING_URL: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.receive_url)],
+                AWAITING_CONFIRMATION: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.confirm)],
+            },
+            fallbacks=[],
+        )
+        self.application = (
+            Application.builder()
+            .token("123456:test")
+            .request(BotApiRequest(name, calls))
+            .get_updates_request(BotApiRequest())
+            .updater(None)
+            .persistence(persistence)
+            .build()
+        )
+        self.application.add_handler(self.conversation)
+
+    async def start(self, update, context) -> int:
+        self.calls.append((self.name, "start"))
+        context.user_data["started_on"] = self.name
+        return AWAITING_URL
+
+    async def receive_url(self, update, context) -> int:
+        self.calls.append((self.name, "receive_url"))
+        context.user_data["sheet_url"] = update.message.text
+        return AWAITING_CONFIRMATION
+
+    async def confirm(self, update, context) -> int:
+        self.calls.append((self.name, "confirm"))
+        context.user_data["confirmed"] = {
+            "started_on": context.user_data.get("started_on"),
+            "sheet_url": context.user_data.get("sheet_url"),
+        }
+        return ConversationHandler.END
+
+    async def process(self, update_id: int, text: str) -> None:
+        # As telegram_bot.process_update: handle, then write the changes right away
+        await self.application.process_update(make_update(update_id, text, self.application.bot))
+        await self.application.update_persistence()
+
+
+def make_message(message_id: int, sender: dict, text: str) -> dict:
+    return {
+        "message_id": message_id,
+        "date": int(datetime.now(timezone.utc).timestamp()),
+        "chat": {"id": CHAT_ID, "type": "private"},
+        "from": sender,
+        "text": text,
+    }
+
+
+def make_update(update_id: int, text: str, bot) -> Update:
+    """Builds the webhook update of a private text message or of a button tap (Tap), as Telegram sends it."""
+    user = {"id": USER_ID, "is_bot": False, "first_name": "Ana"}
+    if isinstance(text, Tap):
+        callback_query = {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(CHAT_ID),
+            "data": str(text),
+            "message": make_message(update_id, BOT, "Opciones"),
+        }
+        return Update.de_json({"update_id": update_id, "callback_query": callback_query}, bot)
+
+    message = make_message(update_id, user, text)
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return Update.de_json({"update_id": update_id, "message": message}, bot)
+
+
+def run_workers(
+    cache: CacheService,
+    steps: List[Tuple[int, str]],
+    build_conversation: Optional[Callable[[RedisPersistence], ConversationHandler]] = None,
+) -> Tuple[List[Tuple[str, str]], List[Optional[object]]]:
+    """
+    Feeds the steps (worker index, text or Tap) through two workers sharing the cache.
+
+    Args:
+        build_conversation: Builds the conversation of each worker, the onboarding-like one if not given.
+
+    Returns:
+        The handler callbacks and Bot API methods run, as (worker, name), and the stored
+        conversation state after each step.
+    """
+    calls: List[Tuple[str, str]] = []
+    states: List[Optional[object]] = []
+    persistence = RedisPersistence(cache_service=cache)
+
+    async def scenario() -> None:
+        # Each worker has its own persistence instance, as each process would
+        workers = []
+        for name in ("A", "B"):
+            worker_persistence = RedisPersistence(cache_service=cache)
+            conversation = build_conversation(worker_persistence) if build_conversation else None
+            workers.append(Worker(name, worker_persistence, calls, conversation))
+        for worker in workers:
+            await worker.application.initialize()
+        try:
+            for update_id, (worker_index, text) in enumerate(steps, start=1):
+                await workers[worker_index].process(update_id, text)
+                states.append(persistence.load_conversation_state("onboarding", (CHAT_ID, USER_ID)))
+        finally:
+            for worker in workers:
+                await worker.application.shutdown()
+
+    asyncio.run(scenario())
+    return calls, states
+
+
+def test_conversation_resumes_on_the_other_worker(cache):
+    calls, states = run_workers(cache, [(0, "/start"), (1, "https://docs.google.com/sheet"), (0, "listo")])
+
+    assert calls == [("A", "start"), ("B", "receive_url"), ("A", "confirm")]
+    assert states == [AWAITING_URL, AWAITING_CONFIRMATION, None]
+
+
+def test_user_data_carries_over_between_workers(cache):
+    run_workers(cache, [(0, "/start"), (1, "https://docs.google.com/sheet"), (0, "listo")])
+
+    persistence = RedisPersistence(cache_service=cache)
+    user_data = persistence._load_pickled(persistence._generate_key("user_data", USER_ID))
+    assert user_data["confirmed"] == {"started_on": "A", "sheet_url": "https://docs.google.com/sheet"}
+
+
+def test_conversation_ended_on_one_worker_is_not_resumed_on_the_other(cache):
+    calls, states = run_workers(
+        cache, [(0, "/start"), (1, "https://docs.google.com/sheet"), (1, "listo"), (0, "otro mensaje")]
+    )
+
+    # Worker A last saw the conversation waiting for the URL, it must not handle the new message
+    assert calls == [("A", "start"), ("B", "receive_url"), ("B", "confirm")]
+    assert states[-1] is None
+
+
+@pytest.fixture
+def onboarding(monkeypatch):
+    """
+    The real onboarding conversation, with the user store and Google Sheets replaced.
+
+    Returns:
+        The onboarding handlers module and the user data manager the handlers use.
+    """
+    # The module builds its managers at import, the Sheets client needs real credentials
+    with patch.object(SpreadsheetManager, "__init__", return_value=None):
+        from api.telegram.handlers import onboarding_handlers
+    from api.telegram.middlewere import requiere_user
+
+    user = User(id=uuid.uuid4(), telegram_user_id=USER_ID)
+    monkeypatch.setattr(requiere_user.user_manager, "get_user_by_telegram_user_id", lambda telegram_user_id: user)
+
+    user_data_manager = MagicMock()
+    user_data_manager.is_onboarding_complete.return_value = False
+    user_data_manager.is_sheet_linked.return_value = False
+    spreadsheet_manager = MagicMock()
+    spreadsheet_manager.get_sheet_id_from_url.side_effect = SpreadsheetManager.get_sheet_id_from_url
+    spreadsheet_manager.check_access.return_value = True
+    for handler in (onboarding_handlers.start_handler, onboarding_handlers.sheet_handler,
+                    onboarding_handlers.webapp_handler, onboarding_handlers.general_handler):
+        monkeypatch.setattr(handler.onboarding_manager, "user_manager", user_data_manager)
+        monkeypatch.setattr(handler.onboarding_manager, "spreadsheet_manager", spreadsheet_manager)
+    return onboarding_handlers, user_data_manager
+
+
+def test_onboarding_continues_on_the_other_worker(cache, onboarding):
+    onboarding_handlers, user_data_manager = onboarding
+    manager = onboarding_handlers.start_handler.onboarding_manager
+    sheet_url = "https://docs.google.com/spreadsheets/d/abc123/edit"
+
+    def build_conversation(persistence: RedisPersistence) -> RedisConversationHandler:
+        # As api.telegram.handlers.onboarding_handlers builds onboarding_conv_handler
+        return RedisConversationHandler(
+            name="onboarding", persistence=persistence, **onboarding_handlers.onboarding_conv_handler_kwargs
+        )
+
+    calls, states = run_workers(
+        cache, [(0, "/start"), (1, Tap("link_sheet")), (0, sheet_url)], build_conversation=build_conversation
+    )
+
+    assert states == [manager.CHOOSING_LINK_METHOD, manager.GOOGLE_SHEET_AWAITING_URL, None]
+    # The tap was handled by B, and A took the URL as the sheet link instead of a fallback
+    assert ("B", "answerCallbackQuery") in calls
+    user_data_manager.set_sheet_linked.assert_called_once()
+    assert user_data_manager.set_sheet_linked.call_args.args[1] == "abc123"
+
+    persistence = RedisPersistence(cache_service=cache)
+    user_data = persistence._load_pickled(persistence._generate_key("user_data", USER_ID))
+    assert user_data["onboarding_state"] == manager.END
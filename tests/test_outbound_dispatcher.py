@@ -0,0 +1,54 @@
+import asyncio
+import warnings
+from datetime import timedelta
+from typing import List
+
+from telegram.error import RetryAfter
+
+from core.models.common.source import Source
+from integrations.platforms.outbound_dispatcher import OutboundDispatcher
+
+RETRY_AFTER = timedelta(milliseconds=50)
+
+
+def throttled_once():
+    """Creates a request that gets a Telegram RetryAfter on its first attempt."""
+    attempts: List[int] = []
+    # Building the error reads its deprecated retry_after too
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        error = RetryAfter(RETRY_AFTER)
+
+    async def request() -> str:
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise error
+        return "sent"
+
+    return request
+
+
+def global_block(recipients: int) -> float:
+    """Sends to the given number of recipients, each throttled once. Returns the global blocked_until (0 if never blocked)."""
+    dispatcher = OutboundDispatcher(max_retries=1)
+
+    async def scenario() -> float:
+        requests = [throttled_once() for _ in range(recipients)]
+        # The dispatcher reads the Retry-After without deprecation warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            results = await asyncio.gather(
+                *(dispatcher.send(Source.TELEGRAM, str(chat_id), request) for chat_id, request in enumerate(requests))
+            )
+        assert results == ["sent"] * recipients
+        return dispatcher._global_buckets[Source.TELEGRAM].blocked_until
+
+    return asyncio.run(scenario())
+
+
+def test_retry_after_of_one_chat_only_blocks_that_chat():
+    assert global_block(recipients=1) == 0
+
+
+def test_retry_after_of_several_chats_at_once_blocks_the_platform():
+    assert global_block(recipients=OutboundDispatcher.GLOBAL_LIMIT_RECIPIENTS) > 0
@@ -0,0 +1,34 @@
+import asyncio
+from typing import List
+
+from core.scheduler import Priority, PriorityScheduler
+
+
+def test_fast_work_does_not_wait_for_slow_work_of_the_same_key():
+    events: List[str] = []
+
+    async def scenario() -> None:
+        scheduler = PriorityScheduler(max_concurrent=4, fast_lane_reserved=1)
+        release_llm = asyncio.Event()
+
+        async def llm_message(name: str) -> None:
+            events.append(f"{name} started")
+            await release_llm.wait()
+            events.append(f"{name} done")
+
+        async def button_tap() -> None:
+            events.append("tap")
+
+        scheduler.submit(llm_message("first"), Priority.SLOW, serial_key=42)
+        scheduler.submit(llm_message("second"), Priority.SLOW, serial_key=42)
+        tap = scheduler.submit(button_tap(), Priority.FAST, serial_key=42)
+        await asyncio.wait_for(tap, timeout=1)
+        # The tap ran while the first message was processing and the second was queued
+        assert events == ["first started", "tap"]
+
+        release_llm.set()
+        while len(events) < 5:
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert events == ["first started", "tap", "first done", "second started", "second done"]
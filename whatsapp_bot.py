@@ -4,7 +4,9 @@ import logging
 import asyncio
 from flask import Blueprint, jsonify, request, make_response
 from pywa_async import WhatsApp, handlers, types
-from api.whatsapp.handlers_registry import WhatsAppV2Handlers
+from api.whatsapp.handlers_registry import WhatsAppV2Handlers, WHATSAPP_UPDATE_JOB
+from core.task_supervisor import task_supervisor
+from integrations.platforms.outbound_dispatcher import build_http_session
 from config import config
 import uvicorn
 from asgiref.wsgi import WsgiToAsgi
@@ -19,6 +21,7 @@ app = Blueprint('whatsapp', __name__)
 
 # Initialize WhatsApp client
 wa = None  # Will be initialized in initialize_whatsapp
+http_session = None  # Keep-alive pool for the Cloud API, created in initialize_whatsapp
 
 # Initialize handlers
 my_handlers = None  # Will be initialized in initialize_whatsapp
@@ -28,30 +31,41 @@ def home():
     logger.info("WhatsApp home endpoint accessed")
     return 'WhatsApp Bot is running!'
 
-@app.get("/healthcheck")
-async def healthcheck():
-    """Health check endpoint with version info"""
-    logger.info("WhatsApp health check endpoint accessed")
-    status = {
+def get_health_status() -> dict:
+    """Health check payload. Shared by the Flask and ASGI servers"""
+    return {
         "status": "healthy",
         "service": "quipu-whatsapp",
         "timestamp": asyncio.get_event_loop().time()
     }
-    return make_response(status, HTTPStatus.OK)
 
-async def initialize_whatsapp(debug: bool = False, flask_app=None):
-    """Initialize WhatsApp service"""
-    global wa, my_handlers
+@app.get("/healthcheck")
+async def healthcheck():
+    """Health check endpoint with version info"""
+    logger.info("WhatsApp health check endpoint accessed")
+    return make_response(get_health_status(), HTTPStatus.OK)
+
+async def initialize_whatsapp(debug: bool = False, server=None):
+    """
+    Initialize WhatsApp service
+
+    Args:
+        debug (bool): Run in debug mode.
+        server: The root Flask or Starlette app. pywa registers the webhook routes on it.
+    """
+    global wa, my_handlers, http_session
     logger.info("Initializing WhatsApp service...")
     
-    if flask_app is None:
-        raise ValueError("Flask app is required for WhatsApp initialization")
+    if server is None:
+        raise ValueError("A Flask or Starlette app is required for WhatsApp initialization")
     
-    # Initialize WhatsApp client with the Flask app
+    # Initialize WhatsApp client with the root app
+    http_session = build_http_session()
     wa = WhatsApp(
         phone_id=config.WHATSAPP_PHONE_ID,
         token=config.WHATSAPP_TOKEN,
-        server=flask_app,  # Use the Flask app instead of the Blueprint
+        session=http_session,
+        server=server,  # Use the root app instead of the Blueprint
         verify_token=config.WHATSAPP_VERIFY_TOKEN, 
         app_id=config.WHATSAPP_APP_ID,
         app_secret=config.WHATSAPP_APP_SECRET,
@@ -61,10 +75,24 @@ async def initialize_whatsapp(debug: bool = False, flask_app=None):
     # Initialize handlers
     my_handlers = WhatsAppV2Handlers(wa)
     my_handlers.register_handlers()
+
+    # Replay updates that were not processed before the last shutdown
+    task_supervisor.register_resumer(
+        WHATSAPP_UPDATE_JOB,
+        lambda payload: wa.webhook_update_handler(payload["raw"].encode("utf-8")),
+    )
     
     logger.info(f"Webhook URL: /whatsapp/webhook")
     logger.info("WhatsApp service initialized successfully")
 
+async def shutdown_whatsapp():
+    """Close the Cloud API connection pool"""
+    global http_session
+    if http_session is not None:
+        await http_session.aclose()
+        http_session = None
+        logger.info("WhatsApp HTTP session closed")
+
 def main_cli():
     """CLI entry point with argument parsing"""
     parser = argparse.ArgumentParser(description='Quipu WhatsApp Bot')